@@ -3,6 +3,7 @@
 
 #include <string>
 #include <unordered_map>
+#include <vector>
 #include <fstream>
 #include <sstream>
 #include <iostream>
@@ -22,8 +23,14 @@ public:
         if (env_p == nullptr || env_p[0] == '\0') {
             throw std::runtime_error("Environment variable HAKO_CONTROLLER_PARAM_FILE is not set or is empty");
         }
-        std::cout << "controller param path: " << env_p << std::endl;
-        filename = std::string(env_p);
+        /*
+         * 複数機体: パス区切り文字で区切った一覧の場合は、作成順（機体番号順）に
+         * 1機ずつファイルを割り当てる（一覧の数を超えた場合は先頭から繰り返す）
+         */
+        std::vector<std::string> filenames = split_path_list(env_p);
+        int index = instance_count()++;
+        filename = filenames[index % filenames.size()];
+        std::cout << "controller param path: " << filename << std::endl;
     }
 
     HakoControllerParamLoader(const std::string& filename) : filename(filename) {}
@@ -64,6 +71,31 @@ public:
 
 private:
     std::string filename;
+
+    static int& instance_count() {
+        static int count = 0;
+        return count;
+    }
+
+    static std::vector<std::string> split_path_list(const std::string& paths) {
+#ifdef WIN32
+        const char separator = ';';
+#else
+        const char separator = ':';
+#endif
+        std::vector<std::string> filenames;
+        std::istringstream iss(paths);
+        std::string path;
+        while (std::getline(iss, path, separator)) {
+            if (!path.empty()) {
+                filenames.push_back(path);
+            }
+        }
+        if (filenames.empty()) {
+            throw std::runtime_error("Environment variable HAKO_CONTROLLER_PARAM_FILE is not set or is empty");
+        }
+        return filenames;
+    }
     std::unordered_map<std::string, double> parameters;
 };
 
@@ -0,0 +1,107 @@
+import sys
+import os
+import glob
+import json
+import time
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from step_evaluator import load_step_evaluations, create_evaluators, evaluate_step_responses
+
+METRICS = ['steady_state', 'rise_time', 'delay_time', 'overshoot', 'settling_time']
+
+def is_step_scenario(path):
+    """evaluation.step_evaluation を持つシナリオ JSON かどうか"""
+    try:
+        with open(path, 'r') as f:
+            config_data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(config_data, dict) and 'step_evaluation' in config_data.get('evaluation', {})
+
+def find_scenarios(patterns):
+    """
+    シナリオ JSON、実行ディレクトリ（直下のシナリオ JSON）、またはその glob パターンから
+    評価するシナリオの一覧を作成する（重複は除く、指定順）。
+    """
+    scenarios = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in paths:
+            if os.path.isdir(path):
+                candidates = sorted(glob.glob(os.path.join(path, '*.json')))
+            else:
+                candidates = [path]
+            for candidate in candidates:
+                if candidate not in scenarios and is_step_scenario(candidate):
+                    scenarios.append(candidate)
+    return scenarios
+
+def evaluate_scenario(scenario):
+    """
+    1シナリオの全軸を評価し、結果の一覧を返す（ワーカープロセスで実行される）。
+    ログのパスは常にシナリオのディレクトリ基準で解決し、ログがなければエラーの行を返す。
+    """
+    try:
+        step_evaluations = load_step_evaluations(scenario, os.path.dirname(scenario))
+        missing = sorted({input_file for input_file, _, _ in step_evaluations if not os.path.isfile(input_file)})
+        if missing:
+            return [{'scenario': scenario, 'input_file': input_file, 'axis': None, 'error': f"log not found: {input_file}", 'passed': False}
+                    for input_file in missing]
+        evaluators = create_evaluators(step_evaluations)
+        evaluate_step_responses(evaluators)
+        results = [evaluator.to_dict() for evaluator in evaluators]
+    except (OSError, KeyError, ValueError) as e:
+        results = [{'input_file': None, 'axis': None, 'error': f"{type(e).__name__}: {e}", 'passed': False}]
+    return [dict({'scenario': scenario}, **result) for result in results]
+
+def summary_rows(results):
+    """CSV の行: 指標ごとに判定、値、目標値の列"""
+    rows = []
+    for result in results:
+        row = {name: result[name] for name in ['scenario', 'input_file', 'axis', 'passed', 'error']}
+        for metric in METRICS:
+            values = result.get(metric, {})
+            row[f"{metric}_result"] = values.get('result')
+            row[metric] = values.get('value')
+            row[f"{metric}_target"] = values.get('target')
+        rows.append(row)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate the step response of many scenarios or run directories in parallel.')
+    parser.add_argument('scenarios', nargs='+', help='Scenario JSON, run directory or glob pattern (quote it to use ** recursively)')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--csv', default='step_summary.csv', help='Summary CSV')
+    parser.add_argument('--json', help='Summary JSON (default: none)')
+    args = parser.parse_args()
+
+    scenarios = find_scenarios(args.scenarios)
+    if not scenarios:
+        print("ERROR: no scenario with evaluation.step_evaluation found")
+        return 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(min(args.jobs, len(scenarios)), 1)) as pool:
+        # map keeps the order of the scenarios; chunks amortize the task overhead
+        chunksize = max(len(scenarios) // (4 * max(args.jobs, 1)), 1)
+        results = [result for scenario_results in pool.map(evaluate_scenario, scenarios, chunksize=chunksize)
+                   for result in scenario_results]
+    wall_sec = time.perf_counter() - start
+
+    pd.DataFrame(summary_rows(results)).to_csv(args.csv, index=False)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    passed = sum(result['passed'] for result in results)
+    errors = [result for result in results if result['error'] is not None]
+    print(f"INFO: {len(results)} evaluations of {len(scenarios)} scenarios in {wall_sec:.1f} s: "
+          f"{passed} passed, {len(results) - passed - len(errors)} failed, {len(errors)} not evaluated")
+    for result in errors:
+        print(f"ERROR: {result['scenario']} ({result['axis']}): {result['error']}")
+    print(f"INFO: summary written to {args.csv}" + (f" and {args.json}" if args.json else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
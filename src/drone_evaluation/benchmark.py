@@ -0,0 +1,197 @@
+import sys
+import os
+import json
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from components.simulation_executor import SimulationExecutor
+from components.impl.drone_executor import JOYSTICK_AXIS_NUM
+from transport_factory import TransportFactory
+
+# simulation.type / controller_type and the number of signal channels each executor consumes
+BENCHMARK_EXECUTORS = [
+    {"name": "plant", "type": "plant", "channels": 4},
+    {"name": "angle", "type": "controller", "controller_type": "angle", "channels": 3},
+    {"name": "spd", "type": "controller", "controller_type": "spd", "channels": 2},
+    {"name": "spd_z", "type": "controller", "controller_type": "spd_z", "channels": 1},
+    {"name": "pos", "type": "controller", "controller_type": "pos", "channels": 2},
+    {"name": "pos_z", "type": "controller", "controller_type": "pos_z", "channels": 1},
+]
+
+def create_evaluation_config(executor, duration_sec, time_step, log_file, signal_type, signal_time_base, async_write=False):
+    channels = executor["channels"]
+    if signal_type == 'sine':
+        signal = {
+            "type": "sine",
+            "parameters": {"amp": [1.0] * channels, "freq": [1.0] * channels, "offsets": [1.0] * channels}
+        }
+    else:
+        signal = {
+            "type": "step",
+            "parameters": {"offsets": [1.0] * channels}
+        }
+    simulation = {
+        "simulation_time_step": time_step,
+        "type": executor["type"],
+        "height": 1.0,
+        "speed": 1.0,
+        "signals": {"benchmark": signal},
+        "signal_input_timings": [{"name": "benchmark", "duration_sec": duration_sec}],
+        "signal_time_base": signal_time_base
+    }
+    if "controller_type" in executor:
+        simulation["controller_type"] = executor["controller_type"]
+    return {
+        "simulation": simulation,
+        "evaluation": {
+            "input_data": {"log_file": log_file, "cache_len": 1024, "async_write": async_write}
+        }
+    }
+
+def run_benchmark(executor, duration_sec, time_step, signal_type, signal_time_base, log_format, work_dir, async_write=False):
+    """
+    Runs SimulationExecutor.run() for one executor on the virtual transport.
+
+    Returns:
+    dict: steps, wall time, steps/sec, per-step cost, peak RSS, joystick PDU access counts
+    and the longest log flush stall of the control loop.
+    """
+    drone_config_path = os.path.join(work_dir, f"drone_config_{executor['name']}.json")
+    evaluation_config_path = os.path.join(work_dir, f"evaluation_{executor['name']}.json")
+    log_file = os.path.join(work_dir, f"in_{executor['name']}.{log_format}")
+    with open(drone_config_path, 'w') as f:
+        json.dump({"name": "DroneTransporter", "simulation": {"timeStep": time_step}}, f)
+    with open(evaluation_config_path, 'w') as f:
+        json.dump(create_evaluation_config(executor, duration_sec, time_step, log_file, signal_type, signal_time_base, async_write), f)
+
+    transport = TransportFactory('virtual').create_transport()
+    simulation_executor = SimulationExecutor(drone_config_path, None, evaluation_config_path, transport)
+    result = {}
+
+    def on_manual_timing_control(context):
+        start = time.perf_counter()
+        simulation_executor.run()
+        result['wall_sec'] = time.perf_counter() - start
+        result['steps'] = simulation_executor.step_count
+        return 0
+
+    callback = {
+        'on_initialize': lambda context: 0,
+        'on_simulation_step': None,
+        'on_manual_timing_control': on_manual_timing_control,
+        'on_reset': lambda context: 0
+    }
+    if simulation_executor.initialize(callback) == False:
+        raise RuntimeError("asset registration failed")
+    simulation_executor.start()
+
+    client = simulation_executor.client
+    result['name'] = executor['name']
+    result['steps_per_sec'] = result['steps'] / result['wall_sec']
+    result['usec_per_step'] = result['wall_sec'] * 1000000 / result['steps']
+    result['joystick_reads'] = client.joystick_reads
+    result['joystick_writes'] = client.joystick_writes
+    result['skipped_joystick_writes'] = simulation_executor.drone_executor.skipped_joystick_writes
+    # time log() spent on the disk: flush latency when synchronous, queue wait when asynchronous
+    stats = simulation_executor.logger.flush_stats
+    result['max_stall_ms'] = (stats.max_blocked_sec if async_write else stats.max_flush_sec) * 1000
+    # ru_maxrss is in KiB on Linux
+    result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+def _use_row(row, axis):
+    # what JoystickDroneExecutor.run() does with a row: compare the joystick axes as a list,
+    # slice the logged input values and pass them to the logger
+    changed = row[:JOYSTICK_AXIS_NUM] != axis
+    values = row[JOYSTICK_AXIS_NUM:]
+    return changed, max(*values, 0.0)
+
+def _use_row_view(row, axis):
+    # an ndarray row compares elementwise, so the joystick axes have to be converted first
+    changed = row[:JOYSTICK_AXIS_NUM].tolist() != axis
+    values = row[JOYSTICK_AXIS_NUM:]
+    return changed, max(*values, 0.0)
+
+def benchmark_row_access(steps, channels=4):
+    """
+    Times the ways run_duration() could hand the mapped signal rows to the executors,
+    without the rest of the control loop.
+
+    Returns:
+    list: (name, usec/step) of each way.
+    """
+    block_len = SimulationExecutor.SIGNAL_CHUNK_LEN
+    block = np.random.default_rng(0).random((block_len, JOYSTICK_AXIS_NUM + channels))
+    axis = [0.0] * JOYSTICK_AXIS_NUM
+    blocks = max(steps // block_len, 1)
+
+    def per_step_tolist():
+        for _ in range(blocks):
+            for index in range(block_len):
+                _use_row(block[index].tolist(), axis)
+
+    def preallocated_list():
+        row = [0.0] * block.shape[1]
+        for _ in range(blocks):
+            for index in range(block_len):
+                row[:] = block[index]
+                _use_row(row, axis)
+
+    def block_tolist():
+        for _ in range(blocks):
+            rows = block.tolist()
+            for index in range(block_len):
+                _use_row(rows[index], axis)
+
+    def row_view():
+        for _ in range(blocks):
+            for index in range(block_len):
+                _use_row_view(block[index], axis)
+
+    results = []
+    for name, function in [('per-step tolist', per_step_tolist), ('preallocated list', preallocated_list),
+                           ('block tolist', block_tolist), ('row view', row_view)]:
+        start = time.perf_counter()
+        function()
+        results.append((name, (time.perf_counter() - start) * 1000000 / (blocks * block_len)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SimulationExecutor overhead on the virtual transport.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Simulated seconds per executor')
+    parser.add_argument('--time-step', type=float, default=0.001, help='Simulation time step in seconds')
+    parser.add_argument('--signal', choices=['step', 'sine'], default='step', help='Signal type')
+    parser.add_argument('--signal-time-base', choices=['step', 'simulation_time'], default='step', help='simulation.signal_time_base')
+    parser.add_argument('--log-format', choices=['csv', 'npy'], default='csv', help='evaluation.input_data.log_format')
+    parser.add_argument('--async-write', action='store_true', help='evaluation.input_data.async_write')
+    parser.add_argument('--executor', action='append', help='Executor name to benchmark (default: all)')
+    parser.add_argument('--row-access', action='store_true', help='Also time the ways of handing the signal rows to the executors')
+    args = parser.parse_args()
+
+    executors = BENCHMARK_EXECUTORS
+    if args.executor:
+        executors = [e for e in BENCHMARK_EXECUTORS if e['name'] in args.executor]
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        # each executor runs in a fresh process so that the peak RSS is measured per executor
+        for executor in executors:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                future = pool.submit(run_benchmark, executor, args.duration, args.time_step, args.signal, args.signal_time_base, args.log_format, work_dir, args.async_write)
+                results.append(future.result())
+
+    print(f"{'executor':<10} {'steps':>10} {'wall[s]':>10} {'steps/sec':>12} {'usec/step':>10} {'rss[MB]':>10} {'js_reads':>10} {'js_writes':>10} {'js_skipped':>10} {'stall[ms]':>10}")
+    for r in results:
+        print(f"{r['name']:<10} {r['steps']:>10} {r['wall_sec']:>10.3f} {r['steps_per_sec']:>12.0f} {r['usec_per_step']:>10.2f} {r['peak_rss_mb']:>10.1f} {r['joystick_reads']:>10} {r['joystick_writes']:>10} {r['skipped_joystick_writes']:>10} {r['max_stall_ms']:>10.3f}")
+    if args.row_access:
+        print(f"{'row access':<20} {'usec/step':>10}")
+        for name, usec_per_step in benchmark_row_access(int(args.duration / args.time_step)):
+            print(f"{name:<20} {usec_per_step:>10.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
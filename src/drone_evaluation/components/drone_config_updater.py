@@ -1,10 +1,11 @@
+import copy
 import json
 import argparse
 
 class DroneConfigUpdater:
-    def __init__(self, file_path):
+    def __init__(self, file_path, base_path="../src/drone_control/cmake-build/workspace/"):
         self.file_path = file_path
-        self.base_path = "../src/drone_control/cmake-build/workspace/"
+        self.base_path = base_path
         try:
             with open(self.file_path, 'r') as file:
                 self.params = json.load(file)
@@ -45,11 +46,44 @@ class DroneConfigUpdater:
         self.params['controller']['moduleDirectory'] = self.base_path + module_name
         self.params['controller']['moduleName'] = module_name
 
+    def set_log_output_directory(self, log_output_directory):
+        """シミュレータが drone_log<番号> を出力するディレクトリ"""
+        self.params['simulation']['logOutputDirectory'] = log_output_directory
+
+    def set_drone_instance(self, index):
+        """複数機体の index 番目の機体名にする（0 番目はテンプレートの名前のまま）"""
+        if index > 0:
+            self.params['name'] = drone_instance_name(self.params['name'], index)
+
     def save(self, output_filepath):
         """現在の設定を指定されたファイルに保存"""
         with open(output_filepath, 'w') as outfile:
             json.dump(self.params, outfile, indent=4)
 
+def drone_instance_name(name, index):
+    """複数機体の index 番目の機体名"""
+    return name if index == 0 else f"{name}{index}"
+
+def add_drone_robots(pdu_params, drone_name, count):
+    """
+    PDU 設定（custom.json）の drone_name のロボットを複製し、
+    複数機体の 1..count-1 番目のロボットを追加する。
+    """
+    robots = pdu_params['robots']
+    template = next((robot for robot in robots if robot['name'] == drone_name), None)
+    if template is None:
+        raise ValueError(f"Robot {drone_name} is not defined in the PDU config")
+    for index in range(1, count):
+        name = drone_instance_name(drone_name, index)
+        robot = copy.deepcopy(template)
+        robot['name'] = name
+        for key, pdus in robot.items():
+            if key.endswith('_pdu_readers') or key.endswith('_pdu_writers'):
+                for pdu in pdus:
+                    pdu['name'] = f"{name}_{pdu['org_name']}"
+        robots.append(robot)
+    return pdu_params
+
 def validate_evaluation_config(eval_config):
     """evaluation_config_file の検証"""
     if 'simulation' not in eval_config:
@@ -18,13 +18,14 @@ class DroneExecutorFactory:
         self.param_loader = param_loader
         self.params = self.param_loader.load_params()
 
-    def create_executor(self, client, logger):
+    def create_executor(self, client, logger, transport):
         """
         Creates a DroneExecutor instance based on the loaded parameters.
         
         Parameters:
         client: Client instance for communication.
         logger: Logger instance for logging messages.
+        transport (IHakoTransport): Transport used for simulation time control.
         
         Returns:
         IDroneExecutor: An instance of a specific DroneExecutor subclass.
@@ -32,20 +33,20 @@ class DroneExecutorFactory:
         simulation_type = self.params['simulation']['type']
         
         if simulation_type == 'plant':
-            return DronePlantExecutor(client, logger)
+            return DronePlantExecutor(client, logger, transport)
         elif simulation_type == 'controller':
             simulation_time_step = self.params['simulation']['simulation_time_step']
             controller_type = self.params['simulation'].get('controller_type', 'angle')
             if controller_type == 'angle':
-                return DroneControllerExecutorAngle(client, logger, self.params['simulation']['height'], simulation_time_step)
+                return DroneControllerExecutorAngle(client, logger, transport, self.params['simulation']['height'], simulation_time_step)
             elif controller_type == 'spd':
-                return DroneControllerExecutorSpd(client, logger, self.params['simulation']['height'], simulation_time_step)
+                return DroneControllerExecutorSpd(client, logger, transport, self.params['simulation']['height'], simulation_time_step)
             elif controller_type == 'spd_z':
-                return DroneControllerExecutorSpdZ(client, logger)
+                return DroneControllerExecutorSpdZ(client, logger, transport)
             elif controller_type == 'pos':
-                return DroneControllerExecutorPos(client, logger, self.params['simulation']['height'], self.params['simulation']['speed'], simulation_time_step)
+                return DroneControllerExecutorPos(client, logger, transport, self.params['simulation']['height'], self.params['simulation']['speed'], simulation_time_step)
             elif controller_type == 'pos_z':
-                return DroneControllerExecutorPosZ(client, logger, self.params['simulation']['speed'])
+                return DroneControllerExecutorPosZ(client, logger, transport, self.params['simulation']['speed'])
             else:
                 raise ValueError(f"Unsupported controller type: {controller_type}")
         else:
@@ -66,7 +67,7 @@ if __name__ == "__main__":
 
     client = "mock_client"
     try:
-        executor = factory.create_executor(client, logger)
+        executor = factory.create_executor(client, logger, None)
         print(f"Created executor: {type(executor).__name__}")
     except ValueError as e:
         print(e)
\ No newline at end of file
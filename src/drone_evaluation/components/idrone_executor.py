@@ -19,6 +19,43 @@ class IDroneExecutor(ABC):
         pass
 
     @abstractmethod
-    def run(self, simulation_time, signals):
+    def map_signals(self, signal_block):
+        """
+        Maps a (n_channels, block_len) signal block to per-step rows for run().
+
+        Returns:
+        numpy.ndarray: (block_len, row_len) array, one row per step.
+        """
+        pass
+
+    @abstractmethod
+    def map_step_signals(self, signals):
+        """
+        Maps the signals of a single step to a row for run().
+
+        Returns:
+        list: Row for run().
+        """
+        pass
+
+    @abstractmethod
+    def input_columns(self):
+        """
+        Returns the names of the logged input values (input log columns without timestamp).
+        """
+        pass
+
+    @abstractmethod
+    def input_values(self, row):
+        """
+        Returns the logged input values of a row (input log column order, without timestamp).
+        """
+        pass
+
+    @abstractmethod
+    def run(self, simulation_time, row):
+        """
+        Executes one step with a row produced by map_signals() or map_step_signals().
+        """
         pass
 
@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+
+class IHakoTransport(ABC):
+    @abstractmethod
+    def asset_register(self, asset_name, pdu_config_path, callback, delta_time_usec):
+        """
+        Registers the evaluator as a Hakoniwa asset.
+
+        Parameters:
+        asset_name (str): Name of the asset.
+        pdu_config_path (str): Path to the PDU configuration file.
+        callback (dict): Hakoniwa asset callbacks (on_initialize, on_manual_timing_control, on_reset).
+        delta_time_usec (int): Simulation time step in microseconds.
+
+        Returns:
+        bool: True if the asset was registered.
+        """
+        pass
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def usleep(self, usec):
+        pass
+
+    @abstractmethod
+    def wait_stop(self):
+        """
+        Blocks until the simulation is stopped from outside (hako-cmd stop), so that
+        the next scenario of a session can start after the reset.
+        """
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """
+        Called when the session moves on to the next scenario, after the simulator
+        has been reset.
+        """
+        pass
+
+    @abstractmethod
+    def simulation_time(self):
+        """
+        Returns:
+        int: Current simulation time in microseconds.
+        """
+        pass
+
+    @abstractmethod
+    def create_client(self, pdu_config_path, drone_name):
+        """
+        Creates a drone API client (hakosim.MultirotorClient compatible).
+        """
+        pass
+
+    @abstractmethod
+    def create_pdu(self, robot_name, pdu_config_path):
+        """
+        Writes the initial PDUs that the drone simulator expects from the asset.
+        """
+        pass
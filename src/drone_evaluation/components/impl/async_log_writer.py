@@ -0,0 +1,105 @@
+import time
+import queue
+import threading
+
+class FlushStats:
+    """
+    Flush statistics of a logger.
+
+    flush latency is the time spent writing one buffer to the file. In the
+    synchronous mode it is spent inside log(), in the asynchronous mode on the
+    writer thread; blocked time is the time log() waited for a free queue slot.
+    """
+    def __init__(self):
+        self.flushes = 0
+        self.total_flush_sec = 0.0
+        self.max_flush_sec = 0.0
+        self.max_queue_depth = 0
+        self.blocked = 0
+        self.max_blocked_sec = 0.0
+
+    def add_flush(self, flush_sec):
+        self.flushes += 1
+        self.total_flush_sec += flush_sec
+        self.max_flush_sec = max(self.max_flush_sec, flush_sec)
+
+    def add_submit(self, queue_depth, blocked_sec):
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        if blocked_sec > 0.0:
+            self.blocked += 1
+            self.max_blocked_sec = max(self.max_blocked_sec, blocked_sec)
+
+    def summary(self):
+        mean_flush_ms = self.total_flush_sec * 1000 / self.flushes if self.flushes > 0 else 0.0
+        return (f"flushes: {self.flushes}, flush latency mean/max: {mean_flush_ms:.3f}/{self.max_flush_sec * 1000:.3f} ms, "
+                f"max queue depth: {self.max_queue_depth}, blocked: {self.blocked} (max {self.max_blocked_sec * 1000:.3f} ms)")
+
+class AsyncLogWriter:
+    """
+    Writes log buffers on a background thread.
+
+    Buffers are handed over through a bounded queue of queue_len entries; submit()
+    only blocks when the writer falls queue_len buffers behind. An exception raised
+    by write_buffer is re-raised by the next submit() or drain().
+    """
+    def __init__(self, write_buffer, queue_len=4, stats=None):
+        """
+        Parameters:
+        write_buffer (callable): Called on the writer thread with each submitted buffer.
+        queue_len (int): Maximum number of buffers waiting to be written.
+        stats (FlushStats): Statistics to update.
+        """
+        self.write_buffer = write_buffer
+        self.queue = queue.Queue(maxsize=max(int(queue_len), 1))
+        self.stats = stats if stats is not None else FlushStats()
+        self.thread = None
+        self.error = None
+
+    def _run(self):
+        while True:
+            buffer = self.queue.get()
+            try:
+                if buffer is None:
+                    return
+                if self.error is None:
+                    start = time.perf_counter()
+                    self.write_buffer(buffer)
+                    self.stats.add_flush(time.perf_counter() - start)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _check_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("log writer thread failed") from error
+
+    def submit(self, buffer):
+        """バッファを書き込みキューに追加する"""
+        self._check_error()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='AsyncLogWriter', daemon=True)
+            self.thread.start()
+        start = time.perf_counter()
+        try:
+            self.queue.put_nowait(buffer)
+            blocked_sec = 0.0
+        except queue.Full:
+            self.queue.put(buffer)
+            blocked_sec = time.perf_counter() - start
+        self.stats.add_submit(self.queue.qsize(), blocked_sec)
+
+    def drain(self):
+        """キューの全バッファの書き込み完了を待つ"""
+        if self.thread is not None:
+            self.queue.join()
+        self._check_error()
+
+    def close(self):
+        """キューを書き出してスレッドを終了する"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        self._check_error()
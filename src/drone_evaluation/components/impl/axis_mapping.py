@@ -0,0 +1,139 @@
+import numpy as np
+from drone_evaluation.components.impl.drone_contants import HEADING_AXIS, UP_DOWN_AXIS, ROLL_AXIS, PITCH_AXIS
+
+JOYSTICK_AXES = [HEADING_AXIS, UP_DOWN_AXIS, ROLL_AXIS, PITCH_AXIS]
+
+# Joystick axis assignment per controller_type ('plant' for simulation.type plant).
+# USER INPUT IS ROS frame, the joystick axes are NED frame.
+#   ('signal', channel, sign): sign * signals[channel]
+#   ('param', name, sign)    : sign * params[name] (constant axis, e.g. simulation.height)
+#   ('const', value)         : constant value
+# 'log_axes' lists the axes written to the input log, in column order.
+AXIS_MAPPING_TABLE = {
+    'plant': {
+        'axes': {
+            HEADING_AXIS: ('signal', 0, 1.0),
+            UP_DOWN_AXIS: ('signal', 1, 1.0),
+            ROLL_AXIS:    ('signal', 2, 1.0),
+            PITCH_AXIS:   ('signal', 3, 1.0),
+        },
+        'log_axes': [HEADING_AXIS, UP_DOWN_AXIS, ROLL_AXIS, PITCH_AXIS],
+    },
+    'angle': {
+        'axes': {
+            HEADING_AXIS: ('signal', 2, -1.0),      # target_rz
+            UP_DOWN_AXIS: ('param', 'height', -1.0),
+            ROLL_AXIS:    ('signal', 0, 1.0),       # target_rx
+            PITCH_AXIS:   ('signal', 1, -1.0),      # target_ry
+        },
+        'log_axes': [ROLL_AXIS, PITCH_AXIS, HEADING_AXIS],
+    },
+    'spd': {
+        'axes': {
+            HEADING_AXIS: ('const', 0.0),
+            UP_DOWN_AXIS: ('param', 'height', -1.0),
+            ROLL_AXIS:    ('signal', 1, -1.0),      # target_vy
+            PITCH_AXIS:   ('signal', 0, 1.0),       # target_vx
+        },
+        'log_axes': [PITCH_AXIS, ROLL_AXIS],
+    },
+    'spd_z': {
+        'axes': {
+            HEADING_AXIS: ('const', 0.0),
+            UP_DOWN_AXIS: ('signal', 0, -1.0),      # target_vz
+            ROLL_AXIS:    ('const', 0.0),
+            PITCH_AXIS:   ('const', 0.0),
+        },
+        'log_axes': [UP_DOWN_AXIS],
+    },
+    'pos': {
+        'axes': {
+            HEADING_AXIS: ('param', 'speed', 1.0),  # target_speed
+            UP_DOWN_AXIS: ('param', 'height', -1.0),
+            ROLL_AXIS:    ('signal', 1, -1.0),      # target_y
+            PITCH_AXIS:   ('signal', 0, 1.0),       # target_x
+        },
+        'log_axes': [PITCH_AXIS, ROLL_AXIS],
+    },
+    'pos_z': {
+        'axes': {
+            HEADING_AXIS: ('param', 'speed', 1.0),
+            UP_DOWN_AXIS: ('signal', 0, -1.0),      # target_z
+            ROLL_AXIS:    ('const', 0.0),
+            PITCH_AXIS:   ('const', 0.0),
+        },
+        'log_axes': [UP_DOWN_AXIS],
+    },
+}
+
+class AxisMapping:
+    """
+    Maps signal blocks (ROS frame) to joystick axis rows (NED frame).
+
+    Each output row holds the joystick axes (JOYSTICK_AXES order) followed by the
+    logged values (log_axes order), so one matrix product produces everything the
+    executor needs for a step.
+    """
+    def __init__(self, matrix, constants, log_axes):
+        self.matrix_t = np.ascontiguousarray(np.asarray(matrix, dtype=np.float64).T)
+        self.constants = np.asarray(constants, dtype=np.float64)
+        self.log_axes = log_axes
+        self.axis_num = len(JOYSTICK_AXES)
+        self.row_len = self.matrix_t.shape[1]
+        self.buffer = np.empty((0, self.row_len), dtype=np.float64)
+
+    def apply(self, signal_block):
+        """
+        Parameters:
+        signal_block (numpy.ndarray): (n_channels, block_len) signal block.
+
+        Returns:
+        numpy.ndarray: (block_len, axis_num + len(log_axes)) C-ordered rows, one per step.
+        The array is a reused buffer, valid until the next call.
+        """
+        block_len = signal_block.shape[1]
+        if self.buffer.shape[0] < block_len:
+            self.buffer = np.empty((block_len, self.row_len), dtype=np.float64)
+        rows = self.buffer[:block_len]
+        np.matmul(signal_block.T, self.matrix_t, out=rows)
+        rows += self.constants
+        return rows
+
+    def apply_step(self, signals):
+        """
+        Maps the signals of a single step.
+
+        Returns:
+        list: axis_num + len(log_axes) values.
+        """
+        return (np.asarray(signals, dtype=np.float64) @ self.matrix_t + self.constants).tolist()
+
+def create_axis_mapping(mapping_type, channel_num, params):
+    """
+    Creates the AxisMapping of mapping_type from AXIS_MAPPING_TABLE.
+
+    Parameters:
+    mapping_type (str): 'plant' or a controller_type.
+    channel_num (int): Number of signal channels.
+    params (dict): Values of the constant axes (e.g. {'height': 1.0}).
+
+    Returns:
+    AxisMapping: The axis mapping.
+    """
+    if mapping_type not in AXIS_MAPPING_TABLE:
+        raise ValueError(f"Unsupported mapping type: {mapping_type}")
+    entry = AXIS_MAPPING_TABLE[mapping_type]
+    axes = JOYSTICK_AXES + entry['log_axes']
+    matrix = np.zeros((len(axes), channel_num))
+    constants = np.zeros(len(axes))
+    for row, axis in enumerate(axes):
+        rule = entry['axes'][axis]
+        if rule[0] == 'signal':
+            if rule[1] >= channel_num:
+                raise ValueError(f"{mapping_type} requires at least {rule[1] + 1} signal channels, but got {channel_num}")
+            matrix[row, rule[1]] = rule[2]
+        elif rule[0] == 'param':
+            constants[row] = rule[2] * float(params[rule[1]])
+        else:
+            constants[row] = rule[1]
+    return AxisMapping(matrix, constants, entry['log_axes'])
@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+import queue
+import struct
+import numpy as np
+from drone_evaluation.components.impl.async_log_writer import AsyncLogWriter, FlushStats
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_ALIGN = 64
+# the row count in the header is rewritten on every flush; reserve room for its largest value
+NPY_MAX_ROWS = 10 ** 18
+
+def create_log_dtype(columns):
+    """
+    Creates the record dtype of a log: int64 timestamp (usec) followed by float64 values.
+    """
+    fields = []
+    for column in columns:
+        if column == "timestamp":
+            fields.append((column, '<i8'))
+        else:
+            fields.append((column, '<f8'))
+    return np.dtype(fields)
+
+def _npy_header_dict(dtype, rows):
+    return repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)})
+
+def _npy_header(dtype, rows, header_len):
+    """
+    Creates a NPY v1.0 header of exactly header_len bytes.
+    """
+    header = _npy_header_dict(dtype, rows)
+    header = header.ljust(header_len - len(NPY_MAGIC) - 2 - 1) + '\n'
+    return NPY_MAGIC + struct.pack('<H', header_len - len(NPY_MAGIC) - 2) + header.encode('latin1')
+
+def _npy_header_len(dtype):
+    length = len(NPY_MAGIC) + 2 + len(_npy_header_dict(dtype, NPY_MAX_ROWS)) + 1
+    return -(-length // NPY_HEADER_ALIGN) * NPY_HEADER_ALIGN
+
+class BinaryLogger:
+    """
+    Logger backend that writes rows into a preallocated NumPy structured array and
+    appends it as a raw block to a .npy file every cache_len rows.
+
+    The file is a valid NPY file after every flush: its header describes the
+    columns and the number of rows written so far, so it can be memory-mapped
+    with np.load(filename, mmap_mode='r') or read with read_binary_log().
+
+    With async_write, a full buffer is swapped for a free one and written by
+    a background thread, so log() does not wait for the disk.
+    """
+    def __init__(self, filename='in.npy', cache_len=1024, async_write=False, queue_len=4):
+        self.filename = filename
+        # ファイルが存在していたら削除する
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        self.cache_len = cache_len
+        self.rows = 0
+        self.file = None
+        self.flush_stats = FlushStats()
+        self.writer = AsyncLogWriter(self._write_buffer, queue_len, self.flush_stats) if async_write else None
+        self.set_columns(["timestamp", "value"])
+
+    def set_columns(self, columns):
+        """カラム名を設定するメソッド"""
+        if self.rows > 0 or self.file is not None:
+            raise ValueError("columns can not be changed after logging has started")
+        self.columns = columns
+        self.dtype = create_log_dtype(columns)
+        self.buffer = np.zeros(self.cache_len, dtype=self.dtype)
+        self.count = 0
+        # buffers already written by the writer thread, reused by log()
+        self.free_buffers = queue.SimpleQueue()
+
+    def log(self, *values):
+        """ログに複数の値を記録する"""
+        if len(values) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values, but got {len(values)}")
+        self.buffer[self.count] = values
+        self.count += 1
+
+        # バッファが一杯になったら保存
+        if self.count >= self.cache_len:
+            if self.writer is not None:
+                self._submit()
+            else:
+                start = time.perf_counter()
+                self.flush()
+                self.flush_stats.add_flush(time.perf_counter() - start)
+
+    def _open(self):
+        self.header_len = _npy_header_len(self.dtype)
+        if self.rows > 0:
+            # reopened after save()
+            self.file = open(self.filename, 'r+b')
+        else:
+            self.file = open(self.filename, 'wb')
+            self.file.write(_npy_header(self.dtype, 0, self.header_len))
+
+    def _write_rows(self, rows):
+        if self.file is None:
+            self._open()
+        if len(rows) > 0:
+            self.file.seek(0, os.SEEK_END)
+            self.file.write(rows.tobytes())
+            self.rows += len(rows)
+            self.file.seek(0)
+            self.file.write(_npy_header(self.dtype, self.rows, self.header_len))
+
+    def _write_buffer(self, item):
+        # runs on the writer thread
+        buffer, count = item
+        self._write_rows(buffer[:count])
+        self.free_buffers.put(buffer)
+
+    def _submit(self):
+        """バッファを書き込みスレッドに渡し、空きバッファに差し替える"""
+        if self.count == 0:
+            return
+        self.writer.submit((self.buffer, self.count))
+        try:
+            self.buffer = self.free_buffers.get_nowait()
+        except queue.Empty:
+            self.buffer = np.zeros(self.cache_len, dtype=self.dtype)
+        self.count = 0
+
+    def flush(self):
+        """バッファのデータをファイルに追記する"""
+        if self.writer is not None:
+            self._submit()
+            self.writer.drain()
+        else:
+            self._write_rows(self.buffer[:self.count])
+            self.count = 0
+        if self.file is None:
+            self._open()
+        self.file.flush()
+
+    def save(self):
+        """バッファを保存してファイルを閉じる"""
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+        self.file.close()
+        self.file = None
+
+def read_binary_log(filename):
+    """
+    Memory-maps a log written by BinaryLogger.
+
+    The row count is taken from the file size, so a log whose last header update
+    was interrupted is still readable.
+
+    Returns:
+    numpy.memmap: Structured array with one field per column.
+    """
+    with open(filename, 'rb') as file:
+        version = np.lib.format.read_magic(file)
+        if version != (1, 0):
+            raise ValueError(f"Unsupported NPY version {version}: {filename}")
+        _, _, dtype = np.lib.format.read_array_header_1_0(file)
+        offset = file.tell()
+    rows = (os.path.getsize(filename) - offset) // dtype.itemsize
+    if rows == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=(rows,))
+
+def export_csv(npy_filename, csv_filename, chunk_len=1000000):
+    """
+    Exports a log written by BinaryLogger to CSV (same layout as Logger).
+    """
+    import pandas as pd
+    data = read_binary_log(npy_filename)
+    if os.path.exists(csv_filename):
+        os.remove(csv_filename)
+    if len(data) == 0:
+        pd.DataFrame(columns=list(data.dtype.names)).to_csv(csv_filename, index=False)
+        return
+    for start in range(0, len(data), chunk_len):
+        df = pd.DataFrame(np.asarray(data[start:start + chunk_len]))
+        df.to_csv(csv_filename, mode='a', header=(start == 0), index=False)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: {sys.argv[0]} <npy_log_file> <csv_file>")
+        sys.exit(1)
+    export_csv(sys.argv[1], sys.argv[2])
+    print(f"Exported {sys.argv[1]} to {sys.argv[2]}")
@@ -1,8 +1,10 @@
-import hakopy
-import pdu_info
+from drone_evaluation.components.idrone_executor import IDroneExecutor
 from drone_evaluation.components.impl.drone_contants import UP_DOWN_AXIS
+from drone_evaluation.components.impl.axis_mapping import JOYSTICK_AXES, create_axis_mapping
 
-def joystick_takeoff(client, height, slp_usec = 30000):
+JOYSTICK_AXIS_NUM = len(JOYSTICK_AXES)
+
+def joystick_takeoff(client, transport, height, slp_usec = 30000):
     print("JOYSTICK TAKEOFF(ROS Frame): ", height)
     pose = client.simGetVehiclePose()
     while (pose.position.z_val) < (height - 0.1):
@@ -11,20 +13,20 @@ def joystick_takeoff(client, height, slp_usec = 30000):
         data['axis'] = list(data['axis']) 
         data['axis'][UP_DOWN_AXIS] = float(-height) #NED座標系
         client.putGameJoystickData(data)
-        hakopy.usleep(slp_usec)
+        transport.usleep(slp_usec)
 
-def joystick_init(client):
+def joystick_init(client, transport):
     data = client.getGameJoystickData()
     data['button'] = list(data['button'])
 
-    hakopy.usleep(500000)
+    transport.usleep(500000)
     data['button'][0] = True
     client.putGameJoystickData(data)
-    hakopy.usleep(500000)
+    transport.usleep(500000)
     data['button'][0] = False
     client.putGameJoystickData(data)
 
-def api_send_and_wait(command):
+def api_send_and_wait(transport, command):
     ret = command.write()
     if ret == False:
         print('"ERROR: hako_asset_pdu_write')
@@ -40,15 +42,94 @@ def api_send_and_wait(command):
             print('DONE')
             break
         #print("result: ",  pdu['header']['result'])
-        hakopy.usleep(30000)
+        transport.usleep(30000)
     return True
 
-def api_takeoff(client, height):
+def api_takeoff(client, transport, height):
+    import pdu_info
     # do takeoff
     print("INFO: API TAKEOFF")
     command, pdu_cmd = client.get_packet(pdu_info.HAKO_AVATOR_CHANNEL_ID_CMD_TAKEOFF, client.get_vehicle_name(client.default_drone_name))
     pdu_cmd['height'] = height
     pdu_cmd['speed'] = 5
     pdu_cmd['yaw_deg'] = client._get_yaw_degree(client.default_drone_name)
-    api_send_and_wait(command)
+    api_send_and_wait(transport, command)
+
+
+class JoystickDroneExecutor(IDroneExecutor):
+    """
+    Base class of the executors that drive the drone through the joystick PDU.
+
+    Signals are mapped to joystick axes by the AXIS_MAPPING_TABLE entry of
+    mapping_type, one block at a time. The joystick PDU is read once into a
+    persistent buffer; put_axes() updates only the axes that changed and skips
+    the PDU write when nothing changed.
+    """
+    def __init__(self, client, logger, transport, mapping_type, mapping_params=None):
+        self.client = client
+        self.logger = logger
+        self.transport = transport
+        self.mapping_type = mapping_type
+        self.mapping_params = mapping_params if mapping_params is not None else {}
+        self.axis_mappings = {}
+        self.joystick_data = None
+        self.joystick_axis = None
+        self.joystick_writes = 0
+        self.skipped_joystick_writes = 0
+        self.columns = ["timestamp"]
+
+    def set_columns(self, columns):
+        """Sets the input log columns ('timestamp' followed by the logged inputs)."""
+        self.columns = columns
+        self.logger.set_columns(columns)
+
+    def input_columns(self):
+        return self.columns[1:]
+
+    def get_axis_mapping(self, channel_num):
+        axis_mapping = self.axis_mappings.get(channel_num)
+        if axis_mapping is None:
+            axis_mapping = create_axis_mapping(self.mapping_type, channel_num, self.mapping_params)
+            self.axis_mappings[channel_num] = axis_mapping
+        return axis_mapping
+
+    def map_signals(self, signal_block):
+        return self.get_axis_mapping(signal_block.shape[0]).apply(signal_block)
+
+    def map_step_signals(self, signals):
+        return self.get_axis_mapping(len(signals)).apply_step(signals)
+
+    def input_values(self, axis_row):
+        return axis_row[JOYSTICK_AXIS_NUM:]
+
+    def run(self, simulation_time, axis_row):
+        self.put_axes(axis_row)
+        self.logger.log(simulation_time, *axis_row[JOYSTICK_AXIS_NUM:])
+
+    def reload_joystick(self):
+        """Reads the current joystick PDU into the buffer."""
+        data = self.client.getGameJoystickData()
+        data['axis'] = list(data['axis'])
+        data['button'] = list(data['button'])
+        self.joystick_data = data
+        self.joystick_axis = data['axis']
+
+    def put_axes(self, axis_values):
+        """
+        Writes axis_values[i] to axis i (i < JOYSTICK_AXIS_NUM), and the PDU only if one of them changed.
 
+        Returns:
+        bool: True if the PDU was written.
+        """
+        if self.joystick_data is None:
+            self.reload_joystick()
+        axis = self.joystick_axis
+        values = axis_values[:JOYSTICK_AXIS_NUM]
+        changed = values != axis[:JOYSTICK_AXIS_NUM]
+        if changed:
+            axis[:JOYSTICK_AXIS_NUM] = values
+            self.client.putGameJoystickData(self.joystick_data)
+            self.joystick_writes += 1
+        else:
+            self.skipped_joystick_writes += 1
+        return changed
@@ -0,0 +1,211 @@
+import math
+from drone_evaluation.components.isimulation_monitor import ISimulationMonitor
+from drone_evaluation.components.impl.pose_reader import PoseAxisReader
+from drone_evaluation.components.phase import lag_degree
+
+class SingleBinDFT:
+    """
+    Running single-bin DFT of a signal at a known frequency.
+
+    Accumulates sum(x * exp(-j*w*t)), sum(x), sum(exp(-j*w*t)) and the sample
+    count, so the mean-removed bin (as in FFTAnalyzer.perform_fft) can be
+    evaluated at any time in O(1).
+    """
+    def __init__(self):
+        self.count = 0
+        self.sum_value = 0.0
+        self.sum_basis = 0j
+        self.sum_product = 0j
+
+    def update(self, value, basis):
+        """
+        Parameters:
+        value (float): Sample.
+        basis (complex): exp(-j*w*t) at the sample time.
+        """
+        self.count += 1
+        self.sum_value += value
+        self.sum_basis += basis
+        self.sum_product += value * basis
+
+    def bin(self):
+        """
+        Returns:
+        complex: DFT bin of the mean-removed signal, scaled to amplitude (2/N).
+        """
+        if self.count == 0:
+            return 0j
+        mean = self.sum_value / self.count
+        return 2.0 * (self.sum_product - mean * self.sum_basis) / self.count
+
+def wrap_degree(angle):
+    """Wraps an angle in degrees to (-180, 180] (for differences between phase estimates)."""
+    angle = math.fmod(angle, 360.0)
+    if angle > 180.0:
+        angle -= 360.0
+    elif angle <= -180.0:
+        angle += 360.0
+    return angle
+
+def bin_gain_phase(input_bin, output_bin):
+    """
+    Returns:
+    (float, float): Gain in dB and phase difference in degrees of two DFT bins (NaN if a bin is 0),
+    the phase as a lag like freq_evaluator.py (see lag_degree).
+    """
+    if input_bin == 0j or output_bin == 0j:
+        return math.nan, math.nan
+    ratio = output_bin / input_bin
+    return 20 * math.log10(abs(ratio)), lag_degree(math.degrees(math.atan2(ratio.imag, ratio.real)))
+
+class FreqResponseMonitor(ISimulationMonitor):
+    """
+    Estimates the gain and phase at freq_evaluation.freq while the simulation runs.
+
+    The input (input_data.axis) and output (output_data.axis, read from the vehicle
+    pose) are correlated with sin/cos at the commanded frequency from
+    freq_evaluation.start_time on. The result is written in the freq_evaluator.py
+    output format, so no post-processing pass over the logs is needed.
+
+    With online.adaptive, the gain and phase of every full cycle are estimated as
+    well, and the segment ends once the estimates of the last 'cycles' cycles agree
+    within the tolerances; the configured duration stays the upper bound.
+    """
+    def __init__(self, evaluation_params, input_columns):
+        freq_evaluation = evaluation_params['freq_evaluation']
+        online_params = freq_evaluation.get('online', {})
+        input_axis = evaluation_params['input_data']['axis']
+        if input_axis not in input_columns:
+            raise ValueError(f"input_data.axis {input_axis} is not an input column: {input_columns}")
+        self.input_index = input_columns.index(input_axis)
+        self.output_reader = PoseAxisReader(evaluation_params['output_data']['axis'])
+        self.freq = freq_evaluation['freq']
+        self.omega = 2.0 * math.pi * self.freq
+        self.start_time_usec = int(freq_evaluation['start_time'] * 1000000)
+        self.input_sign = -1.0 if freq_evaluation.get('input_inverse', False) else 1.0
+        self.output_sign = -1.0 if freq_evaluation.get('output_inverse', False) else 1.0
+        self.result_file = online_params.get('result_file', 'freq_result.csv')
+        # running estimate printed every report_interval_sec of simulation time (None: off)
+        self.report_interval_usec = None
+        if online_params.get('report_interval_sec'):
+            self.report_interval_usec = int(online_params['report_interval_sec'] * 1000000)
+        self.next_report_usec = None
+        self.input_dft = SingleBinDFT()
+        self.output_dft = SingleBinDFT()
+
+        adaptive_params = online_params.get('adaptive')
+        self.adaptive = adaptive_params is not None
+        if self.adaptive:
+            self.stable_cycles = int(adaptive_params.get('cycles', 5))
+            self.gain_tolerance_db = adaptive_params.get('gain_tolerance_db', 0.1)
+            self.phase_tolerance_deg = adaptive_params.get('phase_tolerance_deg', 1.0)
+            self.stats_file = adaptive_params.get('stats_file', 'adaptive_sweep.csv')
+        self.period_usec = 1000000 / self.freq
+        self.cycle_index = 0
+        self.cycle_input_dft = SingleBinDFT()
+        self.cycle_output_dft = SingleBinDFT()
+        # (gain, phase) of the recent full cycles
+        self.cycle_estimates = []
+        self.segment_end_usec = None
+        self.stop_requested = False
+        self.stop_time_usec = None
+        self.saved_sec = 0.0
+
+    def start_segment(self, signal_name, signal_generators, start_time_usec, duration_sec):
+        self.segment_end_usec = start_time_usec + int(duration_sec * 1000000)
+
+    def update(self, simulation_time_usec, inputs, pose):
+        output_value = self.output_reader.read(simulation_time_usec, pose)
+        if output_value is None or simulation_time_usec < self.start_time_usec:
+            return
+        input_basis = self._basis(simulation_time_usec)
+        # a velocity output refers to the midpoint of its pose difference, not to the input time
+        output_basis = self._basis(self.output_reader.sample_time_usec)
+        input_value = self.input_sign * inputs[self.input_index]
+        output_value = self.output_sign * output_value / self._difference_gain()
+        self.input_dft.update(input_value, input_basis)
+        self.output_dft.update(output_value, output_basis)
+        if self.adaptive and self.stop_time_usec is None:
+            self._update_cycle(simulation_time_usec, input_value, output_value, input_basis, output_basis)
+        if self.report_interval_usec is not None:
+            if self.next_report_usec is None:
+                self.next_report_usec = simulation_time_usec + self.report_interval_usec
+            elif simulation_time_usec >= self.next_report_usec:
+                self.next_report_usec += self.report_interval_usec
+                gain, phase, _, _ = self.estimate()
+                print(f"INFO: online freq response at {simulation_time_usec / 1000000:.3f} s: gain {gain:.2f} dB, phase {phase:.2f} deg")
+
+    def _basis(self, simulation_time_usec):
+        angle = self.omega * (simulation_time_usec - self.start_time_usec) / 1000000
+        return complex(math.cos(angle), -math.sin(angle))
+
+    def _difference_gain(self):
+        # a pose difference is the mean velocity over its interval, which scales a sine
+        # at omega by sin(x) / x with x = omega * interval / 2
+        x = self.omega * self.output_reader.sample_interval_usec / 2000000
+        if x == 0.0 or math.sin(x) <= 0.0:
+            return 1.0
+        return math.sin(x) / x
+
+    def _update_cycle(self, simulation_time_usec, input_value, output_value, input_basis, output_basis):
+        if simulation_time_usec - self.start_time_usec >= (self.cycle_index + 1) * self.period_usec:
+            # a full cycle has been accumulated
+            self.cycle_estimates.append(bin_gain_phase(self.cycle_input_dft.bin(), self.cycle_output_dft.bin()))
+            self.cycle_estimates = self.cycle_estimates[-self.stable_cycles:]
+            self.cycle_index += 1
+            self.cycle_input_dft = SingleBinDFT()
+            self.cycle_output_dft = SingleBinDFT()
+            if self._is_stable():
+                self.stop_requested = True
+                self.stop_time_usec = simulation_time_usec
+                return
+        self.cycle_input_dft.update(input_value, input_basis)
+        self.cycle_output_dft.update(output_value, output_basis)
+
+    def _is_stable(self):
+        if len(self.cycle_estimates) < self.stable_cycles:
+            return False
+        gains = [gain for gain, _ in self.cycle_estimates]
+        if any(math.isnan(gain) for gain in gains) or max(gains) - min(gains) > self.gain_tolerance_db:
+            return False
+        # phases relative to the latest cycle, so that the spread is not affected by wrapping
+        latest_phase = self.cycle_estimates[-1][1]
+        phase_diffs = [wrap_degree(phase - latest_phase) for _, phase in self.cycle_estimates]
+        return max(phase_diffs) - min(phase_diffs) <= self.phase_tolerance_deg
+
+    def should_stop(self):
+        return self.stop_requested
+
+    def end_segment(self, simulation_time_usec):
+        if self.stop_requested:
+            self.stop_requested = False
+            self.saved_sec = max(self.segment_end_usec - simulation_time_usec, 0) / 1000000
+
+    def estimate(self):
+        """
+        Returns:
+        (float, float, float, float): Gain in dB, phase difference, input phase and
+        output phase in degrees (NaN before any sample).
+        """
+        input_bin = self.input_dft.bin()
+        output_bin = self.output_dft.bin()
+        gain, phase = bin_gain_phase(input_bin, output_bin)
+        if math.isnan(gain):
+            return math.nan, math.nan, math.nan, math.nan
+        input_phase = math.degrees(math.atan2(input_bin.imag, input_bin.real))
+        output_phase = math.degrees(math.atan2(output_bin.imag, output_bin.real))
+        return gain, phase, input_phase, output_phase
+
+    def report(self):
+        gain, phase, input_phase, output_phase = self.estimate()
+        line = f"{self.freq}, {math.log10(self.freq):.2f}, {gain:.2f}, {phase:.2f}, {input_phase:.2f}, {output_phase:.2f}"
+        print(f"INFO: online freq response ({self.input_dft.count} samples): {line}")
+        with open(self.result_file, 'w') as f:
+            f.write(line + "\n")
+        if self.adaptive:
+            stopped = self.stop_time_usec is not None
+            cycles = self.cycle_index
+            print(f"INFO: adaptive sweep: freq {self.freq} Hz, cycles used: {cycles}, "
+                  f"{'converged' if stopped else 'not converged'}, saved: {self.saved_sec:.3f} s")
+            with open(self.stats_file, 'w') as f:
+                f.write(f"{self.freq}, {cycles}, {int(stopped)}, {self.saved_sec:.3f}\n")
@@ -0,0 +1,57 @@
+import os
+import hakosim
+import hakopy
+import pdu_info
+import hako_pdu
+from drone_evaluation.components.ihako_transport import IHakoTransport
+
+class HakoTransport(IHakoTransport):
+    def asset_register(self, asset_name, pdu_config_path, callback, delta_time_usec):
+        self.delta_time_usec = delta_time_usec
+        return hakopy.asset_register(asset_name, pdu_config_path, callback, delta_time_usec, hakopy.HAKO_ASSET_MODEL_PLANT)
+
+    def start(self):
+        return hakopy.start()
+
+    def usleep(self, usec):
+        return hakopy.usleep(usec)
+
+    def wait_stop(self):
+        # hakopy.usleep() returns False once the simulation is no longer running
+        while hakopy.usleep(self.delta_time_usec):
+            pass
+
+    def reset(self):
+        # the conductor reset (hako-cmd reset) restores the simulation time and the drone
+        pass
+
+    def simulation_time(self):
+        return hakopy.simulation_time()
+
+    def create_client(self, pdu_config_path, drone_name):
+        client = hakosim.MultirotorClient(pdu_config_path, drone_name)
+        client.default_drone_name = drone_name
+        hako_binary_path = os.getenv('HAKO_BINARY_PATH', '/usr/local/lib/hakoniwa/hako_binary/offset')
+        client.pdu_manager = hako_pdu.HakoPduManager(hako_binary_path, pdu_config_path)
+        client.enableApiControl(True)
+        client.armDisarm(True)
+        return client
+
+    def create_pdu(self, robot_name, pdu_config_path):
+        hako_binary_path = os.getenv('HAKO_BINARY_PATH', '/usr/local/lib/hakoniwa/hako_binary/offset')
+        pdu_manager = hako_pdu.HakoPduManager(hako_binary_path, pdu_config_path)
+
+        pdu_channels = [
+            pdu_info.HAKO_AVATOR_CHANNLE_ID_COLLISION,
+            pdu_info.HAKO_AVATOR_CHANNEL_ID_DISTURB,
+            pdu_info.HAKO_AVATOR_CHANNEL_ID_CAMERA_DATA,
+            pdu_info.HAKO_AVATOR_CHANNEL_ID_CAMERA_INFO,
+            pdu_info.HAKO_AVATOR_CHANNEL_ID_LIDAR_DATA,
+            pdu_info.HAKO_AVATOR_CHANNEL_ID_LIDAR_POS,
+            pdu_info.HAKO_AVATOR_CHANNEL_ID_STAT_MAG,
+        ]
+
+        for channel in pdu_channels:
+            pdu = pdu_manager.get_pdu(robot_name, channel)
+            _ = pdu.get()
+            pdu.write()
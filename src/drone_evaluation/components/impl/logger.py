@@ -1,8 +1,12 @@
 import pandas as pd
 import os
+import time
+import json
+from drone_evaluation.components.impl.async_log_writer import FlushStats
+from drone_evaluation.components.impl.binary_logger import BinaryLogger, export_csv
 
 class Logger:
-    def __init__(self, filename='in.csv', cache_len=1024):
+    def __init__(self, filename='in.csv', cache_len=1024, async_write=False, queue_len=4):
         self.data_cache = []
         self.filename = filename
         # ファイルが存在していたら削除する
@@ -10,29 +14,175 @@ class Logger:
             os.remove(self.filename)
         self.cache_len = cache_len  # キャッシュサイズを設定
         self.columns = ["timestamp", "value"]  # デフォルトのカラム名を設定
+        # 非同期モードでは、CSVへの変換（pandas が GIL を保持する）を制御ループの間に行わないよう、
+        # BinaryLogger でバイナリのブロックとして書き込みスレッドに渡し、save() でCSVに変換する
+        self.spool = None
+        if async_write:
+            self.spool = BinaryLogger(filename=spool_filename(self.filename), cache_len=cache_len, async_write=True, queue_len=queue_len)
+            self.flush_stats = self.spool.flush_stats
+        else:
+            self.flush_stats = FlushStats()
 
     def set_columns(self, columns):
         """カラム名を設定するメソッド"""
         self.columns = columns
+        if self.spool is not None:
+            self.spool.set_columns(columns)
 
     def log(self, *values):
         """ログに複数の値を記録する"""
+        if self.spool is not None:
+            self.spool.log(*values)
+            return
         if len(values) != len(self.columns):
             raise ValueError(f"Expected {len(self.columns)} values, but got {len(values)}")
         self.data_cache.append(values)
         
         # キャッシュサイズを超えたら保存
         if len(self.data_cache) >= self.cache_len:
+            start = time.perf_counter()
             self.save()
+            self.flush_stats.add_flush(time.perf_counter() - start)
             self.data_cache = []  # キャッシュをクリア
 
+    def _export_spool(self):
+        """バイナリのブロックをCSVに変換する"""
+        export_csv(self.spool.filename, self.filename)
+
     def save(self):
         """キャッシュをCSVに保存する"""
+        if self.spool is not None:
+            # 書き込みスレッドのキューを全て書き出してから、CSVに変換してバイナリを削除する
+            self.spool.save()
+            self._export_spool()
+            os.remove(self.spool.filename)
+            return
         df = pd.DataFrame(self.data_cache, columns=self.columns)
         df.to_csv(self.filename, mode='a', header=not pd.io.common.file_exists(self.filename), index=False)
 
     def flush(self):
         """強制的に現在のキャッシュを保存する"""
+        if self.spool is not None:
+            self.spool.flush()
+            self._export_spool()
+            return
         if self.data_cache:
             self.save()
             self.data_cache = []  # キャッシュをクリア
+
+def spool_filename(filename):
+    """非同期モードのCSVログが実行中に書き込むバイナリファイルのファイル名を返す"""
+    return filename + '.spool.npy'
+
+def log_metadata_filename(filename):
+    """ログのメタデータ（サイドカーファイル）のファイル名を返す"""
+    return filename + '.meta.json'
+
+class DecimatingLogger:
+    """
+    Logs one row per decimation window to an underlying Logger or BinaryLogger.
+
+    Without envelope, the first sample of every window is logged as is. With
+    envelope, each value column holds the window mean, followed by <column>_min
+    and <column>_max, and the timestamp is the window center so that the mean
+    is not delayed.
+
+    save() writes the decimation metadata next to the log
+    (log_metadata_filename()), which the evaluators use for the effective
+    sample spacing.
+    """
+    def __init__(self, logger, decimation=1, envelope=False):
+        if int(decimation) < 1:
+            raise ValueError(f"decimation must be >= 1, but got {decimation}")
+        self.logger = logger
+        self.filename = logger.filename
+        self.decimation = int(decimation)
+        self.envelope = envelope
+        self.flush_stats = logger.flush_stats
+        metadata_file = log_metadata_filename(self.filename)
+        if os.path.exists(metadata_file):
+            os.remove(metadata_file)
+        self.source_rows = 0
+        self.rows = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.window_count = 0
+        self.set_columns(["timestamp", "value"])
+
+    def set_columns(self, columns):
+        """カラム名を設定するメソッド"""
+        self.source_columns = columns
+        if self.envelope:
+            self.columns = [columns[0]]
+            for column in columns[1:]:
+                self.columns += [column, f"{column}_min", f"{column}_max"]
+        else:
+            self.columns = columns
+        self.logger.set_columns(self.columns)
+
+    def log(self, *values):
+        """ログに複数の値を記録する（decimation 行ごとに1行）"""
+        if len(values) != len(self.source_columns):
+            raise ValueError(f"Expected {len(self.source_columns)} values, but got {len(values)}")
+        self.source_rows += 1
+        if self.window_count == 0:
+            self.window_first = values
+            if self.envelope:
+                self.window_sums = list(values[1:])
+                self.window_mins = list(values[1:])
+                self.window_maxs = list(values[1:])
+        elif self.envelope:
+            for i, value in enumerate(values[1:]):
+                self.window_sums[i] += value
+                if value < self.window_mins[i]:
+                    self.window_mins[i] = value
+                elif value > self.window_maxs[i]:
+                    self.window_maxs[i] = value
+        self.window_last_timestamp = values[0]
+        self.window_count += 1
+        if self.window_count >= self.decimation:
+            self._log_window()
+
+    def _log_window(self):
+        if self.envelope:
+            timestamp = (self.window_first[0] + self.window_last_timestamp) // 2
+            row = [timestamp]
+            for i in range(len(self.window_sums)):
+                row += [self.window_sums[i] / self.window_count, self.window_mins[i], self.window_maxs[i]]
+        else:
+            timestamp = self.window_first[0]
+            row = self.window_first
+        self.logger.log(*row)
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        self.rows += 1
+        self.window_count = 0
+
+    def metadata(self):
+        """デシメーションのメタデータを返す"""
+        sample_spacing_usec = None
+        if self.rows > 1:
+            sample_spacing_usec = (self.last_timestamp - self.first_timestamp) / (self.rows - 1)
+        return {
+            "decimation": self.decimation,
+            "envelope": self.envelope,
+            "timestamp": "window_center" if self.envelope else "window_start",
+            "columns": self.columns,
+            "source_columns": self.source_columns,
+            "rows": self.rows,
+            "source_rows": self.source_rows,
+            "sample_spacing_usec": sample_spacing_usec
+        }
+
+    def flush(self):
+        """強制的に現在のキャッシュを保存する（途中のウィンドウは保持する）"""
+        self.logger.flush()
+
+    def save(self):
+        """途中のウィンドウを含めて保存し、メタデータを書き出す"""
+        if self.window_count > 0:
+            self._log_window()
+        self.logger.save()
+        with open(log_metadata_filename(self.filename), 'w') as f:
+            json.dump(self.metadata(), f, indent=2)
@@ -0,0 +1,78 @@
+import math
+
+# drone_dynamics.csv axes (NED frame) computed from the vehicle pose (ROS frame)
+#   (source, index, sign): sign * position[index] or sign * euler angle[index] (roll, pitch, yaw)
+# velocities are the finite differences of the positions, stamped at the midpoint of the two poses
+POSE_AXES = {
+    'X':  ('position', 0, 1.0),
+    'Y':  ('position', 1, -1.0),
+    'Z':  ('position', 2, -1.0),
+    'Rx': ('euler', 0, 1.0),
+    'Ry': ('euler', 1, -1.0),
+    'Rz': ('euler', 2, -1.0),
+    'Vx': ('velocity', 0, 1.0),
+    'Vy': ('velocity', 1, -1.0),
+    'Vz': ('velocity', 2, -1.0),
+}
+
+def quaternion_to_euler(q):
+    """
+    Converts a quaternion (w_val, x_val, y_val, z_val) to (roll, pitch, yaw) in radians.
+    """
+    sinr_cosp = 2.0 * (q.w_val * q.x_val + q.y_val * q.z_val)
+    cosr_cosp = 1.0 - 2.0 * (q.x_val * q.x_val + q.y_val * q.y_val)
+    roll = math.atan2(sinr_cosp, cosr_cosp)
+    sinp = 2.0 * (q.w_val * q.y_val - q.z_val * q.x_val)
+    pitch = math.copysign(math.pi / 2, sinp) if abs(sinp) >= 1.0 else math.asin(sinp)
+    siny_cosp = 2.0 * (q.w_val * q.z_val + q.x_val * q.y_val)
+    cosy_cosp = 1.0 - 2.0 * (q.y_val * q.y_val + q.z_val * q.z_val)
+    yaw = math.atan2(siny_cosp, cosy_cosp)
+    return roll, pitch, yaw
+
+def _position(pose, index):
+    position = pose.position
+    return (position.x_val, position.y_val, position.z_val)[index]
+
+class PoseAxisReader:
+    """
+    Reads one drone_dynamics.csv axis (e.g. 'Z', 'Vz', 'Rx') from the vehicle pose.
+
+    sample_time_usec is the time the last value refers to: the simulation time of
+    the pose, or for a velocity the midpoint between the two poses it is the
+    difference of. A backward difference stamped at the later pose would lag by
+    half a step (omega * dt / 2 in phase). sample_interval_usec is the time between
+    those two poses (0 for positions and angles), over which a difference averages.
+    """
+    def __init__(self, axis):
+        if axis not in POSE_AXES:
+            raise ValueError(f"Unsupported pose axis: {axis}")
+        self.axis = axis
+        self.source, self.index, self.sign = POSE_AXES[axis]
+        self.last_time_usec = None
+        self.last_position = None
+        self.sample_time_usec = None
+        self.sample_interval_usec = 0
+
+    def read(self, simulation_time_usec, pose):
+        """
+        Returns:
+        float: The axis value, or None for a velocity axis until two poses have been read.
+        """
+        if self.source == 'position':
+            self.sample_time_usec = simulation_time_usec
+            return self.sign * _position(pose, self.index)
+        if self.source == 'euler':
+            self.sample_time_usec = simulation_time_usec
+            return self.sign * quaternion_to_euler(pose.orientation)[self.index]
+        position = _position(pose, self.index)
+        value = None
+        if self.last_time_usec is not None and simulation_time_usec > self.last_time_usec:
+            value = self.sign * (position - self.last_position) * 1000000 / (simulation_time_usec - self.last_time_usec)
+            self.sample_time_usec = (self.last_time_usec + simulation_time_usec) / 2
+            self.sample_interval_usec = simulation_time_usec - self.last_time_usec
+        elif self.last_time_usec is not None:
+            return self.last_value
+        self.last_time_usec = simulation_time_usec
+        self.last_position = position
+        self.last_value = value
+        return value
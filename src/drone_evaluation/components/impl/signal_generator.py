@@ -1,3 +1,5 @@
+import math
+import functools
 import numpy as np
 from scipy.signal import chirp
 from drone_evaluation.components.isignal_generator import ISignalGenerator
@@ -7,29 +9,116 @@ class SineSignalGenerator(ISignalGenerator):
         self.frequency = frequency
         self.amp = amp
         self.offset = offset
+        self.start_phase = 0.0
 
-    def generate_signal(self, interval, total_time):
-        time_points = np.arange(0, total_time, interval)
+    def evaluate(self, time_points, total_time):
         period = 1 / self.frequency
-        sine_values = self.amp * np.sin(2 * np.pi * time_points / period) + self.offset
-        return sine_values.tolist()
+        return self.amp * np.sin(2 * np.pi * time_points / period + self.start_phase) + self.offset
+
+    def value_at(self, time_sec, total_time):
+        return self.amp * math.sin(2 * math.pi * self.frequency * time_sec + self.start_phase) + self.offset
+
+    def phase_at(self, time_sec, total_time):
+        return 2 * math.pi * self.frequency * time_sec + self.start_phase
+
+    def set_start_phase(self, phase_rad):
+        self.start_phase = phase_rad
 
 class ChirpSignalGenerator(ISignalGenerator):
-    def __init__(self, chirp_f0=0.0, chirp_f1=1.0, offset=0.0):
+    def __init__(self, chirp_f0=0.0, chirp_f1=1.0, offset=0.0, method='linear'):
+        if method not in ['linear', 'logarithmic']:
+            raise ValueError(f"Unsupported chirp method: {method}")
+        if method == 'logarithmic' and (chirp_f0 <= 0 or chirp_f1 <= 0):
+            raise ValueError("logarithmic chirp requires chirp_f0 > 0 and chirp_f1 > 0")
         self.chirp_f0 = chirp_f0
         self.chirp_f1 = chirp_f1
         self.offset = offset
+        self.method = method
+        # scipy's chirp is a cosine: sin(phase + pi/2)
+        self.start_phase = math.pi / 2
+
+    def evaluate(self, time_points, total_time):
+        phi_deg = math.degrees(self.start_phase - math.pi / 2)
+        return chirp(time_points, f0=self.chirp_f0, f1=self.chirp_f1, t1=total_time, method=self.method, phi=phi_deg) + self.offset
 
-    def generate_signal(self, interval, total_time):
-        time_points = np.arange(0, total_time, interval)
-        chirp_values = chirp(time_points, f0=self.chirp_f0, f1=self.chirp_f1, t1=total_time, method='linear') + self.offset
-        return chirp_values.tolist()
+    def value_at(self, time_sec, total_time):
+        return math.sin(self.phase_at(time_sec, total_time)) + self.offset
+
+    def phase_at(self, time_sec, total_time):
+        if self.method == 'logarithmic' and self.chirp_f0 != self.chirp_f1:
+            log_ratio = math.log(self.chirp_f1 / self.chirp_f0)
+            return 2 * math.pi * self.chirp_f0 * total_time / log_ratio * (math.exp(time_sec * log_ratio / total_time) - 1) + self.start_phase
+        beta = (self.chirp_f1 - self.chirp_f0) / total_time
+        return 2 * math.pi * (self.chirp_f0 * time_sec + 0.5 * beta * time_sec * time_sec) + self.start_phase
+
+    def set_start_phase(self, phase_rad):
+        self.start_phase = phase_rad
 
 class StepSignalGenerator(ISignalGenerator):
     def __init__(self, offset=0.0):
         self.offset = offset
 
-    def generate_signal(self, interval, total_time):
-        time_points = np.arange(0, total_time, interval)
-        step_values = np.full_like(time_points, self.offset)
-        return step_values.tolist()
+    def evaluate(self, time_points, total_time):
+        return np.full(len(time_points), self.offset, dtype=np.float64)
+
+    def value_at(self, time_sec, total_time):
+        return self.offset
+
+def schroeder_phases(tone_num):
+    """
+    Schroeder phases of tone_num equal-amplitude tones, which keep the crest factor low.
+    """
+    k = np.arange(1, tone_num + 1)
+    return -np.pi * k * (k - 1) / tone_num
+
+# samples per period of the fastest tone used to find the peak of a multisine
+MULTISINE_PEAK_OVERSAMPLING = 16
+MULTISINE_PEAK_MAX_SAMPLES = 1 << 22
+
+@functools.lru_cache(maxsize=16)
+def multisine_peak(frequencies, period):
+    """
+    Peak of one period of the unit-amplitude Schroeder multisine (shared by all channels).
+    """
+    phases = schroeder_phases(len(frequencies))
+    samples = int(period * frequencies[-1] * MULTISINE_PEAK_OVERSAMPLING)
+    samples = min(max(samples, 1024), MULTISINE_PEAK_MAX_SAMPLES)
+    peak = 0.0
+    for start in range(0, samples, 1 << 16):
+        time_points = np.arange(start, min(start + (1 << 16), samples)) * (period / samples)
+        values = np.zeros(len(time_points))
+        for frequency, phase in zip(frequencies, phases):
+            values += np.sin(2 * np.pi * frequency * time_points + phase)
+        peak = max(peak, np.max(np.abs(values)))
+    return peak
+
+class MultisineSignalGenerator(ISignalGenerator):
+    """
+    Sum of sines at frequencies that are integer multiples of base_freq, with
+    Schroeder phases. The signal is periodic with period 1 / base_freq, and
+    the tone amplitudes are scaled so that the peak of one period is amp.
+    """
+    def __init__(self, frequencies, amp=1.0, offset=0.0, base_freq=None):
+        self.frequencies = np.asarray(sorted(frequencies), dtype=np.float64)
+        if len(self.frequencies) == 0 or self.frequencies[0] <= 0:
+            raise ValueError("multisine requires positive frequencies")
+        self.base_freq = base_freq if base_freq is not None else self.frequencies[0]
+        harmonics = self.frequencies / self.base_freq
+        if np.any(np.abs(harmonics - np.round(harmonics)) > 1e-6):
+            raise ValueError(f"multisine frequencies must be integer multiples of base_freq {self.base_freq}")
+        self.period = 1 / self.base_freq
+        self.phases = schroeder_phases(len(self.frequencies))
+        self.offset = offset
+        self.tone_amp = amp / multisine_peak(tuple(self.frequencies), self.period)
+
+    def evaluate(self, time_points, total_time):
+        values = np.full(len(time_points), self.offset, dtype=np.float64)
+        for frequency, phase in zip(self.frequencies, self.phases):
+            values += self.tone_amp * np.sin(2 * np.pi * frequency * time_points + phase)
+        return values
+
+    def value_at(self, time_sec, total_time):
+        value = self.offset
+        for frequency, phase in zip(self.frequencies, self.phases):
+            value += self.tone_amp * math.sin(2 * math.pi * frequency * time_sec + phase)
+        return value
@@ -0,0 +1,147 @@
+import math
+from drone_evaluation.components.isimulation_monitor import ISimulationMonitor
+from drone_evaluation.components.impl.pose_reader import PoseAxisReader
+
+# same defaults as step_evaluator.EvaluationParameters
+STEP_METRICS_DEFAULT_PARAMS = {
+    "RISE_TIME_10_PERCENT": 0.1,
+    "RISE_TIME_90_PERCENT": 0.9,
+    "DELAY_TIME_PERCENT": 0.5,
+    "SETTLING_TIME_PERCENT": 0.05,
+}
+
+class StepMetricsTracker:
+    """
+    Incremental step response metrics (rise time, delay time, overshoot and
+    settling time), updated in O(1) per sample.
+
+    The steady-state value is not known while the simulation runs, so the
+    thresholds are relative to target_value; step_evaluator.py uses the mean of
+    the last samples instead. Otherwise the definitions follow step_evaluator.py:
+    a decreasing response is mirrored around its initial value, and times are
+    measured from the first sample.
+    """
+    def __init__(self, target_value, params=None):
+        self.params = STEP_METRICS_DEFAULT_PARAMS.copy()
+        if params:
+            self.params.update(params)
+        self.target_value = target_value
+        self.start_time_sec = None
+        self.initial_value = None
+        self.is_increase = True
+        self.final_value = target_value
+        self.settling_band = 0.0
+        self.max_value = None
+        self.rise_time_start = None
+        self.rise_time_end = None
+        self.delay_time = None
+        self.settled_since = None
+        self.last_time_sec = None
+
+    def update(self, time_sec, value):
+        if self.start_time_sec is None:
+            self.start_time_sec = time_sec
+            self.initial_value = value
+            self.is_increase = self.target_value > value
+            self.final_value = self.target_value if self.is_increase else value - self.target_value
+            self.settling_band = abs(self.final_value * self.params['SETTLING_TIME_PERCENT'])
+            self.max_value = -math.inf
+        t = time_sec - self.start_time_sec
+        y = value if self.is_increase else self.initial_value - value
+        self.last_time_sec = t
+
+        if self.rise_time_start is None and y >= self.final_value * self.params['RISE_TIME_10_PERCENT']:
+            self.rise_time_start = t
+        if self.rise_time_end is None and y >= self.final_value * self.params['RISE_TIME_90_PERCENT']:
+            self.rise_time_end = t
+        if self.delay_time is None and y >= self.final_value * self.params['DELAY_TIME_PERCENT']:
+            self.delay_time = t
+        if y > self.max_value:
+            self.max_value = y
+        if abs(y - self.final_value) <= self.settling_band:
+            if self.settled_since is None:
+                self.settled_since = t
+        else:
+            self.settled_since = None
+
+    def settled_duration(self):
+        """
+        Returns:
+        float: Time in seconds the response has stayed inside the settling band (0 if outside).
+        """
+        if self.settled_since is None:
+            return 0.0
+        return self.last_time_sec - self.settled_since
+
+    def metrics(self):
+        """
+        Returns:
+        dict: rise_time, delay_time, overshoot and settling_time (None while not reached).
+        """
+        rise_time = None
+        if self.rise_time_start is not None and self.rise_time_end is not None:
+            rise_time = self.rise_time_end - self.rise_time_start
+        overshoot = None
+        if self.max_value is not None:
+            overshoot = max(self.max_value - self.final_value, 0.0) if self.is_increase else 0.0
+        return {
+            "rise_time": rise_time,
+            "delay_time": self.delay_time,
+            "overshoot": overshoot,
+            "settling_time": self.settled_since
+        }
+
+class StepResponseMonitor(ISimulationMonitor):
+    """
+    Tracks the step response metrics of evaluation.step_evaluation from the
+    vehicle pose, starting at EVALUATION_START_TIME.
+
+    With evaluation.step_evaluation.online.early_stop, the current segment ends
+    once the response has stayed inside the settling band for hold_time_sec.
+    """
+    def __init__(self, step_evaluation_params):
+        config_params = step_evaluation_params['config_params']
+        target_params = step_evaluation_params['target_params']
+        online_params = step_evaluation_params.get('online', {})
+        self.axis_reader = PoseAxisReader(config_params['AXIS'])
+        self.invert_axis = config_params.get('INVERT_AXIS', False)
+        self.convert_to_degree = config_params.get('CONVERT_TO_DEGREE', False)
+        self.evaluation_start_time_sec = config_params.get('EVALUATION_START_TIME', 0.0)
+        self.tracker = StepMetricsTracker(target_params['TARGET_VALUE'], {**config_params, **target_params})
+        self.early_stop = online_params.get('early_stop', False)
+        self.hold_time_sec = online_params.get('hold_time_sec', 5.0)
+        self.stopped = False
+        self.stop_requested = False
+
+    def start_segment(self, signal_name, signal_generators, start_time_usec, duration_sec):
+        pass
+
+    def update(self, simulation_time_usec, inputs, pose):
+        value = self.axis_reader.read(simulation_time_usec, pose)
+        if value is None:
+            return
+        time_sec = self.axis_reader.sample_time_usec / 1000000
+        if time_sec < self.evaluation_start_time_sec:
+            return
+        if self.invert_axis:
+            value = -value
+        if self.convert_to_degree:
+            value = math.degrees(value)
+        self.tracker.update(time_sec, value)
+        if self.early_stop and not self.stopped and self.tracker.settled_duration() >= self.hold_time_sec:
+            self.stop_requested = True
+
+    def should_stop(self):
+        return self.stop_requested
+
+    def end_segment(self, simulation_time_usec):
+        if self.stop_requested:
+            # stop only the segment in which the response settled
+            self.stopped = True
+            self.stop_requested = False
+
+    def report(self):
+        metrics = self.tracker.metrics()
+        values = ", ".join("-" if metrics[name] is None else f"{metrics[name]:.3f}"
+                           for name in ["rise_time", "delay_time", "overshoot", "settling_time"])
+        print(f"INFO: online step metrics (T_r, T_d, O_s, T_s): {values}")
@@ -0,0 +1,119 @@
+from drone_evaluation.components.ihako_transport import IHakoTransport
+from drone_evaluation.components.impl.drone_contants import UP_DOWN_AXIS
+
+JOYSTICK_AXIS_NUM = 6
+JOYSTICK_BUTTON_NUM = 15
+
+class VirtualVector3r:
+    def __init__(self, x_val=0.0, y_val=0.0, z_val=0.0):
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+
+class VirtualQuaternionr:
+    def __init__(self, w_val=1.0, x_val=0.0, y_val=0.0, z_val=0.0):
+        self.w_val = w_val
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+
+class VirtualPose:
+    def __init__(self, position=None, orientation=None):
+        self.position = position if position is not None else VirtualVector3r()
+        self.orientation = orientation if orientation is not None else VirtualQuaternionr()
+
+class VirtualMultirotorClient:
+    """
+    In-memory stand-in for hakosim.MultirotorClient.
+
+    The joystick and pose PDUs are kept in memory. There are no drone dynamics:
+    the pose follows the commanded UP_DOWN axis (ROS frame) so that
+    joystick_takeoff() terminates, which is all the benchmark needs.
+    """
+    def __init__(self, drone_name):
+        self.default_drone_name = drone_name
+        self.joystick_reads = 0
+        self.joystick_writes = 0
+        self.reset()
+
+    def reset(self):
+        self.axis = [0.0] * JOYSTICK_AXIS_NUM
+        self.button = [False] * JOYSTICK_BUTTON_NUM
+        self.pose = VirtualPose()
+
+    def enableApiControl(self, v):
+        return True
+
+    def armDisarm(self, v):
+        return True
+
+    def getGameJoystickData(self):
+        self.joystick_reads += 1
+        # a PDU read returns a fresh structure, like the real client
+        return {'axis': tuple(self.axis), 'button': tuple(self.button)}
+
+    def putGameJoystickData(self, data):
+        self.joystick_writes += 1
+        self.axis = list(data['axis'])
+        self.button = list(data['button'])
+        self.pose.position.z_val = -float(self.axis[UP_DOWN_AXIS])
+        return True
+
+    def simGetVehiclePose(self):
+        return self.pose
+
+class VirtualHakoTransport(IHakoTransport):
+    """
+    In-process virtual clock stand-in for hakopy.
+
+    start() runs the registered callbacks immediately, and usleep() advances the
+    simulation time in whole steps of the registered delta time without sleeping.
+    """
+    def __init__(self, start_time_usec=0):
+        self.start_time_usec = start_time_usec
+        self.time_usec = start_time_usec
+        self.delta_time_usec = 1
+        self.callback = None
+        self.clients = []
+        self.steps = 0
+
+    def asset_register(self, asset_name, pdu_config_path, callback, delta_time_usec):
+        self.callback = callback
+        self.delta_time_usec = max(int(delta_time_usec), 1)
+        return True
+
+    def start(self):
+        if self.callback is None:
+            print("ERROR: asset is not registered")
+            return False
+        self.callback['on_initialize'](None)
+        self.callback['on_manual_timing_control'](None)
+        return True
+
+    def usleep(self, usec):
+        # the simulation advances at least one step per sleep
+        steps = max(-(-int(usec) // self.delta_time_usec), 1)
+        self.time_usec += steps * self.delta_time_usec
+        self.steps += steps
+        return True
+
+    def wait_stop(self):
+        # nothing else runs the simulation: it can be reset right away
+        pass
+
+    def reset(self):
+        # like a conductor reset: the time and the drones restart from the initial state
+        self.time_usec = self.start_time_usec
+        for client in self.clients:
+            client.reset()
+
+    def simulation_time(self):
+        return self.time_usec
+
+    def create_client(self, pdu_config_path, drone_name):
+        client = VirtualMultirotorClient(drone_name)
+        self.clients.append(client)
+        return client
+
+    def create_pdu(self, robot_name, pdu_config_path):
+        pass
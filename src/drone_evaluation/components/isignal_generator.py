@@ -1,6 +1,65 @@
 from abc import ABC, abstractmethod
+import numpy as np
 
 class ISignalGenerator(ABC):
     @abstractmethod
-    def generate_signal(self, interval_sec, total_time_sec):
+    def evaluate(self, time_points, total_time_sec):
+        """
+        Evaluates the signal at the given time points.
+
+        Parameters:
+        time_points (numpy.ndarray): Time points in seconds from the start of the signal.
+        total_time_sec (float): Signal duration in seconds.
+
+        Returns:
+        numpy.ndarray: float64 array of the same length as time_points.
+        """
         pass
+
+    def value_at(self, time_sec, total_time_sec):
+        """
+        Evaluates the signal at a single time point (seconds from the start of the signal).
+
+        Returns:
+        float: Signal value.
+        """
+        return float(self.evaluate(np.array([time_sec]), total_time_sec)[0])
+
+    def phase_at(self, time_sec, total_time_sec):
+        """
+        Returns the phase (argument of sin, in radians) of the signal at time_sec,
+        or None if the signal has no phase.
+        """
+        return None
+
+    def set_start_phase(self, phase_rad):
+        """
+        Sets the phase (argument of sin, in radians) of the signal at time 0.
+        Signals without phase ignore it.
+        """
+        pass
+
+    def generate_signal(self, interval_sec, total_time_sec):
+        """
+        Generates the signal sampled every interval_sec from 0 to total_time_sec.
+
+        Returns:
+        numpy.ndarray: float64 array of len(np.arange(0, total_time_sec, interval_sec)) samples.
+        """
+        time_points = np.arange(0, total_time_sec, interval_sec)
+        return self.evaluate(time_points, total_time_sec)
+
+    def generate_chunks(self, interval_sec, total_time_sec, chunk_len):
+        """
+        Generates the same samples as generate_signal() in blocks of chunk_len samples.
+        Only one block is held in memory at a time; the last block may be shorter.
+
+        Yields:
+        numpy.ndarray: float64 array of at most chunk_len samples.
+        """
+        # same length as np.arange(0, total_time_sec, interval_sec)
+        n_steps = int(np.ceil(total_time_sec / interval_sec))
+        for start in range(0, n_steps, chunk_len):
+            stop = min(start + chunk_len, n_steps)
+            time_points = np.arange(start, stop) * interval_sec
+            yield self.evaluate(time_points, total_time_sec)
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+
+class ISimulationMonitor(ABC):
+    """
+    Observes the simulation step by step inside SimulationExecutor.run().
+    """
+    @abstractmethod
+    def start_segment(self, signal_name, signal_generators, start_time_usec, duration_sec):
+        """
+        Called before each signal_input_timings segment.
+
+        Parameters:
+        signal_name (str): Name of the segment's signal.
+        signal_generators (list): Signal generators of the segment, one per channel.
+        start_time_usec (int): Simulation time at the start of the segment.
+        duration_sec (float): Configured duration of the segment.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, simulation_time_usec, inputs, pose):
+        """
+        Called once per step, before the step's input is applied.
+
+        Parameters:
+        simulation_time_usec (int): Simulation time.
+        inputs (list): Input values of the step, in the input log column order (without timestamp).
+        pose: Vehicle pose (ROS frame) read from the client.
+        """
+        pass
+
+    def should_stop(self):
+        """
+        Returns:
+        bool: True to end the current segment early.
+        """
+        return False
+
+    def end_segment(self, simulation_time_usec):
+        """
+        Called after each segment.
+        """
+        pass
+
+    @abstractmethod
+    def report(self):
+        """
+        Called once after the run: prints (and saves) the results.
+        """
+        pass
@@ -0,0 +1,33 @@
+import os
+import json
+import pandas as pd
+from components.impl.binary_logger import read_binary_log
+from components.impl.logger import log_metadata_filename
+
+def read_log(filename):
+    """
+    Reads a log file written by Logger (.csv) or BinaryLogger (.npy).
+
+    Parameters:
+    filename (str): Path to the log file.
+
+    Returns:
+    pandas.DataFrame: One column per logged value, 'timestamp' in usec.
+    """
+    if filename.endswith('.npy'):
+        return pd.DataFrame(read_binary_log(filename))
+    return pd.read_csv(filename)
+
+def read_log_metadata(filename):
+    """
+    Reads the decimation metadata written by DecimatingLogger next to a log file.
+
+    Returns:
+    dict: The metadata ('decimation', 'envelope', 'sample_spacing_usec', ...),
+    or None if the log was not decimated.
+    """
+    metadata_file = log_metadata_filename(filename)
+    if not os.path.exists(metadata_file):
+        return None
+    with open(metadata_file, 'r') as f:
+        return json.load(f)
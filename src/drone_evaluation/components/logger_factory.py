@@ -0,0 +1,45 @@
+import os
+from impl.logger import Logger, DecimatingLogger, log_metadata_filename
+from impl.binary_logger import BinaryLogger
+
+class LoggerFactory:
+    def __init__(self, input_data_params):
+        """
+        Initializes the LoggerFactory with the evaluation.input_data parameters.
+
+        Parameters:
+        input_data_params (dict): 'log_file', 'cache_len' and optional 'log_format' ('csv' or 'npy'),
+            'async_write' (bool), 'queue_len' (int), 'decimation' (int) and 'envelope' (bool).
+        """
+        self.params = input_data_params
+
+    def create_logger(self):
+        """
+        Creates the input signal logger. The format defaults to the extension of log_file.
+
+        With decimation > 1 or envelope, the logger is wrapped in a DecimatingLogger.
+
+        Returns:
+        Logger, BinaryLogger or DecimatingLogger: The logger.
+        """
+        filename = self.params['log_file']
+        cache_len = self.params['cache_len']
+        log_format = self.params.get('log_format', 'npy' if filename.endswith('.npy') else 'csv')
+        async_write = self.params.get('async_write', False)
+        queue_len = self.params.get('queue_len', 4)
+        if log_format == 'csv':
+            logger = Logger(filename=filename, cache_len=cache_len, async_write=async_write, queue_len=queue_len)
+        elif log_format == 'npy':
+            logger = BinaryLogger(filename=filename, cache_len=cache_len, async_write=async_write, queue_len=queue_len)
+        else:
+            raise ValueError(f"Unsupported log format: {log_format}")
+
+        decimation = self.params.get('decimation', 1)
+        envelope = self.params.get('envelope', False)
+        if decimation > 1 or envelope:
+            return DecimatingLogger(logger, decimation=decimation, envelope=envelope)
+        # metadata of a previous decimated run would no longer match the log
+        metadata_file = log_metadata_filename(filename)
+        if os.path.exists(metadata_file):
+            os.remove(metadata_file)
+        return logger
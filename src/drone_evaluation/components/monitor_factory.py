@@ -0,0 +1,31 @@
+from impl.step_response_monitor import StepResponseMonitor
+from impl.freq_response_monitor import FreqResponseMonitor
+
+class MonitorFactory:
+    def __init__(self, evaluation_params, input_columns):
+        """
+        Initializes the MonitorFactory with the scenario parameters.
+
+        Parameters:
+        evaluation_params (dict): The scenario parameters ('simulation' and 'evaluation').
+        input_columns (list): Names of the logged input values passed to ISimulationMonitor.update().
+        """
+        self.params = evaluation_params
+        self.input_columns = input_columns
+
+    def create_monitors(self):
+        """
+        Creates the online monitors enabled in the 'evaluation' section.
+
+        Returns:
+        list: ISimulationMonitor instances (empty if none is enabled).
+        """
+        evaluation = self.params['evaluation']
+        monitors = []
+        step_evaluation = evaluation.get('step_evaluation')
+        if step_evaluation is not None and 'online' in step_evaluation:
+            monitors.append(StepResponseMonitor(step_evaluation))
+        freq_evaluation = evaluation.get('freq_evaluation')
+        if freq_evaluation is not None and 'online' in freq_evaluation:
+            monitors.append(FreqResponseMonitor(evaluation, self.input_columns))
+        return monitors
@@ -0,0 +1,10 @@
+# leads up to this many degrees stay positive (estimation noise around a zero lag)
+LEAD_MARGIN_DEG = 5.0
+
+def lag_degree(phase):
+    """
+    Returns the phase difference in degrees as a lag in (-360 + LEAD_MARGIN_DEG, LEAD_MARGIN_DEG],
+    so that the phase of a response lagging by more than 180 degrees does not flip to a
+    positive lead, and a zero lag does not jump to -360 with noise.
+    """
+    return LEAD_MARGIN_DEG - ((LEAD_MARGIN_DEG - phase) % 360.0) + 0.0
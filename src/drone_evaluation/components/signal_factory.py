@@ -1,5 +1,6 @@
+import numpy as np
 from isignal_generator import ISignalGenerator
-from impl.signal_generator import SineSignalGenerator, ChirpSignalGenerator, StepSignalGenerator
+from impl.signal_generator import SineSignalGenerator, ChirpSignalGenerator, StepSignalGenerator, MultisineSignalGenerator
 
 
 class SignalFactory:
@@ -14,7 +15,7 @@ class SignalFactory:
         signal_name (str): The name of the signal to create generators for.
         
         Returns:
-        list: A list of specific signal generator instances (Sine, Chirp, Step) for each element in the parameter arrays.
+        list: A list of specific signal generator instances (Sine, Chirp, Step, Multisine) for each element in the parameter arrays.
         """
         signals = self.params['simulation']['signals']
         if signal_name not in signals:
@@ -36,9 +37,19 @@ class SignalFactory:
             chirp_f0s = signal_params['parameters']['chirp_f0']
             chirp_f1s = signal_params['parameters']['chirp_f1']
             offsets = signal_params['parameters']['offsets']
+            method = signal_params['parameters'].get('method', 'linear')
             signal_generators = []
             for chirp_f0, chirp_f1, offset in zip(chirp_f0s, chirp_f1s, offsets):
-                signal_generators.append(ChirpSignalGenerator(chirp_f0=chirp_f0, chirp_f1=chirp_f1, offset=offset))
+                signal_generators.append(ChirpSignalGenerator(chirp_f0=chirp_f0, chirp_f1=chirp_f1, offset=offset, method=method))
+            return signal_generators
+        elif signal_type == 'multisine':
+            amps = signal_params['parameters']['amp']
+            offsets = signal_params['parameters']['offsets']
+            frequencies = self.get_multisine_frequencies(signal_params['parameters'])
+            base_freq = signal_params['parameters'].get('base_freq')
+            signal_generators = []
+            for amp, offset in zip(amps, offsets):
+                signal_generators.append(MultisineSignalGenerator(frequencies=frequencies, amp=amp, offset=offset, base_freq=base_freq))
             return signal_generators
         elif signal_type == 'step':
             offsets = signal_params['parameters']['offsets']
@@ -49,6 +60,51 @@ class SignalFactory:
         else:
             raise ValueError(f"Unsupported signal type: {signal_type}")
 
+    def get_multisine_frequencies(self, parameters):
+        """
+        Returns the tone frequencies of a multisine signal: 'freqs', or 'freq_points'
+        log-spaced frequencies from 'freq_min' to 'freq_max' rounded to multiples of
+        'base_freq' (default: freq_min).
+
+        Returns:
+        list: Sorted, distinct frequencies in Hz.
+        """
+        if 'freqs' in parameters:
+            return sorted(set(parameters['freqs']))
+        freq_min = parameters['freq_min']
+        freq_max = parameters['freq_max']
+        base_freq = parameters.get('base_freq', freq_min)
+        harmonics = np.round(np.geomspace(freq_min, freq_max, parameters['freq_points']) / base_freq)
+        return sorted(set(float(harmonic * base_freq) for harmonic in np.maximum(harmonics, 1)))
+
+    def create_signal_blocks(self, signal_generators, interval_sec, total_time_sec, chunk_len):
+        """
+        Streams the signals of all generators as blocks of at most chunk_len steps.
+
+        Each block has the shape (n_channels, block_len) and is stored in Fortran order,
+        so the signals of one step (a column) are contiguous in memory. The same buffer
+        is reused for every block, so memory stays constant whatever total_time_sec is.
+
+        Parameters:
+        signal_generators (list): Signal generators, one per channel.
+        interval_sec (float): Sampling interval in seconds.
+        total_time_sec (float): Signal duration in seconds.
+        chunk_len (int): Maximum number of steps per block.
+
+        Yields:
+        numpy.ndarray: float64 array of shape (n_channels, block_len).
+        """
+        signal_block = np.empty((len(signal_generators), chunk_len), dtype=np.float64, order='F')
+        channel_chunks = [signal_generator.generate_chunks(interval_sec, total_time_sec, chunk_len)
+                          for signal_generator in signal_generators]
+        for chunks in zip(*channel_chunks):
+            block_len = len(chunks[0])
+            if not all(len(chunk) == block_len for chunk in chunks):
+                raise ValueError("All signal sequences must have the same length.")
+            for channel, chunk in enumerate(chunks):
+                signal_block[channel, :block_len] = chunk
+            yield signal_block[:, :block_len]
+
 # Example usage
 if __name__ == "__main__":
     from input_param_loader import InputParamLoader
@@ -65,7 +121,7 @@ if __name__ == "__main__":
         else:
             for generator in signal_generators:
                 # Example of using each signal generator
-                signal = generator.generate_signal(interval=0.01, total_time=10)
+                signal = generator.generate_signal(0.01, 10)
                 print("Generated Signal:", signal)
     except ValueError as e:
         print(e)
@@ -1,46 +1,142 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import hakosim
-import hakopy
-import pdu_info
-import hako_pdu
 import os
+import copy
 import json
+import math
+import shutil
+import numpy as np
 from input_param_loader import InputParamLoader
 from drone_executor_factory import DroneExecutorFactory
-from impl.logger import Logger
+from transport_factory import TransportFactory
+from logger_factory import LoggerFactory
+from monitor_factory import MonitorFactory
 from signal_factory import SignalFactory
 from isignal_generator import ISignalGenerator
 
 class SimulationExecutor:
-    def __init__(self, drone_config_path, pdu_config_path, evaluation_config_path):
-        self.asset_name = 'SimulationExecutor'
+    # number of steps generated at once by the signal generators
+    SIGNAL_CHUNK_LEN = 4096
+
+    def __init__(self, drone_config_path, pdu_config_path, evaluation_config_path, transport=None, asset_name='SimulationExecutor', scenario_dirs=None, drone_dirs=None):
+        """
+        Parameters:
+        drone_config_path (str or list): Drone config JSON, or one per drone instance run side by side.
+        evaluation_config_path (str or list): Scenario JSON, or the scenarios run back to back in one session.
+        scenario_dirs (list): Output directory of each scenario (None: the paths of the scenarios as they are).
+        drone_dirs (list): Output directory of each drone, inside the scenario directory (None: single drone).
+        """
+        self.asset_name = asset_name
+        if transport is None:
+            transport = TransportFactory('hako').create_transport()
+        self.transport = transport
 
         # config
-        self.drone_config_params = self._load_json(drone_config_path)
+        if isinstance(drone_config_path, str):
+            drone_config_path = [drone_config_path]
+        self.drone_configs = [self._load_json(path) for path in drone_config_path]
+        # the time step of the first drone is the one of the simulation
+        self.drone_config_params = self.drone_configs[0]
         self.pdu_config_path = pdu_config_path
-        self.loader = InputParamLoader(evaluation_config_path)
+        if isinstance(evaluation_config_path, str):
+            evaluation_config_path = [evaluation_config_path]
+        self.scenario_paths = list(evaluation_config_path)
+        self.scenario_dirs = scenario_dirs
+        if drone_dirs is not None and len(drone_dirs) != len(self.drone_configs):
+            raise ValueError(f"{len(drone_dirs)} drone output directories for {len(self.drone_configs)} drones")
+        self.drone_dirs = drone_dirs
+
+        # drone api, one client per drone instance
+        self.clients = [self.transport.create_client(self.pdu_config_path, drone_config['name'])
+                        for drone_config in self.drone_configs]
+        self.client = self.clients[0]
+
+        self.scenario_index = 0
+        self._load_scenario(0)
+
+    def _load_scenario(self, index):
+        """Creates the loggers, executors, signals and monitors of the index-th scenario."""
+        self.loader = InputParamLoader(self.scenario_paths[index])
         self.evaluation_params = self.loader.load_params()
+        if index > 0:
+            # the drone config (controller module and time step) is shared by the whole session
+            first = InputParamLoader(self.scenario_paths[0]).load_params()['simulation']
+            current = self.evaluation_params['simulation']
+            for key in ['type', 'controller_type', 'simulation_time_step']:
+                if current.get(key) != first.get(key):
+                    raise ValueError(f"simulation.{key} of {self.scenario_paths[index]} differs from the first scenario of the session")
 
-        # drone api
-        client = hakosim.MultirotorClient(self.pdu_config_path, "DroneTransporter")
-        client.default_drone_name = self.drone_config_params['name']
-        hako_binary_path = os.getenv('HAKO_BINARY_PATH', '/usr/local/lib/hakoniwa/hako_binary/offset')
-        client.pdu_manager = hako_pdu.HakoPduManager(hako_binary_path, self.pdu_config_path)
-        client.enableApiControl(True)
-        client.armDisarm(True)
-        self.client = client
-
-        # drone executor
-        self.logger = Logger(filename=self.evaluation_params['evaluation']['input_data']['log_file'], 
-                             cache_len=self.evaluation_params['evaluation']['input_data']['cache_len'])
+        # drone executors: the same scenario, logged separately per drone
         exec_factory = DroneExecutorFactory(self.loader)
-        self.drone_executor = exec_factory.create_executor(self.client, self.logger)
+        self.loggers = []
+        self.drone_executors = []
+        self.drone_monitors = []
+        for drone_index, client in enumerate(self.clients):
+            drone_params = copy.deepcopy(self.evaluation_params)
+            output_dirs = []
+            if self.scenario_dirs is not None:
+                output_dirs.append(self.scenario_dirs[index])
+            if self.drone_dirs is not None:
+                output_dirs.append(self.drone_dirs[drone_index])
+            if output_dirs:
+                self._redirect_outputs(os.path.join(*output_dirs), drone_params)
+            logger = LoggerFactory(drone_params['evaluation']['input_data']).create_logger()
+            drone_executor = exec_factory.create_executor(client, logger, self.transport)
+            self.loggers.append(logger)
+            self.drone_executors.append(drone_executor)
+            # online monitors, updated every step from the vehicle pose
+            self.drone_monitors.append(MonitorFactory(drone_params, drone_executor.input_columns()).create_monitors())
+        self.logger = self.loggers[0]
+        self.drone_executor = self.drone_executors[0]
+        self.monitors = self.drone_monitors[0]
 
         # signal
         self.signal_factory = SignalFactory(self.evaluation_params)
+        # 'step': signals are indexed by the step counter
+        # 'simulation_time': signals are evaluated at the simulation time, phase continuous across segments
+        self.signal_time_base = self.evaluation_params['simulation'].get('signal_time_base', 'step')
+        if self.signal_time_base not in ['step', 'simulation_time']:
+            raise ValueError(f"Unsupported signal_time_base: {self.signal_time_base}")
+
+        # number of control steps executed by run_duration()
+        self.step_count = 0
+        # simulated seconds saved by segments ended early by a monitor
+        self.saved_sec = 0.0
+        self.scenario_finished = False
+
+    def _redirect_outputs(self, output_dir, evaluation_params):
+        """Writes the input log and the online evaluation results of evaluation_params to output_dir."""
+        os.makedirs(output_dir, exist_ok=True)
+        shutil.copy(self.scenario_paths[self.scenario_index], output_dir)
+        evaluation = evaluation_params['evaluation']
+        input_data = evaluation['input_data']
+        input_data['log_file'] = os.path.join(output_dir, input_data['log_file'])
+        online = evaluation.get('freq_evaluation', {}).get('online')
+        if online is not None:
+            online['result_file'] = os.path.join(output_dir, online.get('result_file', 'freq_result.csv'))
+            if online.get('adaptive') is not None:
+                online['adaptive']['stats_file'] = os.path.join(output_dir, online['adaptive'].get('stats_file', 'adaptive_sweep.csv'))
+
+    def next_scenario(self):
+        """
+        Moves on to the next scenario of the session once the current one has run.
+        Called from on_reset or after start() returns, whichever comes first.
+
+        Returns:
+        bool: True if a scenario is ready to run, False at the end of the session.
+        """
+        if not self.scenario_finished:
+            return True
+        if self.scenario_index + 1 >= len(self.scenario_paths):
+            return False
+        self.scenario_index += 1
+        self.transport.reset()
+        self._load_scenario(self.scenario_index)
+        return True
 
+    def has_next_scenario(self):
+        return self.scenario_index + 1 < len(self.scenario_paths)
 
     def initialize(self, my_callback):
         delta_time_usec = int(self.drone_config_params['simulation']['timeStep'] * 1000000)
@@ -49,34 +145,18 @@ class SimulationExecutor:
         print("delta_time_usec:", delta_time_usec)
 
         # connect to the HakoSim simulator
-        ret = hakopy.asset_register(self.asset_name, self.pdu_config_path, my_callback, delta_time_usec, hakopy.HAKO_ASSET_MODEL_PLANT)
+        ret = self.transport.asset_register(self.asset_name, self.pdu_config_path, my_callback, delta_time_usec)
         if ret == False:
             print(f"ERROR: hako_asset_register() returns {ret}.")
             return False
         return True
 
     def create_pdu(self):
-        robot_name = self.client.default_drone_name
-        hako_binary_path = os.getenv('HAKO_BINARY_PATH', '/usr/local/lib/hakoniwa/hako_binary/offset')
-        pdu_manager = hako_pdu.HakoPduManager(hako_binary_path, self.pdu_config_path)
-
-        pdu_channels = [
-            pdu_info.HAKO_AVATOR_CHANNLE_ID_COLLISION,
-            pdu_info.HAKO_AVATOR_CHANNEL_ID_DISTURB,
-            pdu_info.HAKO_AVATOR_CHANNEL_ID_CAMERA_DATA,
-            pdu_info.HAKO_AVATOR_CHANNEL_ID_CAMERA_INFO,
-            pdu_info.HAKO_AVATOR_CHANNEL_ID_LIDAR_DATA,
-            pdu_info.HAKO_AVATOR_CHANNEL_ID_LIDAR_POS,
-            pdu_info.HAKO_AVATOR_CHANNEL_ID_STAT_MAG,
-        ]
-
-        for channel in pdu_channels:
-            pdu = pdu_manager.get_pdu(robot_name, channel)
-            _ = pdu.get()
-            pdu.write()
+        for client in self.clients:
+            self.transport.create_pdu(client.default_drone_name, self.pdu_config_path)
 
     def start(self):
-        ret = hakopy.start()
+        ret = self.transport.start()
         return ret
 
     def _load_json(self, filepath):
@@ -89,39 +169,112 @@ class SimulationExecutor:
         except json.JSONDecodeError:
             raise ValueError(f"The file at {filepath} is not a valid JSON file.")
 
+    def _update_monitors(self, simulation_time_usec, inputs):
+        """
+        Updates the monitors of every drone with its current pose.
+
+        Returns:
+        bool: True if a monitor of every drone requests to end the segment.
+        """
+        stop = True
+        for client, monitors in zip(self.clients, self.drone_monitors):
+            pose = client.simGetVehiclePose()
+            drone_stop = False
+            for monitor in monitors:
+                monitor.update(simulation_time_usec, inputs, pose)
+                drone_stop = monitor.should_stop() or drone_stop
+            stop = stop and drone_stop
+        return stop
+
     def run_duration(self, signal_generators: list[ISignalGenerator], duration_sec: float):
-        start_time_usec = hakopy.simulation_time()
+        """
+        Applies the signals for duration_sec, or until a monitor ends the segment.
+        Every drone gets the same row in the same step.
+
+        Returns:
+        float: Elapsed simulation time in seconds.
+        """
+        if self.signal_time_base == 'simulation_time':
+            return self._run_duration_by_time(signal_generators, duration_sec)
+        start_time_usec = self.transport.simulation_time()
         duration_usec = int(duration_sec * 1000000)
         end_time_usec = start_time_usec + duration_usec
         current_time_usec = start_time_usec
 
-        # create signal
-        signals_sequence = []
-        for signal_generator in signal_generators:
-            signal_sequence = signal_generator.generate_signal(self.delta_time_sec, duration_sec)
-            signals_sequence.append(signal_sequence)
+        # all drones run the same executor type: the first one maps the signals
+        drone_executor = self.drone_executor
+        drone_executors = self.drone_executors
+        transport = self.transport
+        monitors = any(self.drone_monitors)
 
-        # Check if all signal sequences have the same length
-        sequence_len = len(signals_sequence[0])
+        # stream signal blocks: (n_channels, block_len), mapped to one executor row per step
+        signal_blocks = self.signal_factory.create_signal_blocks(signal_generators, self.delta_time_sec, duration_sec, self.SIGNAL_CHUNK_LEN)
+        step_rows = drone_executor.map_signals(next(signal_blocks))
+        block_len = step_rows.shape[0]
         print("INFO: start_time_usec: ", start_time_usec)
-        print("INFO: sequence_len   : ", sequence_len)
-        if not all(len(seq) == sequence_len for seq in signals_sequence):
-            raise ValueError("All signal sequences must have the same length.")
+        print("INFO: sequence_len   : ", int(np.ceil(duration_sec / self.delta_time_sec)))
 
         index = 0
         while current_time_usec < end_time_usec:
-            signals = [signal_sequence[index] for signal_sequence in signals_sequence]
-            self.drone_executor.run(current_time_usec, signals)
-            hakopy.usleep(self.delta_time_usec)
-            current_time_usec = hakopy.simulation_time()
-            index = (index + 1) % sequence_len
+            # a fresh list per step on purpose: run() compares and writes the row as a plain
+            # list (an ndarray view breaks the joystick comparison), and copying into a
+            # preallocated list or converting the whole block up front measured slower
+            # (benchmark.py --row-access)
+            row = step_rows[index].tolist()
+            if monitors and self._update_monitors(current_time_usec, drone_executor.input_values(row)):
+                break
+            for executor in drone_executors:
+                executor.run(current_time_usec, row)
+            self.step_count += 1
+            transport.usleep(self.delta_time_usec)
+            current_time_usec = transport.simulation_time()
+            index += 1
+            if index == block_len:
+                signal_block = next(signal_blocks, None)
+                if signal_block is None:
+                    # the signal sequence is exhausted: restart from its beginning
+                    signal_blocks = self.signal_factory.create_signal_blocks(signal_generators, self.delta_time_sec, duration_sec, self.SIGNAL_CHUNK_LEN)
+                    signal_block = next(signal_blocks)
+                step_rows = drone_executor.map_signals(signal_block)
+                block_len = step_rows.shape[0]
+                index = 0
+        return (current_time_usec - start_time_usec) / 1000000
+
+    def _run_duration_by_time(self, signal_generators: list[ISignalGenerator], duration_sec: float):
+        start_time_usec = self.transport.simulation_time()
+        duration_usec = int(duration_sec * 1000000)
+        end_time_usec = start_time_usec + duration_usec
+        current_time_usec = start_time_usec
+        print("INFO: start_time_usec: ", start_time_usec)
+
+        drone_executor = self.drone_executor
+        drone_executors = self.drone_executors
+        transport = self.transport
+        monitors = any(self.drone_monitors)
+        while current_time_usec < end_time_usec:
+            # closed-form evaluation at the actual simulation time, robust to skipped ticks
+            time_sec = (current_time_usec - start_time_usec) / 1000000
+            signals = [signal_generator.value_at(time_sec, duration_sec) for signal_generator in signal_generators]
+            row = drone_executor.map_step_signals(signals)
+            if monitors and self._update_monitors(current_time_usec, drone_executor.input_values(row)):
+                break
+            for executor in drone_executors:
+                executor.run(current_time_usec, row)
+            self.step_count += 1
+            transport.usleep(self.delta_time_usec)
+            current_time_usec = transport.simulation_time()
+        return (current_time_usec - start_time_usec) / 1000000
 
     def run(self):
         # takeoff
         print("INFO: start takeoff")
-        self.drone_executor.takeoff()
+        # one drone after the other, the others hold their initial state meanwhile
+        for drone_executor in self.drone_executors:
+            drone_executor.takeoff()
 
         # do simulation
+        # phase of each channel at the end of the previous segment (signal_time_base: simulation_time)
+        channel_phases = []
         for sigina_input_timing in self.evaluation_params['simulation']['signal_input_timings']:
             signal_name = sigina_input_timing['name']
             signal_duration_sec = sigina_input_timing['duration_sec']
@@ -129,6 +282,34 @@ class SimulationExecutor:
             print("INFO: signal_duration_sec: ", signal_duration_sec)
             signal_generators = self.signal_factory.create_signal_generator(signal_name)
             print("INFO signal_generators num: ", len(signal_generators))
-            self.run_duration(signal_generators, signal_duration_sec)
+            if self.signal_time_base == 'simulation_time':
+                for signal_generator, phase in zip(signal_generators, channel_phases):
+                    if phase is not None:
+                        signal_generator.set_start_phase(phase)
+            for monitors in self.drone_monitors:
+                for monitor in monitors:
+                    monitor.start_segment(signal_name, signal_generators, self.transport.simulation_time(), signal_duration_sec)
+            elapsed_sec = self.run_duration(signal_generators, signal_duration_sec)
+            for monitors in self.drone_monitors:
+                for monitor in monitors:
+                    monitor.end_segment(self.transport.simulation_time())
+            if elapsed_sec < signal_duration_sec - self.delta_time_sec:
+                self.saved_sec += signal_duration_sec - elapsed_sec
+                print(f"INFO: segment {signal_name} ended early after {elapsed_sec:.3f} s, saved {signal_duration_sec - elapsed_sec:.3f} s")
+            if self.signal_time_base == 'simulation_time':
+                channel_phases = [signal_generator.phase_at(elapsed_sec, signal_duration_sec)
+                                  for signal_generator in signal_generators]
+                channel_phases = [None if phase is None else math.fmod(phase, 2 * math.pi) for phase in channel_phases]
 
-        self.logger.save()
+        for drone_index, (drone_executor, logger, monitors) in enumerate(zip(self.drone_executors, self.loggers, self.drone_monitors)):
+            if len(self.drone_executors) > 1:
+                print(f"INFO: drone {drone_index}: {self.clients[drone_index].default_drone_name}")
+            print(f"INFO: joystick writes: {drone_executor.joystick_writes}, "
+                  f"skipped: {drone_executor.skipped_joystick_writes} / {self.step_count} steps")
+            logger.save()
+            print(f"INFO: log writer: {logger.flush_stats.summary()}")
+            for monitor in monitors:
+                monitor.report()
+        if any(self.drone_monitors):
+            print(f"INFO: simulated time saved by early termination: {self.saved_sec:.3f} s")
+        self.scenario_finished = True
@@ -0,0 +1,28 @@
+from ihako_transport import IHakoTransport
+
+class TransportFactory:
+    def __init__(self, transport_type='hako'):
+        """
+        Initializes the TransportFactory.
+
+        Parameters:
+        transport_type (str): 'hako' for the Hakoniwa simulator, 'virtual' for the in-process virtual clock.
+        """
+        self.transport_type = transport_type
+
+    def create_transport(self):
+        """
+        Creates the transport. Modules are imported lazily so that the virtual
+        transport can be used without hakopy/hakosim installed.
+
+        Returns:
+        IHakoTransport: An instance of a specific transport.
+        """
+        if self.transport_type == 'hako':
+            from impl.hako_transport import HakoTransport
+            return HakoTransport()
+        elif self.transport_type == 'virtual':
+            from impl.virtual_hako_transport import VirtualHakoTransport
+            return VirtualHakoTransport()
+        else:
+            raise ValueError(f"Unsupported transport type: {self.transport_type}")
@@ -0,0 +1,24 @@
+#!/bin/bash
+
+if [ $# -ne 1 ] && [ $# -ne 2 ]; then
+    echo "Usage: $0 <input_dir> [<periods>]"
+    exit 1
+fi
+
+INPUT_DIR="$1"
+PERIODS="${2:-3}"
+DIRNAME=$(basename "${INPUT_DIR}")
+
+# all frequencies of test_pattern.csv are evaluated by one multisine simulation
+mkdir -p test-results/${DIRNAME}-frf
+rm -rf test-results/${DIRNAME}-frf/*
+python ../src/drone_evaluation/update_multisine_params.py \
+        "${INPUT_DIR}/test_pattern.csv" "${INPUT_DIR}/config.json" \
+        ../src/drone_evaluation/template/multisine-input.json ${PERIODS}
+bash -x ../src/drone_evaluation/evaluate.bash multisine-input-updated.json
+echo "freq, log_freq, gain, phase, phase1_at_freq, phase2_at_freq" > test-results/${DIRNAME}-frf/result.csv
+python ../src/drone_evaluation/freq_evaluator.py ./multisine-input-updated.json \
+    >> test-results/${DIRNAME}-frf/result.csv
+mv multisine-input-updated.json test-results/${DIRNAME}-frf/
+mv in.csv test-results/${DIRNAME}-frf/
+mv drone_log0 test-results/${DIRNAME}-frf/
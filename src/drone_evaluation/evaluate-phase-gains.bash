@@ -33,4 +33,12 @@ for i in $(seq "${LINE_NUM}"); do
     mv sine-input-updated.json test-results/${DIRNAME}/${FREQ}/
     mv in.csv test-results/${DIRNAME}/${FREQ}/
     mv drone_log0 test-results/${DIRNAME}/${FREQ}/
+    # freq_evaluation.online.adaptive: cycles used and simulated time saved per frequency
+    if [ -f adaptive_sweep.csv ]; then
+        if [ ! -f test-results/${DIRNAME}/adaptive_sweep.csv ]; then
+            echo "freq, cycles, converged, saved_sec" > test-results/${DIRNAME}/adaptive_sweep.csv
+        fi
+        cat adaptive_sweep.csv >> test-results/${DIRNAME}/adaptive_sweep.csv
+        mv adaptive_sweep.csv test-results/${DIRNAME}/${FREQ}/
+    fi
 done
@@ -4,18 +4,22 @@ DRONE_TEMPLATE_CONFIG=../installer/config/mixer-api/drone_config_0.json
 DRONE_CONFIG=root/var/lib/hakoniwa/config/mixer-api/drone_config_0.json
 PDU_CONFIG=root/var/lib/hakoniwa/config/custom.json
 
-if [ $# -ne 1 ]
+if [ $# -lt 1 ]
 then
-    echo "Usage: $0 <scenario_config_path>"
+    echo "Usage: $0 <scenario_config_path> [<scenario_config_path>...]"
     exit 1
 fi
+# several scenarios are run in one simulator session, the first one sets up the drone
 SCENARIO_CONFIG=${1}
 
-if [ ! -f ${SCENARIO_CONFIG} ]
-then
-    echo "ERROR: can not found ${SCENARIO_CONFIG}"
-    exit 1
-fi
+for config in "$@"
+do
+    if [ ! -f ${config} ]
+    then
+        echo "ERROR: can not found ${config}"
+        exit 1
+    fi
+done
 
 if [ -f setup.bash ]
 then
@@ -53,23 +57,10 @@ ${PYTHON_BIN} ../src/drone_evaluation/update_control_params.py ${HAKO_CONTROLLER
 ${PYTHON_BIN} ../src/drone_evaluation/components/drone_config_updater.py \
     ${DRONE_TEMPLATE_CONFIG} ${DRONE_CONFIG} ${SCENARIO_CONFIG}
 
-hako-px4sim 127.0.0.1 450 ext &
-HAKO_PID=$!
-
-# TODO sleep time should be changed to wait for hako-px4sim to be ready
-sleep 1
-
-${PYTHON_BIN} ../src/drone_evaluation/evaluator.py \
-        ${DRONE_CONFIG} ${PDU_CONFIG} ${SCENARIO_CONFIG} &
-EVAL_PID=$!
-
-# TODO sleep time should be changed to wait for evaluator to be ready
-sleep 3
-
-hako-cmd start
-
-wait $EVAL_PID
-
-kill -s TERM $HAKO_PID
-
-
+# hako-px4sim, evaluator.py, hako-cmd start are started by launcher.py,
+# each waiting for the previous one to be ready (LAUNCH_CONFIG: launch config JSON)
+# between the scenarios, launcher.py runs hako-cmd stop / reset / start
+# EVAL_CACHE_DIR: result cache, the simulation is skipped when the inputs have not changed
+${PYTHON_BIN} ../src/drone_evaluation/launcher.py \
+        ${DRONE_CONFIG} ${PDU_CONFIG} "$@" ${LAUNCH_CONFIG:+--config ${LAUNCH_CONFIG}} \
+        ${EVAL_CACHE_DIR:+--cache-dir ${EVAL_CACHE_DIR}}
@@ -1,20 +1,38 @@
 import sys
-import os
+import argparse
 from components.simulation_executor import SimulationExecutor
+from transport_factory import TransportFactory
+from launcher import ASSET_REGISTERED_MESSAGE, INITIALIZED_MESSAGE, SCENARIO_DONE_MESSAGE, RESET_MESSAGE
+from launcher import session_scenario_dir, drone_output_dir, drone_config_paths
 
 simulation_executor = None
 
 def my_on_initialize(context):
     global simulation_executor
     simulation_executor.create_pdu()
+    print(f"{INITIALIZED_MESSAGE}: {simulation_executor.scenario_index}", flush=True)
     return 0
 
 def my_on_manual_timing_control(context):
     global simulation_executor
     simulation_executor.run()
+    print(f"{SCENARIO_DONE_MESSAGE}: {simulation_executor.scenario_index}", flush=True)
+    if simulation_executor.has_next_scenario():
+        # the session continues after hako-cmd stop / reset / start
+        simulation_executor.transport.wait_stop()
     return 0
 
+def next_scenario():
+    global simulation_executor
+    index = simulation_executor.scenario_index
+    if not simulation_executor.next_scenario():
+        return False
+    if simulation_executor.scenario_index != index:
+        print(f"{RESET_MESSAGE}: {simulation_executor.scenario_index}", flush=True)
+    return True
+
 def my_on_reset(context):
+    next_scenario()
     return 0
 
 my_callback = {
@@ -27,15 +45,39 @@ my_callback = {
 def main():
     global simulation_executor
 
-    if len(sys.argv) != 4:
-        print(f"Usage: {sys.argv[0]} <drone_config_path> <pdu_config_path> <evaluation_config_path>")
-        return 1
+    parser = argparse.ArgumentParser(description='Run a simulation scenario on the Hakoniwa drone simulator.')
+    parser.add_argument('drone_config_path', help='Path to the drone configuration JSON file.')
+    parser.add_argument('pdu_config_path', help='Path to the PDU configuration JSON file.')
+    parser.add_argument('evaluation_config_path', nargs='+',
+                        help='Path to the evaluation configuration JSON file. Several scenarios are run back to back in one session.')
+    parser.add_argument('--transport', choices=['hako', 'virtual'], default='hako',
+                        help='hako: Hakoniwa simulator, virtual: in-process virtual clock (no simulator required)')
+    parser.add_argument('--drones', type=int, default=1,
+                        help='Number of drone instances stepped side by side (drone_config_<index>.json next to drone_config_path)')
+    parser.add_argument('--asset-name', default='SimulationExecutor',
+                        help='Hakoniwa asset name of the evaluator (must be unique among concurrent simulations)')
+    args = parser.parse_args()
 
-    simulation_executor = SimulationExecutor(sys.argv[1], sys.argv[2], sys.argv[3])
+    transport = TransportFactory(args.transport).create_transport()
+    scenario_dirs = None
+    if len(args.evaluation_config_path) > 1:
+        # separate logs per scenario
+        scenario_dirs = [session_scenario_dir(index, path) for index, path in enumerate(args.evaluation_config_path)]
+    drone_dirs = None
+    if args.drones > 1:
+        # separate logs per drone
+        drone_dirs = [drone_output_dir(index) for index in range(args.drones)]
+    simulation_executor = SimulationExecutor(drone_config_paths(args.drone_config_path, args.drones), args.pdu_config_path,
+                                             args.evaluation_config_path, transport, args.asset_name, scenario_dirs, drone_dirs)
     if simulation_executor.initialize(my_callback) == False:
         return 1
+    print(f"{ASSET_REGISTERED_MESSAGE}: {args.asset_name}", flush=True)
 
-    simulation_executor.start()
+    # start() returns after each scenario unless the reset is handled inside it (on_reset)
+    while True:
+        simulation_executor.start()
+        if not next_scenario():
+            break
 
     return 0
 
@@ -1,12 +1,25 @@
-import pandas as pd
 import numpy as np
 from scipy.fft import fft, fftfreq
 import matplotlib.pyplot as plt
 from scipy.interpolate import CubicSpline
 import json
 import sys
+import os
+import glob
+import time
 import math
-from scipy.signal import find_peaks
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from scipy.signal import find_peaks, get_window
+from components.log_reader import read_log, read_log_metadata
+from components.phase import lag_degree
+
+# scenario file of a sweep point, searched by --batch
+BATCH_SCENARIO_FILE = 'sine-input-updated.json'
+RESULT_HEADER = "freq, log_freq, gain, phase, phase1_at_freq, phase2_at_freq"
+QUALITY_HEADER = "freq, coherence, snr_db, gain_std_db, phase_std_deg"
+# sub-windows of the quality estimate of the sine fit
+QUALITY_WINDOWS = 8
 
 class FFTAnalyzer:
     def __init__(self):
@@ -14,18 +27,35 @@ class FFTAnalyzer:
 
     def load_csv(self, filename):
         """
-        Load CSV file and return as DataFrame
+        Load log file (CSV or binary .npy log) and return as DataFrame
+        with 'timestamp' as int64 usec
         """
-        df = pd.read_csv(filename)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='us')
+        df = read_log(filename)
+        df['timestamp'] = df['timestamp'].astype(np.int64)
         return df
 
+    def time_sec(self, df):
+        """
+        Return the timestamps of a loaded log in seconds (float)
+        """
+        return df['timestamp'].values / 1000000
+
+    def get_sample_spacing(self, filename, df):
+        """
+        Return the sample spacing in seconds of a loaded log.
+        Decimated logs record their effective spacing in the log metadata.
+        """
+        metadata = read_log_metadata(filename)
+        if metadata is not None and metadata.get('sample_spacing_usec'):
+            return metadata['sample_spacing_usec'] / 1000000
+        return (df['timestamp'].iloc[1] - df['timestamp'].iloc[0]) / 1000000
+
     def filter_by_time(self, df, start_time_sec, end_time_sec):
         """
         Filter DataFrame by a specific time range
         """
-        start_time = pd.Timestamp(start_time_sec, unit='s')
-        end_time = pd.Timestamp(end_time_sec, unit='s')
+        start_time = int(round(start_time_sec * 1000000))
+        end_time = int(round(end_time_sec * 1000000))
         return df[(df['timestamp'] >= start_time) & (df['timestamp'] <= end_time)]
 
     def normalize_signal(self, signal, max_val):
@@ -37,16 +67,49 @@ class FFTAnalyzer:
         else:
             return signal
 
-    def perform_fft(self, signal, sample_spacing=1.0):
+    def trim_to_periods(self, df1, df2, start_time_sec, freq):
+        """
+        Trim both DataFrames to the longest whole number of periods of freq from
+        start_time_sec that both cover, so that freq falls on an FFT bin
+        """
+        duration_usec = min(df1['timestamp'].iloc[-1], df2['timestamp'].iloc[-1]) - int(round(start_time_sec * 1000000))
+        n_periods = int(duration_usec * freq // 1000000)
+        if n_periods < 1:
+            return df1, df2
+        end_time_usec = int(round(start_time_sec * 1000000 + n_periods * 1000000 / freq))
+        return df1[df1['timestamp'] < end_time_usec], df2[df2['timestamp'] < end_time_usec]
+
+    def window_coefficients(self, window, N):
+        """
+        Return the window of length N ('hann', 'flattop', ...; None for rectangular)
+        """
+        if window is None or window == 'none':
+            return np.ones(N)
+        return get_window(window, N)
+
+    def estimate_leakage_db(self, N, sample_spacing, freq, window=None):
+        """
+        Estimate the amplitude error in dB at freq caused by leakage: the scalloping loss
+        of the window for the fraction of a bin between freq and the nearest FFT bin
+        """
+        bins = freq * N * sample_spacing
+        offset = bins - round(bins)
+        w = self.window_coefficients(window, N)
+        response = np.abs(np.sum(w * np.exp(2j * np.pi * offset * np.arange(N) / N)))
+        return 20 * np.log10(response / np.sum(w))
+
+    def perform_fft(self, signal, sample_spacing=1.0, window=None):
         """
-        Perform FFT on the signal and return frequency, amplitude, and phase
+        Perform FFT on the signal and return frequency, amplitude, and phase.
+        The amplitude of a windowed signal is corrected by the coherent gain of the window.
         """
         signal_centered = signal - np.mean(signal)  # Remove offset
         N = len(signal_centered)
-        yf = fft(signal_centered)
+        w = self.window_coefficients(window, N)
+        yf = fft(signal_centered * w)
         xf = fftfreq(N, sample_spacing)[:N // 2]  # Positive frequency components only
 
-        amplitude = 2.0 / N * np.abs(yf[:N // 2])  # Amplitude
+        amplitude = 2.0 / (N * np.mean(w)) * np.abs(yf[:N // 2])  # Amplitude
         phase = np.angle(yf[:N // 2], deg=True)  # Phase in degrees
         return xf[:len(amplitude)], amplitude, phase
 
@@ -82,13 +145,22 @@ class FFTAnalyzer:
         peaks, _ = find_peaks(signal, height=height, distance=distance)
         return peaks
 
-    def calculate_peak_time_differences(self, timestamps, peaks):
+    def calculate_peak_times(self, time_sec, signal, peaks):
         """
-        Calculate the time differences between consecutive peaks
+        Refine the peak times between the samples by fitting a parabola through
+        each peak and its two neighbours
         """
-        peak_times = timestamps[peaks]
-        time_diffs = np.diff(peak_times).astype('timedelta64[ms]').astype(float) / 1000  # Convert to seconds
-        return time_diffs
+        peaks = peaks[(peaks > 0) & (peaks < len(signal) - 1)]
+        y0, y1, y2 = signal[peaks - 1], signal[peaks], signal[peaks + 1]
+        curvature = y0 - 2 * y1 + y2
+        offset = np.divide(0.5 * (y0 - y2), curvature, out=np.zeros(len(peaks)), where=curvature != 0)
+        return time_sec[peaks] + offset * (time_sec[peaks + 1] - time_sec[peaks - 1]) / 2
+
+    def calculate_peak_time_differences(self, peak_times):
+        """
+        Calculate the time differences in seconds between consecutive peaks
+        """
+        return np.diff(peak_times)
 
     def calculate_average_period(self, time_diffs):
         """
@@ -210,44 +282,50 @@ class FFTAnalyzer:
         if shift_count >= max_shifts:
             print("Could not find a shift that brings the phase to 90 degrees. Proceeding with available data.")
 
-    def calc_phase_diff(self, filtered_df1, filtered_df2):
-        timestamps1 = filtered_df1['timestamp'].values
-        timestamps2 = filtered_df2['timestamp'].values
-
-        peaks1 = self.find_peaks_in_signal(self.signal1)
-        peaks2 = self.find_peaks_in_signal(self.signal2)
-
-        # Calculate time differences between consecutive peaks
-        time_diffs1 = self.calculate_peak_time_differences(timestamps1, peaks1)
-        time_diffs2 = self.calculate_peak_time_differences(timestamps2, peaks2)
-
-        # Calculate average periods
-        period1 = self.calculate_average_period(time_diffs1)
-        period2 = self.calculate_average_period(time_diffs2)
-        #print("period1:", period1)
-        # Calculate the time difference between the first peaks of both signals
-        if len(peaks1) > 0 and len(peaks2) > 0:
-            # Take the minimum number of peaks to avoid index out of bounds
-            min_peaks = min(len(peaks1), len(peaks2))
-
-            # Calculate time differences between the corresponding peaks
-            time_diff_peaks = []
-            for i in range(min_peaks):
-                time_diff = (timestamps1[peaks1[i]] - timestamps2[peaks2[i]]).astype('timedelta64[ms]').astype(float) / 1000
-                time_diff_peaks.append(time_diff)
-
-            # Calculate the average time difference
-            average_time_diff = np.mean(time_diff_peaks)
-        else:
-            average_time_diff = None
-        #print("time_diff_peaks: ", average_time_diff)
-        # Calculate phase difference based on the peak time difference and the average period
-        phase_at_freq = (average_time_diff/period1)*360
-        return phase_at_freq
+    def calc_phase_diff(self, filtered_df1, filtered_df2, freq=None):
+        """
+        Phase difference in degrees of the output peaks relative to the input peaks.
+        Each input peak is paired with the nearest output peak, and the lags of all
+        pairs are averaged on the unit circle and reported as a lag (see lag_degree).
 
-    def analyze_signals(self, input_file1, input_file2, start_time, freq, input_file1_label, input_file2_label, input_inverse=False, output_inverse=False, max_val=2896):
+        Args:
+            freq (float): Signal frequency; None to use the average period of the input
+            peaks. When given, peaks closer than 3/4 period are suppressed (noise).
+        """
+        time_sec1 = self.time_sec(filtered_df1)
+        time_sec2 = self.time_sec(filtered_df2)
+
+        distance1 = distance2 = None
+        if freq is not None:
+            distance1 = max(int(0.75 / freq / np.median(np.diff(time_sec1))), 1)
+            distance2 = max(int(0.75 / freq / np.median(np.diff(time_sec2))), 1)
+        peaks1 = self.find_peaks_in_signal(self.signal1, distance=distance1)
+        peaks2 = self.find_peaks_in_signal(self.signal2, distance=distance2)
+        peak_times1 = self.calculate_peak_times(time_sec1, self.signal1, peaks1)
+        peak_times2 = self.calculate_peak_times(time_sec2, self.signal2, peaks2)
+        if len(peak_times1) == 0 or len(peak_times2) == 0:
+            return math.nan
+
+        if freq is not None:
+            period = 1 / freq
+        else:
+            period = self.calculate_average_period(self.calculate_peak_time_differences(peak_times1))
+            if period is None:
+                return math.nan
+        # nearest output peak of every input peak
+        index = np.clip(np.searchsorted(peak_times2, peak_times1), 1, max(len(peak_times2) - 1, 1))
+        before = peak_times2[index - 1]
+        after = peak_times2[np.minimum(index, len(peak_times2) - 1)]
+        nearest = np.where(np.abs(peak_times1 - before) <= np.abs(after - peak_times1), before, after)
+        time_diffs = peak_times1 - nearest
+        # Calculate phase difference based on the peak time differences and the period
+        return lag_degree(np.degrees(np.angle(np.mean(np.exp(2j * np.pi * time_diffs / period)))))
+
+    def analyze_signals(self, input_file1, input_file2, start_time, freq, input_file1_label, input_file2_label, input_inverse=False, output_inverse=False, max_val=2896, window=None):
         """
         Load, filter, perform FFT, and calculate gain and phase difference for two signals.
+        The records are trimmed to whole periods of freq; the estimated leakage error of
+        the gain is left in self.leakage_db.
 
         Args:
             input_file1 (str): Path to the input signal CSV file.
@@ -259,6 +337,7 @@ class FFTAnalyzer:
             input_inverse (bool): Whether to invert the input signal.
             output_inverse (bool): Whether to invert the output signal.
             max_val (float): Maximum value for normalization.
+            window (str): FFT window ('hann', 'flattop'; None for rectangular).
 
         Returns:
             (float, float): Gain in dB and phase difference at the specified frequency.
@@ -268,8 +347,7 @@ class FFTAnalyzer:
         df2 = self.load_csv(input_file2)
 
         # Filter by time
-        end_time = df1['timestamp'].iloc[-1]
-        start_time = pd.Timestamp(start_time, unit='s')
+        end_time = df1['timestamp'].iloc[-1] / 1000000
         filtered_df1 = self.filter_by_time(df1, start_time, end_time)
         filtered_df2 = self.filter_by_time(df2, start_time, end_time)
 
@@ -284,6 +362,9 @@ class FFTAnalyzer:
         if len(filtered_df2) > 1:
             filtered_df2 = filtered_df2[:-1]
 
+        # Trim to whole periods so that the partial last period does not leak
+        filtered_df1, filtered_df2 = self.trim_to_periods(filtered_df1, filtered_df2, start_time, freq)
+
         # Invert signal if specified
         if input_inverse:
             filtered_df1[input_file1_label] = -filtered_df1[input_file1_label]
@@ -294,25 +375,24 @@ class FFTAnalyzer:
         #self.signal1 = self.normalize_signal(filtered_df1[input_file1_label].values, max_val)
         self.signal1 = filtered_df1[input_file1_label].values
         self.signal2 = filtered_df2[input_file2_label].values
-        sample_spacing = (filtered_df1['timestamp'].iloc[1] - filtered_df1['timestamp'].iloc[0]).total_seconds()
+        # the input and output logs may have different rates (evaluation.input_data.decimation)
+        sample_spacing = self.get_sample_spacing(input_file1, filtered_df1)
+        sample_spacing2 = self.get_sample_spacing(input_file2, filtered_df2)
 
         #self.update_signal(target_degree=90, tolerance= 1, sample_spacing=sample_spacing)
 
 
-        phase_at_freq = self.calc_phase_diff(filtered_df1, filtered_df2)
+        phase_at_freq = self.calc_phase_diff(filtered_df1, filtered_df2, freq)
 
-        xf1, amplitude1, phase1 = self.perform_fft(self.signal1, sample_spacing)
-        xf2, amplitude2, phase2 = self.perform_fft(self.signal2, sample_spacing)
+        xf1, amplitude1, phase1 = self.perform_fft(self.signal1, sample_spacing, window)
+        xf2, amplitude2, phase2 = self.perform_fft(self.signal2, sample_spacing2, window)
+        # amplitude error of the channel that is worse affected
+        self.leakage_db = min(self.estimate_leakage_db(len(self.signal1), sample_spacing, freq, window),
+                              self.estimate_leakage_db(len(self.signal2), sample_spacing2, freq, window))
 
-        # Ensure xf1 and gain_db have the same length
-        min_length = min(len(xf1), len(amplitude1), len(amplitude2))
-        xf1 = xf1[:min_length]
-        amplitude1 = amplitude1[:min_length]
-        amplitude2 = amplitude2[:min_length]
-
-
-        spline1 = CubicSpline(xf1, amplitude1[:min_length])
-        spline2 = CubicSpline(xf1, amplitude2[:min_length])
+        # each spectrum is interpolated on its own frequency grid
+        spline1 = CubicSpline(xf1, amplitude1)
+        spline2 = CubicSpline(xf2, amplitude2)
 
         gain1_at_freq = spline1(freq)
         gain2_at_freq = spline2(freq)
@@ -324,37 +404,358 @@ class FFTAnalyzer:
         #print(f"gain1_at_freq: {freq}, {gain1_at_freq}")
         #print(f"gain2_at_freq: {freq}, {gain2_at_freq}")
         #print(f"gain_at_freq: {freq}, {gain_at_freq}")
-        phase1_at_freq = np.interp(freq, xf1, phase1[:min_length])
-        phase2_at_freq = np.interp(freq, xf1, phase2[:min_length])
+        phase1_at_freq = np.interp(freq, xf1, phase1)
+        phase2_at_freq = np.interp(freq, xf2, phase2)
         #phase_at_freq = phase2_at_freq - phase1_at_freq
 
         return gain_at_freq, phase_at_freq, phase1_at_freq, phase2_at_freq
 
-# Example usage
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <simulation_config_file>")
-    else:
-        # Load JSON file with simulation and evaluation parameters
-        with open(sys.argv[1], "r") as json_file:
+    def fit_sine(self, time_sec, signal, freq):
+        """
+        Least-squares fit of signal = a*cos(w*t) + b*sin(w*t) + c at the given frequency.
+        The samples are fitted at their own timestamps in O(n), so no FFT grid (and no
+        leakage between bins) is involved.
+
+        Returns:
+        (float, float, float): Amplitude, phase in degrees (of A*cos(w*t + phase)) and
+        RMS residual of the fit.
+        """
+        angle = 2 * np.pi * freq * time_sec
+        basis = np.column_stack([np.cos(angle), np.sin(angle), np.ones_like(angle)])
+        (a, b, c), _, _, _ = np.linalg.lstsq(basis, signal, rcond=None)
+        residual = signal - basis @ np.array([a, b, c])
+        return np.hypot(a, b), np.degrees(np.arctan2(-b, a)), np.sqrt(np.mean(residual ** 2))
+
+    def estimate_sine_response(self, input_file1, input_file2, start_time, freq, input_file1_label, input_file2_label, input_inverse=False, output_inverse=False):
+        """
+        Estimate the gain and phase at freq by fitting a sine of that frequency to the
+        input and output samples after start_time.
+
+        Returns:
+            dict: freq, gain (dB), phase (degrees, output relative to input, reported as
+            a lag in (-355, 5], see lag_degree), input_phase, output_phase, input_residual and output_residual
+            (RMS of the fit in the units of the signals).
+        """
+        df1 = read_log(input_file1)
+        df2 = read_log(input_file2)
+        # Remove last row if it contains garbage data
+        df1 = df1[:-1]
+        df2 = df2[:-1]
+        time1 = self.time_sec(df1)
+        time2 = self.time_sec(df2)
+        mask1 = time1 >= start_time
+        mask2 = (time2 >= start_time) & (time2 <= time1[-1])
+        if np.count_nonzero(mask1) < 3 or np.count_nonzero(mask2) < 3:
+            print("Filtered data is insufficient for the sine fit. Please check the time range or input data.")
+            sys.exit(1)
+        signal1 = df1[input_file1_label].values[mask1].astype(np.float64)
+        signal2 = df2[input_file2_label].values[mask2].astype(np.float64)
+        if input_inverse:
+            signal1 = -signal1
+        if output_inverse:
+            signal2 = -signal2
+
+        # phases relative to start_time, as the FFT of the filtered records
+        time1 = time1[mask1] - start_time
+        time2 = time2[mask2] - start_time
+        amplitude1, phase1, residual1 = self.fit_sine(time1, signal1, freq)
+        amplitude2, phase2, residual2 = self.fit_sine(time2, signal2, freq)
+        result = {
+            "freq": freq,
+            "gain": 20 * np.log10(amplitude2 / amplitude1),
+            "phase": lag_degree(phase2 - phase1),
+            "input_phase": phase1,
+            "output_phase": phase2,
+            "input_residual": residual1,
+            "output_residual": residual2
+        }
+        # power of the fundamental over the power of the residual that falls into its
+        # DFT bin (4 * residual^2 / N), of the noisier channel; grows with the record length
+        with np.errstate(divide='ignore'):
+            result["snr_db"] = min(10 * np.log10(amplitude1 ** 2 * len(signal1) / (4 * residual1 ** 2)),
+                                   10 * np.log10(amplitude2 ** 2 * len(signal2) / (4 * residual2 ** 2)))
+        result.update(self.estimate_quality(time1, signal1, time2, signal2, freq))
+        return result
+
+    def estimate_quality(self, time1, signal1, time2, signal2, freq, n_windows=QUALITY_WINDOWS):
+        """
+        Fit the sine separately in up to n_windows sub-windows of whole periods and
+        compare the estimates.
+
+        Args:
+            time1, time2 (numpy.ndarray): Sample times in seconds relative to the start of the record.
+
+        Returns:
+            dict: coherence (1 when the output is linear in the input in every window),
+            gain_std_db and phase_std_deg (standard deviations across the windows) and
+            windows; NaN with fewer than 2 whole periods.
+        """
+        n_periods = int(min(time1[-1], time2[-1]) * freq)
+        n_windows = min(n_windows, n_periods)
+        if n_windows < 2:
+            return {"coherence": math.nan, "gain_std_db": math.nan, "phase_std_deg": math.nan, "windows": n_windows}
+        edges = np.arange(n_windows + 1) * (n_periods // n_windows) / freq
+        bounds1 = np.searchsorted(time1, edges)
+        bounds2 = np.searchsorted(time2, edges)
+        input_bins = np.empty(n_windows, dtype=np.complex128)
+        output_bins = np.empty(n_windows, dtype=np.complex128)
+        for k in range(n_windows):
+            window1 = slice(bounds1[k], bounds1[k + 1])
+            window2 = slice(bounds2[k], bounds2[k + 1])
+            amplitude1, phase1, _ = self.fit_sine(time1[window1], signal1[window1], freq)
+            amplitude2, phase2, _ = self.fit_sine(time2[window2], signal2[window2], freq)
+            input_bins[k] = amplitude1 * np.exp(1j * np.radians(phase1))
+            output_bins[k] = amplitude2 * np.exp(1j * np.radians(phase2))
+        ratios = output_bins / input_bins
+        coherence = (np.abs(np.sum(output_bins * np.conj(input_bins))) ** 2
+                     / (np.sum(np.abs(input_bins) ** 2) * np.sum(np.abs(output_bins) ** 2)))
+        # phases relative to the mean response, so that the spread is not affected by wrapping
+        phases = np.angle(ratios / np.mean(ratios), deg=True)
+        return {
+            "coherence": coherence,
+            "gain_std_db": np.std(20 * np.log10(np.abs(ratios)), ddof=1),
+            "phase_std_deg": np.std(phases, ddof=1),
+            "windows": n_windows
+        }
+
+    def period_spectra(self, time_sec, signal, start_time, period_sec, n_periods, freqs):
+        """
+        Single-bin DFTs of every period at the given frequencies.
+        The samples are evaluated at their own timestamps, so the input and output
+        logs need not share a sample rate or time grid.
+
+        Returns:
+        numpy.ndarray: (n_periods, len(freqs)) complex spectra scaled to amplitude.
+        """
+        relative_time = time_sec - start_time
+        period_index = (relative_time // period_sec).astype(int)
+        counts = np.bincount(period_index, minlength=n_periods)
+        # remove the mean of each period
+        means = np.bincount(period_index, weights=signal, minlength=n_periods) / np.maximum(counts, 1)
+        centered = signal - means[period_index]
+        spectra = np.empty((n_periods, len(freqs)), dtype=np.complex128)
+        for k, freq in enumerate(freqs):
+            angle = 2 * np.pi * freq * relative_time
+            real = np.bincount(period_index, weights=centered * np.cos(angle), minlength=n_periods)
+            imag = np.bincount(period_index, weights=-centered * np.sin(angle), minlength=n_periods)
+            spectra[:, k] = 2.0 * (real + 1j * imag) / np.maximum(counts, 1)
+        return spectra
+
+    def estimate_frf(self, input_file1, input_file2, start_time, freqs, period_sec, input_file1_label, input_file2_label, input_inverse=False, output_inverse=False):
+        """
+        Estimate the frequency response at freqs from one broadband (multisine or chirp) run
+        with the H1 estimator H1 = S_yu / S_uu, averaged over the signal periods after start_time.
+
+        Args:
+            start_time (float): Start time in seconds (transients have decayed).
+            freqs (list): Excited frequencies in Hz.
+            period_sec (float): Signal period in seconds; None to use the whole record as one period (chirp).
+
+        Returns:
+            list: One dict per frequency with freq, gain (dB), phase (degrees, unwrapped over
+            frequency), input_phase, output_phase, coherence and periods.
+        """
+        df1 = read_log(input_file1)
+        df2 = read_log(input_file2)
+        # Remove last row if it contains garbage data
+        df1 = df1[:-1]
+        df2 = df2[:-1]
+        time1 = self.time_sec(df1)
+        time2 = self.time_sec(df2)
+        end_time = min(time1[-1], time2[-1])
+        if period_sec is None:
+            period_sec = end_time - start_time
+        n_periods = int((end_time - start_time) // period_sec)
+        if n_periods < 1:
+            print("Filtered data is shorter than one signal period. Please check the time range or input data.")
+            sys.exit(1)
+        stop_time = start_time + n_periods * period_sec
+        mask1 = (time1 >= start_time) & (time1 < stop_time)
+        mask2 = (time2 >= start_time) & (time2 < stop_time)
+        signal1 = df1[input_file1_label].values[mask1].astype(np.float64)
+        signal2 = df2[input_file2_label].values[mask2].astype(np.float64)
+        if input_inverse:
+            signal1 = -signal1
+        if output_inverse:
+            signal2 = -signal2
+
+        input_spectra = self.period_spectra(time1[mask1], signal1, start_time, period_sec, n_periods, freqs)
+        output_spectra = self.period_spectra(time2[mask2], signal2, start_time, period_sec, n_periods, freqs)
+        s_uu = np.mean(np.abs(input_spectra) ** 2, axis=0)
+        s_yy = np.mean(np.abs(output_spectra) ** 2, axis=0)
+        s_yu = np.mean(output_spectra * np.conj(input_spectra), axis=0)
+        h1 = s_yu / s_uu
+        coherence = np.abs(s_yu) ** 2 / (s_uu * s_yy)
+        phase = np.degrees(np.unwrap(np.angle(h1)))
+        input_phase = np.angle(np.mean(input_spectra, axis=0), deg=True)
+        output_phase = np.angle(np.mean(output_spectra, axis=0), deg=True)
+
+        results = []
+        for k, freq in enumerate(freqs):
+            results.append({
+                "freq": freq,
+                "gain": 20 * np.log10(np.abs(h1[k])),
+                "phase": phase[k],
+                "input_phase": input_phase[k],
+                "output_phase": output_phase[k],
+                "coherence": coherence[k],
+                "periods": n_periods
+            })
+        return results
+
+def get_frf_frequencies(config_data):
+    """
+    Returns the excited frequencies and the signal period of freq_evaluation.signal
+    (a multisine, or a chirp with freq_evaluation.freqs).
+    """
+    from components.signal_factory import SignalFactory
+    freq_evaluation = config_data['evaluation']['freq_evaluation']
+    signal_name = freq_evaluation['signal']
+    signal_type = config_data['simulation']['signals'][signal_name]['type']
+    if signal_type == 'multisine':
+        generator = SignalFactory(config_data).create_signal_generator(signal_name)[0]
+        return list(generator.frequencies), generator.period
+    if 'freqs' not in freq_evaluation:
+        raise ValueError(f"freq_evaluation.freqs is required for {signal_type} signals")
+    return freq_evaluation['freqs'], None
+
+def evaluate_config(config_data, base_dir=''):
+    """
+    Evaluates the frequency response of one run.
+
+    Args:
+        config_data (dict): Simulation and evaluation parameters (sine-input-updated.json).
+        base_dir (str): Directory the log paths are relative to.
+
+    Returns:
+        list: One dict per frequency with freq, gain, phase, input_phase and output_phase
+        (sine fit: also input_residual and output_residual; fft: also leakage_db).
+    """
+    analyzer = FFTAnalyzer()
+
+    # Input parameters
+    input_file1 = os.path.join(base_dir, config_data['evaluation']['input_data']['log_file'])
+    input_file2 = os.path.join(base_dir, config_data['evaluation']['output_data']['log_file'])
+    start_time  = config_data['evaluation']['freq_evaluation']['start_time']
+    freq        = config_data['evaluation']['freq_evaluation'].get('freq')
+    input_file1_label = config_data['evaluation']['input_data']['axis']
+    input_file2_label = config_data['evaluation']['output_data']['axis']
+    input_inverse = config_data['evaluation']['freq_evaluation'].get('input_inverse', False)
+    output_inverse = config_data['evaluation']['freq_evaluation'].get('output_inverse', False)
+    input_max_val = config_data['evaluation']['input_data']['max_val']
+
+    method = config_data['evaluation']['freq_evaluation'].get('method', 'sine')
+    if method == 'frf':
+        # one result per excited frequency: the whole Bode table from one log
+        freqs, period_sec = get_frf_frequencies(config_data)
+        return analyzer.estimate_frf(input_file1, input_file2, start_time, freqs, period_sec,
+                                     input_file1_label, input_file2_label, input_inverse=input_inverse, output_inverse=output_inverse)
+    if method == 'fft':
+        # full FFT of both records and peak-to-peak phase lag
+        window = config_data['evaluation']['freq_evaluation'].get('window')
+        gain, phase, phase1_at_freq, phase2_at_freq = analyzer.analyze_signals(input_file1, input_file2, start_time, freq,
+                                               input_file1_label, input_file2_label, input_inverse=input_inverse, output_inverse=output_inverse, max_val=input_max_val, window=window)
+        return [{"freq": freq, "gain": gain, "phase": phase, "input_phase": phase1_at_freq, "output_phase": phase2_at_freq,
+                 "leakage_db": analyzer.leakage_db}]
+    return [analyzer.estimate_sine_response(input_file1, input_file2, start_time, freq,
+                                            input_file1_label, input_file2_label, input_inverse=input_inverse, output_inverse=output_inverse)]
+
+def result_line(r):
+    """
+    Returns the result.csv line (freq, log_freq, gain, phase, phase1_at_freq, phase2_at_freq) of a result.
+    """
+    return f"{r['freq']}, {math.log10(r['freq']):.2f}, {r['gain']:.2f}, {r['phase']:.2f}, {r['input_phase']:.2f}, {r['output_phase']:.2f}"
+
+def quality_line(r):
+    """
+    Returns the quality.csv line (freq, coherence, snr_db, gain_std_db, phase_std_deg) of a sine fit result.
+    """
+    return f"{r['freq']}, {r['coherence']:.4f}, {r['snr_db']:.1f}, {r['gain_std_db']:.3f}, {r['phase_std_deg']:.2f}"
+
+def evaluate_scenario_file(scenario_file):
+    """
+    Evaluates one run of a batch, with the log paths relative to the directory of
+    scenario_file (runs in a worker process).
+
+    Returns:
+        (list, str): Results, and the error message or None.
+    """
+    try:
+        with open(scenario_file, "r") as json_file:
             config_data = json.load(json_file)
+        return evaluate_config(config_data, os.path.dirname(scenario_file)), None
+    except (OSError, KeyError, ValueError) as e:
+        return [], f"{type(e).__name__}: {e}"
+    except SystemExit:
+        # insufficient data, reported by the analyzer
+        return [], "insufficient data"
+
+def evaluate_batch(results_dir, output_file, jobs):
+    """
+    Evaluates every BATCH_SCENARIO_FILE under results_dir in a process pool and writes
+    the results sorted by frequency to output_file, and the quality of the sine fits
+    to quality.csv next to it.
+
+    Returns:
+        int: Exit code.
+    """
+    scenario_files = sorted(glob.glob(os.path.join(results_dir, '**', BATCH_SCENARIO_FILE), recursive=True))
+    if not scenario_files:
+        print(f"ERROR: no {BATCH_SCENARIO_FILE} found under {results_dir}")
+        return 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(min(jobs, len(scenario_files)), 1)) as pool:
+        evaluations = list(pool.map(evaluate_scenario_file, scenario_files))
+    wall_sec = time.perf_counter() - start
+
+    results = sorted((r for results, _ in evaluations for r in results), key=lambda r: r['freq'])
+    with open(output_file, 'w') as f:
+        f.write(RESULT_HEADER + "\n")
+        for r in results:
+            f.write(result_line(r) + "\n")
+    quality_results = [r for r in results if 'snr_db' in r]
+    if quality_results:
+        with open(os.path.join(os.path.dirname(output_file), 'quality.csv'), 'w') as f:
+            f.write(QUALITY_HEADER + "\n")
+            for r in quality_results:
+                f.write(quality_line(r) + "\n")
+    errors = [(path, error) for path, (_, error) in zip(scenario_files, evaluations) if error is not None]
+    for path, error in errors:
+        print(f"ERROR: {path}: {error}")
+    print(f"INFO: {len(scenario_files) - len(errors)} of {len(scenario_files)} runs evaluated in {wall_sec:.2f} s "
+          f"({wall_sec / len(scenario_files) * 1000:.1f} ms per run, {jobs} jobs), {len(results)} results written to {output_file}")
+    return 1 if errors else 0
 
-        analyzer = FFTAnalyzer()
-
-        # Input parameters
-        input_file1 = config_data['evaluation']['input_data']['log_file']
-        input_file2 = config_data['evaluation']['output_data']['log_file']
-        start_time  = config_data['evaluation']['freq_evaluation']['start_time']
-        freq        = config_data['evaluation']['freq_evaluation']['freq']
-        input_file1_label = config_data['evaluation']['input_data']['axis']
-        input_file2_label = config_data['evaluation']['output_data']['axis']
-        input_inverse = config_data['evaluation']['freq_evaluation'].get('input_inverse', False)
-        output_inverse = config_data['evaluation']['freq_evaluation'].get('output_inverse', False)
-        input_max_val = config_data['evaluation']['input_data']['max_val']
-
-        # Analyze signals and get results
-        #print("input_file1: ", input_file1)
-        #print("input_file2: ", input_file2)
-        gain, phase, phase1_at_freq, phase2_at_freq = analyzer.analyze_signals(input_file1, input_file2, start_time, freq, 
-                                               input_file1_label, input_file2_label, input_inverse=input_inverse, output_inverse=output_inverse, max_val=input_max_val)
-        print(f"{freq}, {math.log10(freq):.2f}, {gain:.2f}, {phase:.2f}, {phase1_at_freq:.2f}, {phase2_at_freq:.2f}")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Evaluate the frequency response of a run, or of all runs under a results directory.')
+    parser.add_argument('simulation_config_file', nargs='?', help='Scenario JSON of one run; the result line is printed')
+    parser.add_argument('--batch', metavar='DIR', help=f'Evaluate every {BATCH_SCENARIO_FILE} under DIR')
+    parser.add_argument('--output', help='Result CSV of --batch (default: DIR/result.csv)')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help='Number of worker processes of --batch')
+    parser.add_argument('--quality-file', help='Write the quality line of the sine fit (QUALITY_HEADER columns) to this file')
+    args = parser.parse_args()
+
+    if args.batch is not None:
+        sys.exit(evaluate_batch(args.batch, args.output or os.path.join(args.batch, 'result.csv'), args.jobs))
+    if args.simulation_config_file is None:
+        parser.error('a simulation config file or --batch is required')
+
+    # Load JSON file with simulation and evaluation parameters
+    with open(args.simulation_config_file, "r") as json_file:
+        config_data = json.load(json_file)
+    results = evaluate_config(config_data)
+    for r in results:
+        if 'input_residual' in r:
+            # the result line on stdout keeps its format; the fit residuals and quality go to stderr
+            print(f"INFO: sine fit residual (RMS): input {r['input_residual']:.4g}, output {r['output_residual']:.4g}", file=sys.stderr)
+            print(f"INFO: quality ({r['windows']} windows): coherence {r['coherence']:.4f}, SNR {r['snr_db']:.1f} dB, "
+                  f"gain std {r['gain_std_db']:.3f} dB, phase std {r['phase_std_deg']:.2f} deg", file=sys.stderr)
+        if 'leakage_db' in r:
+            print(f"INFO: estimated leakage error of the amplitude: {r['leakage_db']:.4f} dB", file=sys.stderr)
+        print(result_line(r))
+    if args.quality_file is not None:
+        with open(args.quality_file, 'w') as f:
+            for r in results:
+                if 'snr_db' in r:
+                    f.write(quality_line(r) + "\n")
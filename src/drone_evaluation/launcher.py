@@ -0,0 +1,404 @@
+import sys
+import os
+import re
+import json
+import copy
+import shutil
+import signal
+import asyncio
+import argparse
+from result_cache import ResultCache, DEFAULT_CACHE_MAX_BYTES, scenario_artifacts
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# readiness markers printed by evaluator.py (followed by the asset name or the scenario index)
+ASSET_REGISTERED_MESSAGE = "INFO: evaluator asset registered"
+INITIALIZED_MESSAGE = "INFO: evaluator initialized"
+SCENARIO_DONE_MESSAGE = "INFO: evaluator scenario done"
+RESET_MESSAGE = "INFO: evaluator reset"
+
+# evaluate.bash の起動手順: シミュレータ -> 評価器（アセット登録）-> hako-cmd start -> 評価器の終了を待つ
+# コマンドの {python}, {src_dir}, {drone_config}, {pdu_config}, {scenario}, {asset_name}, {port}, {drones} は置換される
+DEFAULT_LAUNCH_CONFIG = {
+    # ready: null (起動のみ), {"log": 正規表現, "source": プロセス名}, {"socket": [host, port]}, {"delay": 秒}
+    "simulator": {
+        "command": ["hako-px4sim", "127.0.0.1", "{port}", "ext"],
+        "ready": None,
+        "timeout_sec": 10.0
+    },
+    # retry: 準備完了前に終了した場合（シミュレータの起動前にアセット登録した場合など）は再起動する
+    "evaluator": {
+        "command": ["{python}", "{src_dir}/evaluator.py", "{drone_config}", "{pdu_config}", "{scenario}",
+                    "--asset-name", "{asset_name}", "--drones", "{drones}"],
+        "ready": {"log": re.escape(ASSET_REGISTERED_MESSAGE)},
+        "retry": True,
+        "timeout_sec": 30.0
+    },
+    "start": {
+        "command": ["hako-cmd", "start"],
+        "ready": {"log": re.escape(INITIALIZED_MESSAGE), "source": "evaluator"},
+        "timeout_sec": 10.0
+    },
+    # 複数シナリオのセッションでシナリオ間に実行する（null: 評価器が自分で次のシナリオに進む, --transport virtual など）
+    "stop": {
+        "command": ["hako-cmd", "stop"],
+        "timeout_sec": 10.0
+    },
+    "reset": {
+        "command": ["hako-cmd", "reset"],
+        "ready": {"log": re.escape(RESET_MESSAGE), "source": "evaluator"},
+        "timeout_sec": 10.0
+    },
+    # 評価器の実行時間の上限（null: 上限なし）
+    "run_timeout_sec": None,
+    # terminate から kill までの猶予
+    "stop_timeout_sec": 5.0
+}
+
+# 準備完了前に終了した評価器を再起動するまでの待ち時間
+RETRY_INTERVAL_SEC = 0.1
+
+def load_launch_config(config_path=None, overrides=None):
+    """既定の起動設定に config_path の JSON と overrides を重ねる（プロセス単位で上書き）"""
+    config = copy.deepcopy(DEFAULT_LAUNCH_CONFIG)
+    layers = []
+    if config_path is not None:
+        with open(config_path, 'r') as f:
+            layers.append(json.load(f))
+    if overrides is not None:
+        layers.append(overrides)
+    for layer in layers:
+        for key, value in layer.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+    return config
+
+class LaunchedProcess:
+    """
+    A child process whose output is copied line by line to a log stream.
+
+    Log readiness markers are registered before the process starts, so a marker
+    printed before anyone awaits it is not missed.
+    """
+    def __init__(self, name, command, cwd, env, log):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.log = log
+        self.process = None
+        self.reader = None
+        self.waiters = []
+
+    def expect(self, pattern):
+        """
+        Parameters:
+        pattern (str): Regular expression searched in every output line.
+
+        Returns:
+        asyncio.Future: Resolved with the first matching line.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((re.compile(pattern), future))
+        return future
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command, cwd=self.cwd, env=self.env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        self.reader = asyncio.create_task(self._read_output(self.process))
+
+    async def _read_output(self, process):
+        async for raw_line in process.stdout:
+            line = raw_line.decode(errors='replace').rstrip('\n')
+            self.log.write(f"[{self.name}] {line}\n")
+            self.log.flush()
+            for pattern, future in self.waiters:
+                if not future.done() and pattern.search(line):
+                    future.set_result(line)
+
+    async def wait(self):
+        returncode = await self.process.wait()
+        await self.reader
+        return returncode
+
+    async def stop(self, timeout_sec):
+        """terminate し、timeout_sec 以内に終了しなければ kill する"""
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout_sec)
+            except asyncio.TimeoutError:
+                self.log.write(f"[{self.name}] did not stop within {timeout_sec} s, killed\n")
+                self.process.kill()
+                await self.process.wait()
+        await self.reader
+
+async def wait_socket(host, port):
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            await writer.wait_closed()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+
+async def wait_ready(process, ready, marker):
+    """
+    Waits until the readiness signal of process is observed.
+
+    Returns:
+    bool: True when ready, False if the process exited first.
+    """
+    if ready is None:
+        return True
+    if 'delay' in ready:
+        signal_task = asyncio.ensure_future(asyncio.sleep(ready['delay']))
+    elif 'socket' in ready:
+        host, port = ready['socket']
+        signal_task = asyncio.ensure_future(wait_socket(host, port))
+    elif marker is not None:
+        signal_task = marker
+    else:
+        raise ValueError(f"Unsupported ready condition: {ready}")
+    exit_task = asyncio.ensure_future(process.process.wait())
+    try:
+        done, _ = await asyncio.wait([signal_task, exit_task], return_when=asyncio.FIRST_COMPLETED)
+        if signal_task not in done and signal_task is marker:
+            # the marker may be in the output not read yet
+            await process.reader
+        return signal_task.done()
+    finally:
+        exit_task.cancel()
+        if signal_task is not marker:
+            signal_task.cancel()
+
+def session_scenario_dir(index, scenario_path):
+    """セッションの index 番目のシナリオのログ出力ディレクトリ"""
+    return f"scenario{index}-{os.path.splitext(os.path.basename(scenario_path))[0]}"
+
+def drone_output_dir(index):
+    """複数機体の index 番目の機体のログ出力ディレクトリ"""
+    return f"drone{index}"
+
+def drone_config_paths(drone_config_path, drones):
+    """drone_config_path（0 番目の機体）と同じディレクトリの drone_config_<番号>.json の一覧"""
+    config_dir = os.path.dirname(drone_config_path)
+    return [drone_config_path] + [os.path.join(config_dir, f"drone_config_{index}.json") for index in range(1, drones)]
+
+def move_simulator_logs(scenario_path, output_dir, drones=1, cwd=None):
+    """
+    シミュレータのログ（output_data.log_file のディレクトリ）を output_dir に移動する。
+    複数機体の場合は、各機体のログ（drone_log<番号>）を output_dir/drone<番号>/ に移動する。
+    """
+    cwd = cwd or os.getcwd()
+    with open(os.path.join(cwd, scenario_path), 'r') as f:
+        scenario = json.load(f)
+    log_file = scenario['evaluation'].get('output_data', {}).get('log_file')
+    if not log_file:
+        return
+    # the log directory, or the log file itself when it is written to the working directory
+    log_path = os.path.dirname(log_file) or log_file
+    for index in range(drones):
+        # the simulator writes the log of the index-th drone to drone_log<index>
+        src = os.path.join(cwd, re.sub(r'^drone_log\d+', f"drone_log{index}", log_path))
+        if not os.path.exists(src):
+            continue
+        dest = os.path.join(cwd, output_dir, drone_output_dir(index) if drones > 1 else '', log_path)
+        if os.path.isdir(dest):
+            shutil.rmtree(dest)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.move(src, dest)
+
+def session_marker(message, index):
+    return re.escape(f"{message}: {index}") + "$"
+
+async def launch(config, values, cwd=None, env=None, log=None):
+    """
+    Runs the simulator, the evaluator and the start command of config, waiting for
+    the readiness signal of each, and tears all processes down on return.
+
+    With several scenarios (values['scenario'] is a list), the evaluator runs them in
+    one session: after each scenario the simulation is stopped, the simulator log is
+    moved to the directory of the scenario, and the simulation is reset and started
+    again for the next one. With values['drones'] > 1, the simulator log of each drone
+    is moved to its drone<index> directory once the simulator has stopped.
+
+    Parameters:
+    config (dict): Launch config (see DEFAULT_LAUNCH_CONFIG). A null entry is skipped.
+    values (dict): Values of the command placeholders.
+    cwd (str): Working directory of the processes.
+    env (dict): Environment of the processes.
+    log: Stream the process output is written to (default: sys.stdout).
+
+    Returns:
+    int: Exit code of the evaluator.
+    """
+    log = log if log is not None else sys.stdout
+    values = dict({'python': sys.executable, 'src_dir': SCRIPT_DIR, 'drones': 1}, **values)
+    scenarios = values['scenario'] if isinstance(values['scenario'], list) else [values['scenario']]
+    session = len(scenarios) > 1
+    drones = int(values['drones'])
+    stop_timeout_sec = config.get('stop_timeout_sec', 5.0)
+    processes = {}
+    markers = {}
+
+    def format_args(args):
+        formatted = []
+        for arg in args:
+            if arg == '{scenario}':
+                # one argument per scenario of the session
+                formatted += scenarios
+            else:
+                formatted.append(str(arg).format(**values))
+        return formatted
+
+    def create(name):
+        spec = config[name]
+        command = format_args(spec['command'])
+        process = LaunchedProcess(name, command, cwd, env, log)
+        processes[name] = process
+        # log markers of every step that watches this process
+        for step_name in ['simulator', 'evaluator', 'start']:
+            step = config.get(step_name)
+            if step and step.get('ready') and 'log' in step['ready'] and step['ready'].get('source', step_name) == name:
+                markers[step_name] = process.expect(step['ready']['log'])
+        if name == 'evaluator' and session:
+            # every marker of the session carries the scenario index
+            for index in range(len(scenarios)):
+                markers[('done', index)] = process.expect(session_marker(SCENARIO_DONE_MESSAGE, index))
+                markers[('reset', index)] = process.expect(session_marker(RESET_MESSAGE, index))
+                markers[('start', index)] = process.expect(session_marker(INITIALIZED_MESSAGE, index))
+        return process
+
+    async def start_step(name, marker=None):
+        spec = config[name]
+        timeout_sec = spec.get('timeout_sec')
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout_sec is None else loop.time() + timeout_sec
+        while True:
+            process = create(name)
+            await process.start()
+            source = processes[spec['ready'].get('source', name)] if spec.get('ready') else process
+            ready = spec.get('ready')
+            if ready and 'socket' in ready:
+                host, port = format_args(ready['socket'])
+                ready = dict(ready, socket=[host, int(port)])
+            remaining = None if deadline is None else max(deadline - loop.time(), 0.0)
+            try:
+                ready = await asyncio.wait_for(wait_ready(source, ready, marker or markers.get(name)), remaining)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"{name} was not ready within {timeout_sec} s") from None
+            if ready:
+                return process
+            returncode = await process.wait()
+            if source is not process or not spec.get('retry', False):
+                raise RuntimeError(f"{source.name} exited with {source.process.returncode} before {name} was ready")
+            if deadline is not None and loop.time() + RETRY_INTERVAL_SEC > deadline:
+                raise RuntimeError(f"{name} was not ready within {timeout_sec} s (last exit code: {returncode})")
+            await asyncio.sleep(RETRY_INTERVAL_SEC)
+
+    async def run_command(name, marker=None):
+        returncode = await (await start_step(name, marker)).wait()
+        if returncode != 0:
+            raise RuntimeError(f"{name} command exited with {returncode}")
+
+    try:
+        if config.get('simulator'):
+            await start_step('simulator')
+        evaluator = await start_step('evaluator')
+        for index in range(len(scenarios)):
+            if index > 0 and config.get('stop'):
+                await run_command('stop')
+                move_simulator_logs(scenarios[index - 1], session_scenario_dir(index - 1, scenarios[index - 1]), drones, cwd)
+                await run_command('reset', markers[('reset', index)])
+            if config.get('start'):
+                await run_command('start', markers[('start', index)] if session else None)
+            if session and not await wait_ready(evaluator, {'log': SCENARIO_DONE_MESSAGE}, markers[('done', index)]):
+                raise RuntimeError(f"evaluator exited with {evaluator.process.returncode} before scenario {index} finished")
+        try:
+            returncode = await asyncio.wait_for(evaluator.wait(), config.get('run_timeout_sec'))
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"evaluator did not finish within {config['run_timeout_sec']} s") from None
+    finally:
+        # start the teardown with the most recently started process
+        for process in reversed(list(processes.values())):
+            await process.stop(stop_timeout_sec)
+    # the simulator has stopped writing its logs
+    if session:
+        move_simulator_logs(scenarios[-1], session_scenario_dir(len(scenarios) - 1, scenarios[-1]), drones, cwd)
+    elif drones > 1:
+        move_simulator_logs(scenarios[0], '', drones, cwd)
+    return returncode
+
+async def launch_until_signal(config, values, cwd=None, env=None, log=None):
+    """SIGTERM/SIGINT で launch() をキャンセルし、子プロセスを終了させる"""
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(launch(config, values, cwd, env, log))
+    for signum in [signal.SIGTERM, signal.SIGINT]:
+        loop.add_signal_handler(signum, task.cancel)
+    try:
+        return await task
+    finally:
+        for signum in [signal.SIGTERM, signal.SIGINT]:
+            loop.remove_signal_handler(signum)
+
+def main():
+    parser = argparse.ArgumentParser(description='Launch the drone simulator and the evaluator, waiting for each to be ready.')
+    parser.add_argument('drone_config_path', help='Path to the drone configuration JSON file.')
+    parser.add_argument('pdu_config_path', help='Path to the PDU configuration JSON file.')
+    parser.add_argument('evaluation_config_path', nargs='+',
+                        help='Path to the evaluation configuration JSON file. Several scenarios are run back to back in one session.')
+    parser.add_argument('--config', help='Launch config JSON overriding the commands, readiness conditions and timeouts')
+    parser.add_argument('--asset-name', default='SimulationExecutor', help='Hakoniwa asset name of the evaluator')
+    parser.add_argument('--port', type=int, default=450, help='hako-px4sim port')
+    parser.add_argument('--drones', type=int, default=1,
+                        help='Number of drone instances (drone_config_<index>.json next to drone_config_path)')
+    parser.add_argument('--cache-dir', help='Result cache directory (default: no cache)')
+    parser.add_argument('--cache-max-gb', type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 3, help='Result cache size limit in GiB')
+    parser.add_argument('--param-file', default=os.environ.get('HAKO_CONTROLLER_PARAM_FILE'),
+                        help='Controller parameter file, part of the cache key (default: $HAKO_CONTROLLER_PARAM_FILE)')
+    args = parser.parse_args()
+
+    config = load_launch_config(args.config)
+    cache = None
+    if args.cache_dir and len(args.evaluation_config_path) > 1:
+        print("INFO: the result cache is not used for a session of several scenarios")
+    elif args.cache_dir and args.drones > 1:
+        print("INFO: the result cache is not used for several drones")
+    elif args.cache_dir:
+        cache = ResultCache(args.cache_dir, int(args.cache_max_gb * 1024 ** 3))
+        key = cache.key(args.evaluation_config_path[0], args.param_file, args.drone_config_path, extra=config)
+        if cache.restore(key, os.getcwd()) is not None:
+            print(f"INFO: cache hit: {key[:16]}, simulation skipped")
+            return 0
+    values = {
+        'drone_config': args.drone_config_path,
+        'pdu_config': args.pdu_config_path,
+        'scenario': args.evaluation_config_path,
+        'asset_name': args.asset_name,
+        'port': args.port,
+        'drones': args.drones,
+    }
+    try:
+        returncode = asyncio.run(launch_until_signal(config, values))
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
+    except asyncio.CancelledError:
+        print("ERROR: launch cancelled")
+        return 1
+    if cache is not None and returncode == 0:
+        with open(args.evaluation_config_path[0], 'r') as f:
+            scenario = json.load(f)
+        cache.store(key, os.getcwd(), scenario_artifacts(scenario), {})
+        print(f"INFO: cache stored: {key[:16]}")
+    return returncode
+
+if __name__ == "__main__":
+    sys.exit(main())
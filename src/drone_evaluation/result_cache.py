@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 既定のキャッシュサイズ上限
+DEFAULT_CACHE_MAX_BYTES = 20 * 1024 ** 3
+
+ENTRY_METADATA_FILE = 'entry.json'
+ENTRY_FILES_DIR = 'files'
+
+def file_digest(path):
+    """ファイル内容の SHA-256（存在しない場合は None）"""
+    if not os.path.isfile(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def tree_digest(directory, suffixes=None):
+    """ディレクトリ以下のファイル（suffixes で絞り込み）の相対パスと内容の SHA-256"""
+    h = hashlib.sha256()
+    if os.path.isdir(directory):
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+            for name in sorted(files):
+                if suffixes is not None and not name.endswith(tuple(suffixes)):
+                    continue
+                path = os.path.join(root, name)
+                h.update(os.path.relpath(path, directory).encode())
+                h.update(file_digest(path).encode())
+    return h.hexdigest()
+
+def scenario_artifacts(scenario):
+    """
+    シナリオの実行で作成されるファイル（workspace からの相対パス）のリスト。
+    入力ログとそのサイドカー、ドローンログのディレクトリ、オンライン評価の結果ファイル。
+    """
+    evaluation = scenario['evaluation']
+    artifacts = []
+    input_log = evaluation['input_data']['log_file']
+    artifacts += [input_log, input_log + '.meta.json']
+    output_log_dir = os.path.dirname(evaluation.get('output_data', {}).get('log_file', ''))
+    if output_log_dir:
+        artifacts.append(output_log_dir)
+    online = evaluation.get('freq_evaluation', {}).get('online')
+    if online is not None:
+        artifacts.append(online.get('result_file', 'freq_result.csv'))
+        if online.get('adaptive') is not None:
+            artifacts.append(online['adaptive'].get('stats_file', 'adaptive_sweep.csv'))
+    return artifacts
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of simulation runs.
+
+    An entry is keyed on the hash of everything a run depends on (scenario,
+    controller parameters, drone config, controller module and evaluation code)
+    and holds the produced files and results. Entries are evicted least recently
+    used first once the total size exceeds max_bytes. Entries are written to a
+    temporary directory and renamed, so concurrent runs can share a cache.
+    """
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, scenario_path, param_file, drone_config_path, extra=None):
+        """
+        Parameters:
+        scenario_path (str): Scenario JSON.
+        param_file (str): Controller parameter file (param-api-mixer.txt).
+        drone_config_path (str): Drone config JSON (drone_config_0.json).
+        extra: JSON serializable value that also affects the run (e.g. the launch commands).
+
+        Returns:
+        str: Cache key.
+        """
+        with open(scenario_path, 'r') as f:
+            scenario = json.load(f)
+        with open(drone_config_path, 'r') as f:
+            drone_config = json.load(f)
+        # where the simulator writes its logs does not affect the results
+        drone_config.get('simulation', {}).pop('logOutputDirectory', None)
+        controller = drone_config.get('controller', {})
+        module_dir = controller.get('moduleDirectory')
+        inputs = {
+            'scenario': scenario,
+            'params': file_digest(param_file),
+            'drone_config': drone_config,
+            'module_name': controller.get('moduleName'),
+            'module': tree_digest(module_dir) if module_dir else None,
+            # evaluator.py / freq_evaluator.py and the components
+            'code': tree_digest(SCRIPT_DIR, suffixes=['.py']),
+            'extra': extra,
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def restore(self, key, dest_dir):
+        """
+        Copies the files of the entry to dest_dir.
+
+        Returns:
+        dict: Results stored with the entry, or None on a miss.
+        """
+        entry_dir = self._entry_dir(key)
+        metadata_path = os.path.join(entry_dir, ENTRY_METADATA_FILE)
+        try:
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+            files_dir = os.path.join(entry_dir, ENTRY_FILES_DIR)
+            for artifact in metadata['artifacts']:
+                src = os.path.join(files_dir, artifact)
+                dest = os.path.join(dest_dir, artifact)
+                if os.path.isdir(dest):
+                    shutil.rmtree(dest)
+                os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+                if os.path.isdir(src):
+                    shutil.copytree(src, dest)
+                else:
+                    shutil.copy2(src, dest)
+            # the modification time of the metadata is the last use
+            os.utime(metadata_path)
+        except FileNotFoundError:
+            # missing, or evicted by another process meanwhile
+            return None
+        return metadata['results']
+
+    def store(self, key, src_dir, artifacts, results):
+        """
+        Stores the existing files of artifacts (relative to src_dir) and results, then
+        evicts entries over the size limit.
+        """
+        if os.path.isdir(self._entry_dir(key)):
+            return
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.cache_dir)
+        try:
+            os.chmod(tmp_dir, 0o755)
+            files_dir = os.path.join(tmp_dir, ENTRY_FILES_DIR)
+            stored = []
+            size = 0
+            for artifact in artifacts:
+                src = os.path.join(src_dir, artifact)
+                dest = os.path.join(files_dir, artifact)
+                if os.path.isdir(src):
+                    shutil.copytree(src, dest)
+                elif os.path.isfile(src):
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    shutil.copy2(src, dest)
+                else:
+                    continue
+                stored.append(artifact)
+                size += self._size(dest)
+            metadata = {'artifacts': stored, 'results': results, 'size': size, 'created': time.time()}
+            with open(os.path.join(tmp_dir, ENTRY_METADATA_FILE), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.rename(tmp_dir, self._entry_dir(key))
+        except OSError:
+            # stored by another process meanwhile
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(self._entry_dir(key)):
+                raise
+        self.evict()
+
+    def _size(self, path):
+        if os.path.isfile(path):
+            return os.path.getsize(path)
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+    def entries(self):
+        """
+        Returns:
+        list: (last use, size, key) of the entries, least recently used first.
+        """
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            metadata_path = os.path.join(self.cache_dir, key, ENTRY_METADATA_FILE)
+            try:
+                with open(metadata_path, 'r') as f:
+                    size = json.load(f)['size']
+                entries.append((os.path.getmtime(metadata_path), size, key))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        return sorted(entries)
+
+    def evict(self):
+        """最終使用が古いエントリから、合計サイズが max_bytes 以下になるまで削除する"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
@@ -1,7 +1,8 @@
-import pandas as pd
 import numpy as np
-import sys
+import os
 import json
+import argparse
+from components.log_reader import read_log, read_log_metadata
 
 class EvaluationParameters:
     DEFAULT_PARAMS = {
@@ -21,11 +22,109 @@ class EvaluationParameters:
             self.params.update(target_params)
 
 
+def step_metrics(timestamps, values, params, num_last_points, value_min=None, value_max=None):
+    """
+    Step response metrics of several signals (axes and runs) at once, in O(n) per signal.
+
+    Thresholds are found with one comparison and an argmax per signal, and the
+    settling time with a reverse cumulative AND of the settled mask (settled from
+    the sample to the end).
+
+    Parameters:
+    timestamps (numpy.ndarray): (k, n) or (n,) seconds from the evaluation start.
+    values (numpy.ndarray): (k, n) signals; shorter signals are NaN padded at the end.
+    params (list): EvaluationParameters.params of each signal.
+    num_last_points (list): Number of last samples averaged for the steady-state value of each signal.
+    value_min, value_max (numpy.ndarray): (k, n) min/max envelope of decimated logs, or None.
+
+    Returns:
+    dict: (k,) arrays 'steady_value', 'variance', 'rise_time', 'delay_time', 'overshoot'
+    and 'settling_time' (NaN where a threshold is never reached, 10000.0 if never settled).
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    timestamps = np.broadcast_to(np.asarray(timestamps, dtype=float), values.shape)
+    count, length = values.shape
+    rows = np.arange(count)
+    valid = ~np.isnan(values)
+    lengths = valid.sum(axis=1)
+
+    def param(name):
+        return np.array([p[name] for p in params], dtype=float)
+
+    # steady state: mean and variance of the last num_last_points samples (0: all, like data[-0:])
+    num_last_points = np.asarray(num_last_points)
+    num_last_points = np.where(num_last_points > 0, num_last_points, lengths)
+    last = valid & (np.arange(length) >= (lengths - num_last_points)[:, None])
+    last_count = last.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        steady_value = np.where(last, values, 0.0).sum(axis=1) / last_count
+        variance = np.where(last, (values - steady_value[:, None]) ** 2, 0.0).sum(axis=1) / (last_count - 1)
+
+    # decreasing responses are mirrored at the initial value, as increasing ones
+    initial_value = values[:, 0]
+    is_increase = steady_value > initial_value
+    mirror = lambda x: np.where(is_increase[:, None], x, initial_value[:, None] - x)
+    response = mirror(values)
+    steady = np.where(is_increase, steady_value, initial_value - steady_value)
+    envelope = None
+    if value_min is not None and value_max is not None:
+        # mirroring swaps the envelope bounds
+        envelope_min = np.where(is_increase[:, None], value_min, initial_value[:, None] - value_max)
+        envelope_max = np.where(is_increase[:, None], value_max, initial_value[:, None] - value_min)
+        envelope = (envelope_min, envelope_max)
+
+    def crossing_time(threshold):
+        # first sample at or above the threshold (NaN never compares true)
+        reached = response >= threshold[:, None]
+        first = reached.argmax(axis=1)
+        return np.where(reached.any(axis=1), timestamps[rows, first], np.nan)
+
+    rise_time_start = crossing_time(steady * param('RISE_TIME_10_PERCENT'))
+    rise_time_end = crossing_time(steady * param('RISE_TIME_90_PERCENT'))
+    delay_time = crossing_time(steady * param('DELAY_TIME_PERCENT'))
+
+    # the envelope keeps the peaks that fall between decimated samples
+    max_value = np.nanmax(envelope[1] if envelope else response, axis=1)
+    overshoot = np.where(is_increase, max_value - steady, 0.0)
+
+    settling_band = np.abs(steady * param('SETTLING_TIME_PERCENT'))[:, None]
+    if envelope:
+        # a window is settled only if its whole envelope is within the band
+        settled = (np.abs(envelope[0] - steady[:, None]) <= settling_band) & (np.abs(envelope[1] - steady[:, None]) <= settling_band)
+    else:
+        settled = np.abs(response - steady[:, None]) <= settling_band
+    # settled from the sample to the end of the signal (padding counts as settled)
+    settled_to_end = np.logical_and.accumulate((settled | ~valid)[:, ::-1], axis=1)[:, ::-1] & valid
+    first_settled = settled_to_end.argmax(axis=1)
+    settling_time = np.where(settled_to_end.any(axis=1), timestamps[rows, first_settled], 10000.0)
+
+    return {
+        'steady_value': steady_value,
+        'variance': variance,
+        'rise_time': rise_time_end - rise_time_start,
+        'delay_time': delay_time,
+        'overshoot': overshoot,
+        'settling_time': settling_time,
+    }
+
+
 class DataEvaluator:
-    def __init__(self, input_file, evaluation_params: EvaluationParameters):
-        self.params = evaluation_params.params
-        self.data = pd.read_csv(input_file)
+    def __init__(self, input_file, evaluation_params: EvaluationParameters, data=None, metadata=None):
+        """
+        Parameters:
+        data (pandas.DataFrame): The log, if already read (e.g. for several axes of one log).
+        metadata (dict): The log metadata read with data.
+        """
+        self.input_file = input_file
+        self.params = evaluation_params.params.copy()
+        if data is None:
+            data = read_log(input_file)
+            # decimated logs (evaluation.input_data.decimation) may carry a min/max envelope per window
+            metadata = read_log_metadata(input_file)
+        self.data = data.copy()
+        self.metadata = metadata
         self.results = {}
+        self.error = None
         self.params["NUM_LAST_POINTS"] = len(self.data) // 10  # Calculate NUM_LAST_POINTS from data
         self.preprocess_data()
 
@@ -36,17 +135,34 @@ class DataEvaluator:
         self.data['timestamp'] = self.data['timestamp'] / 1e6  # Convert from usec to sec
         # Select the axis and apply inversion if specified
         axis = self.params['AXIS']
+        envelope = self.envelope_columns()
         if self.params['INVERT_AXIS']:
             self.data[axis] = -1.0 * self.data[axis]
+            if envelope:
+                axis_min, axis_max = envelope
+                self.data[axis_min], self.data[axis_max] = -1.0 * self.data[axis_max], -1.0 * self.data[axis_min]
         # Convert radians to degrees if specified
         if self.params.get('CONVERT_TO_DEGREE', False):
-            self.data[axis] = np.degrees(self.data[axis])
+            for column in [axis] + list(envelope or []):
+                self.data[column] = np.degrees(self.data[column])
         # Filter data starting from the evaluation start time
         evaluation_start_time = self.params['EVALUATION_START_TIME']
         self.data = self.data[self.data['timestamp'] >= evaluation_start_time].copy()
         # Adjust timestamps to start from the evaluation start time
         self.data['timestamp'] -= evaluation_start_time
 
+    def envelope_columns(self):
+        """
+        Returns the (min, max) envelope columns of the axis, or None if the log has no envelope.
+        """
+        if self.metadata is None or not self.metadata.get('envelope', False):
+            return None
+        axis = self.params['AXIS']
+        envelope = (f"{axis}_min", f"{axis}_max")
+        if envelope[0] not in self.data.columns or envelope[1] not in self.data.columns:
+            return None
+        return envelope
+
     def calculate_steady_state(self):
         # Calculate steady-state value (average of the last NUM_LAST_POINTS values)
         steady_state_data = self.data[self.params['AXIS']][-self.params['NUM_LAST_POINTS']:]
@@ -61,65 +177,30 @@ class DataEvaluator:
             return False
         return True
     
+    def signal(self):
+        """
+        Returns:
+        (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray): Timestamps, axis values
+        and min/max envelope (None without envelope) of the preprocessed data.
+        """
+        envelope = self.envelope_columns()
+        value_min, value_max = (self.data[envelope[0]].to_numpy(), self.data[envelope[1]].to_numpy()) if envelope else (None, None)
+        return self.data['timestamp'].to_numpy(), self.data[self.params['AXIS']].to_numpy(), value_min, value_max
+
     def calculate_performance_metrics(self, steady_value):
-        org_steady_value = steady_value
-        axis = self.params['AXIS']
-        target_value = self.params['TARGET_VALUE']
-
-        # Determine if the value is increasing or decreasing based on the initial and steady values
-        is_increase = steady_value > self.data[axis].iloc[0]
-        if not is_increase:
-            # Decreasing case
-            initial_value = self.data[axis].iloc[0]
-            steady_value = initial_value - steady_value
-            self.data[axis] = initial_value - self.data[axis]
-
-        # Process as increasing case for calculations
-        rise_threshold_10_percent = steady_value * self.params['RISE_TIME_10_PERCENT']
-        rise_threshold_90_percent = steady_value * self.params['RISE_TIME_90_PERCENT']
-        delay_threshold = steady_value * self.params['DELAY_TIME_PERCENT']
-
-        # Calculate rise time start
-        rise_time_start_condition = self.data[axis] >= rise_threshold_10_percent
-        if rise_time_start_condition.any():
-            rise_time_start = self.data.loc[rise_time_start_condition, 'timestamp'].min()
-        else:
-            rise_time_start = None
-
-        # Calculate rise time end
-        rise_time_end_condition = self.data[axis] >= rise_threshold_90_percent
-        if rise_time_end_condition.any():
-            rise_time_end = self.data.loc[rise_time_end_condition, 'timestamp'].min()
-        else:
-            rise_time_end = None
-
-        # Calculate delay time
-        delay_time_condition = self.data[axis] >= delay_threshold
-        if delay_time_condition.any():
-            delay_time = self.data.loc[delay_time_condition, 'timestamp'].min()
-        else:
-            delay_time = None
-
-        max_value = self.data[axis].max()
-
-        T_r = rise_time_end - rise_time_start
-        T_d = delay_time
-        O_s = max_value - steady_value if is_increase else 0
-
-        # Settling time T_s
-        settled = np.abs(self.data[axis] - steady_value) <= np.abs(steady_value * self.params['SETTLING_TIME_PERCENT'])
-        T_s = None
-        for i in range(len(settled)):
-            if settled.iloc[i]:
-                others_settled = np.all(settled.iloc[i:])
-                if others_settled:
-                    T_s = self.data['timestamp'].iloc[i]
-                    break
-
-        if T_s is None:
-            T_s = 10000.0
-
-        return T_r, T_d, O_s, T_s, target_value, org_steady_value
+        timestamps, values, value_min, value_max = self.signal()
+        metrics = step_metrics(timestamps, values[np.newaxis], [self.params], [self.params['NUM_LAST_POINTS']],
+                               None if value_min is None else value_min[np.newaxis],
+                               None if value_max is None else value_max[np.newaxis])
+        return self.performance_metrics(metrics, 0)
+
+    def performance_metrics(self, metrics, index):
+        """
+        Returns:
+        tuple: (T_r, T_d, O_s, T_s, target_value, steady_value) of the index-th signal of step_metrics().
+        """
+        return (metrics['rise_time'][index], metrics['delay_time'][index], metrics['overshoot'][index],
+                metrics['settling_time'][index], self.params['TARGET_VALUE'], metrics['steady_value'][index])
 
     def evaluate_performance(self, T_r, T_d, O_s, T_s, target_value, steady_value):
         # Determine results
@@ -145,14 +226,94 @@ class DataEvaluator:
         print(f"{self.results['delay_time'][0]} T_d(Delay time)        : {self.results['delay_time'][1]:.3f} s (Target: ≤ {self.params['TARGET_TD']:.3f} s)")
         print(f"{self.results['overshoot'][0]} O_s(Maximum overshoot) : {self.results['overshoot'][1]:.3f}   (Target: ≤ {self.params['TARGET_OS']:.3f} m)")
         print(f"{self.results['settling_time'][0]} T_s(5% settling time)  : {self.results['settling_time'][1]:.3f} s (Target: ≤ {self.params['TARGET_TS']:.3f} s)")
+        if self.metadata is not None and self.metadata.get('sample_spacing_usec'):
+            # times are resolved to the effective sample spacing of the decimated log
+            print(f"INFO: decimation: {self.metadata['decimation']}, sample spacing: {self.metadata['sample_spacing_usec'] / 1e6:.3f} s")
+
+    def apply_metrics(self, metrics, index):
+        """Judges the index-th signal of step_metrics() against the targets."""
+        if not self.check_steady_state(metrics['steady_value'][index], metrics['variance'][index]):
+            self.error = "Variance is too high. Steady state value is unstable."
+            return False
+        self.evaluate_performance(*self.performance_metrics(metrics, index))
+        return True
+
+    def to_dict(self):
+        """
+        Returns:
+        dict: The results, JSON serializable ('passed': all metrics OK, NaN as None).
+        """
+        result = {'input_file': self.input_file, 'axis': self.params['AXIS'], 'error': self.error,
+                  'passed': self.error is None and all(judge == "OK" for judge, _ in self.results.values())}
+        targets = {
+            'steady_state': self.params['TARGET_VALUE'],
+            'rise_time': self.params.get('TARGET_TR'),
+            'delay_time': self.params.get('TARGET_TD'),
+            'overshoot': self.params.get('TARGET_OS'),
+            'settling_time': self.params.get('TARGET_TS'),
+        }
+        for name, (judge, value) in self.results.items():
+            value = None if value is None or np.isnan(value) else float(value)
+            result[name] = {'result': judge, 'value': value, 'target': targets[name]}
+        return result
 
     def run_evaluation(self):
-        steady_value, variance = self.calculate_steady_state()
-        if not self.check_steady_state(steady_value, variance):
-            return
-        T_r, T_d, O_s, T_s, target_value, steady_value = self.calculate_performance_metrics(steady_value)
-        self.evaluate_performance(T_r, T_d, O_s, T_s, target_value, steady_value)
-        self.display_results()
+        if evaluate_step_responses([self])[0]:
+            self.display_results()
+
+
+def evaluate_step_responses(evaluators):
+    """
+    Evaluates the axes of several DataEvaluator in one step_metrics() call.
+
+    Returns:
+    list: True for each evaluator whose results are set, False if its steady state is unstable.
+    """
+    signals = [evaluator.signal() for evaluator in evaluators]
+    length = max(len(values) for _, values, _, _ in signals)
+
+    def stack(index):
+        # NaN padding to the longest signal
+        if any(signal[index] is None for signal in signals):
+            return None
+        stacked = np.full((len(signals), length), np.nan)
+        for row, signal in enumerate(signals):
+            stacked[row, :len(signal[index])] = signal[index]
+        return stacked
+
+    metrics = step_metrics(stack(0), stack(1), [evaluator.params for evaluator in evaluators],
+                           [evaluator.params['NUM_LAST_POINTS'] for evaluator in evaluators], stack(2), stack(3))
+    return [evaluator.apply_metrics(metrics, index) for index, evaluator in enumerate(evaluators)]
+
+def load_step_evaluations(scenario_file, base_dir=None):
+    """
+    Reads the step evaluations of a scenario: evaluation.step_evaluation is one
+    {config_params, target_params} or a list of them (several axes of the output log).
+
+    Returns:
+    list: (log file, config_params, target_params) per axis; the log file is relative to base_dir if given.
+    """
+    with open(scenario_file, "r") as json_file:
+        config_data = json.load(json_file)
+    step_evaluations = config_data["evaluation"]["step_evaluation"]
+    if isinstance(step_evaluations, dict):
+        step_evaluations = [step_evaluations]
+    input_file = config_data["evaluation"]["output_data"]["log_file"]
+    if base_dir is not None:
+        input_file = os.path.join(base_dir, input_file)
+    return [(input_file, step_evaluation["config_params"], step_evaluation["target_params"]) for step_evaluation in step_evaluations]
+
+def create_evaluators(step_evaluations):
+    """Creates the DataEvaluator of (log file, config_params, target_params), reading each log once."""
+    logs = {}
+    evaluators = []
+    for input_file, config_params, target_params in step_evaluations:
+        if input_file not in logs:
+            logs[input_file] = (read_log(input_file), read_log_metadata(input_file))
+        data, metadata = logs[input_file]
+        evaluation_params = EvaluationParameters(config=config_params, target_params=target_params)
+        evaluators.append(DataEvaluator(input_file, evaluation_params, data, metadata))
+    return evaluators
 
 
 def main(input_file, config_params=None, target_params=None):
@@ -188,19 +349,20 @@ def main(input_file, config_params=None, target_params=None):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <simulation_config_file>")
-    else:
-        # Load JSON file with simulation and evaluation parameters
-        with open(sys.argv[1], "r") as json_file:
-            config_data = json.load(json_file)
-
-        # Extract configuration and target parameters from the loaded JSON
-        config_params = config_data["evaluation"]["step_evaluation"]["config_params"]
-        target_params = config_data["evaluation"]["step_evaluation"]["target_params"]
-
-        # Sample CSV file path (replace with your actual file path)
-        input_file = config_data["evaluation"]["output_data"]["log_file"]
+    parser = argparse.ArgumentParser(description='Evaluate the step response of one or more scenarios.')
+    parser.add_argument('simulation_config_file', nargs='+', help='Scenario JSON (evaluation.step_evaluation and output_data.log_file)')
+    parser.add_argument('--json', help='Write the results of all evaluations to this JSON file')
+    args = parser.parse_args()
 
-        # Running the main function with extracted parameters
-        main(input_file, config_params, target_params)
+    step_evaluations = [step_evaluation for config_file in args.simulation_config_file
+                        for step_evaluation in load_step_evaluations(config_file)]
+    evaluators = create_evaluators(step_evaluations)
+    evaluated = evaluate_step_responses(evaluators)
+    for evaluator, ok in zip(evaluators, evaluated):
+        if len(evaluators) > 1:
+            print(f"== {evaluator.input_file} ({evaluator.params['AXIS']})")
+        if ok:
+            evaluator.display_results()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([evaluator.to_dict() for evaluator in evaluators], f, indent=2)
@@ -0,0 +1,398 @@
+import sys
+import os
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import subprocess
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from components.drone_config_updater import DroneConfigUpdater, validate_evaluation_config
+from update_input_params import update_input_params
+from update_control_params import modify_simulation_delta_time
+from launcher import launch, load_launch_config
+from result_cache import ResultCache, DEFAULT_CACHE_MAX_BYTES, scenario_artifacts
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_HEADER = "freq, log_freq, gain, phase, phase1_at_freq, phase2_at_freq"
+ADAPTIVE_HEADER = "freq, cycles, converged, saved_sec"
+QUALITY_HEADER = "freq, coherence, snr_db, gain_std_db, phase_std_deg"
+SCENARIO_FILE = 'sine-input-updated.json'
+QUALITY_FILE = 'quality.csv'
+# --rerun: 再実行中の前回の測定点ディレクトリ、失敗した再実行のディレクトリ
+PREVIOUS_SUFFIX = '.previous'
+FAILED_SUFFIX = '.failed'
+
+# evaluate.bash と同じ既定値（workspace ディレクトリからの相対パス）
+DEFAULT_DRONE_TEMPLATE_CONFIG = '../installer/config/mixer-api/drone_config_0.json'
+DEFAULT_PDU_CONFIG = 'root/var/lib/hakoniwa/config/custom.json'
+DEFAULT_PARAM_FILE = '../src/drone_control/config/param-api-mixer.txt'
+DEFAULT_MODULE_BASE_PATH = '../src/drone_control/cmake-build/workspace/'
+
+def absolutize_paths(params, base_dir):
+    """
+    ドローン設定の相対パス（*Path, *Directory キー）を base_dir 基準の絶対パスにする。
+    logOutputDirectory は呼び出し側で実行ディレクトリに設定し直すこと。
+    """
+    if isinstance(params, dict):
+        for key, value in params.items():
+            if isinstance(value, str) and (key.endswith('Path') or key.endswith('Directory')) and value.startswith('.'):
+                params[key] = os.path.normpath(os.path.join(base_dir, value))
+            else:
+                absolutize_paths(value, base_dir)
+    elif isinstance(params, list):
+        for value in params:
+            absolutize_paths(value, base_dir)
+
+def create_core_config(point_dir):
+    """
+    箱庭コアの共有メモリを測定点ごとに分離する cpp_core_config.json を作成する。
+    HAKO_CONFIG_PATH が未設定の場合は None を返す（共有メモリは全測定点で共通）。
+    """
+    core_config_path = os.environ.get('HAKO_CONFIG_PATH')
+    if not core_config_path or not os.path.isfile(core_config_path):
+        return None
+    with open(core_config_path, 'r') as f:
+        core_config = json.load(f)
+    mmap_dir = os.path.join(point_dir, 'mmap')
+    os.makedirs(mmap_dir, exist_ok=True)
+    core_config['shm_type'] = 'mmap'
+    core_config['core_mmap_path'] = mmap_dir
+    path = os.path.join(point_dir, 'cpp_core_config.json')
+    with open(path, 'w') as f:
+        json.dump(core_config, f, indent=4)
+    return path
+
+def prepare_point(args, index, freq_label, point_dir, workspace_dir, launch_config):
+    """測定点のシナリオ、制御パラメータ、ドローン設定を point_dir に作成する"""
+    os.makedirs(point_dir, exist_ok=True)
+    scenario_path = os.path.join(point_dir, SCENARIO_FILE)
+    scenario = update_input_params(os.path.join(args.input_dir, 'test_pattern.csv'),
+                                   os.path.join(args.input_dir, 'config.json'),
+                                   args.template, index, scenario_path)
+    if args.transport == 'virtual':
+        # 仮想トランスポートではドローンのログが出力されないため、オンライン推定の結果を使う
+        scenario['evaluation']['freq_evaluation'].setdefault('online', {})
+        with open(scenario_path, 'w') as f:
+            json.dump(scenario, f, indent=2)
+    validate_evaluation_config(scenario)
+
+    param_file = os.path.join(point_dir, 'param-api-mixer.txt')
+    shutil.copyfile(args.param_file, param_file)
+    modify_simulation_delta_time(param_file, 'SIMULATION_DELTA_TIME', scenario['simulation']['simulation_time_step'])
+
+    drone_config_dir = os.path.join(point_dir, 'mixer-api')
+    os.makedirs(drone_config_dir, exist_ok=True)
+    drone_config = os.path.join(drone_config_dir, 'drone_config_0.json')
+    updater = DroneConfigUpdater(args.drone_template_config, args.module_base_path)
+    absolutize_paths(updater.params, workspace_dir)
+    # drone_log0 は測定点ごとに分ける（評価は point_dir で行う）
+    updater.set_log_output_directory(point_dir)
+    if scenario['simulation']['type'] == 'plant':
+        updater.set_plant_module()
+    else:
+        updater.set_controller_module(scenario['simulation']['controller_type'])
+    updater.set_simulation_time_step(scenario['simulation']['simulation_time_step'])
+    updater.save(drone_config)
+
+    env = {
+        'HAKO_CONTROLLER_PARAM_FILE': param_file,
+        'DRONE_CONFIG_PATH': drone_config_dir,
+    }
+    core_config = create_core_config(point_dir)
+    if core_config is not None:
+        env['HAKO_CONFIG_PATH'] = core_config
+    return {
+        'index': index,
+        'freq': freq_label,
+        'dir': point_dir,
+        'drone_config': drone_config,
+        'pdu_config': args.pdu_config,
+        'asset_name': f"SimulationExecutor{index}",
+        'port': args.port_base + index,
+        'transport': args.transport,
+        'launch_config': launch_config,
+        'scenario': scenario,
+        'param_file': param_file,
+        'cache_dir': args.cache_dir,
+        'cache_max_bytes': int(args.cache_max_gb * 1024 ** 3),
+        'env': env,
+    }
+
+def simulate_point(point, cwd, env, log):
+    """
+    測定点のシミュレーションを実行し、freq_evaluator.py の出力行を返す。
+
+    Raises:
+    RuntimeError: シミュレーションまたは評価に失敗した場合
+    """
+    values = {
+        'drone_config': point['drone_config'],
+        'pdu_config': point['pdu_config'],
+        'scenario': SCENARIO_FILE,
+        'asset_name': point['asset_name'],
+        'port': point['port'],
+    }
+    ret = asyncio.run(launch(point['launch_config'], values, cwd, env, log))
+    if ret != 0:
+        raise RuntimeError(f"evaluator.py exited with {ret}")
+    if point['transport'] == 'virtual':
+        with open(os.path.join(cwd, 'freq_result.csv'), 'r') as f:
+            return [line for line in f.read().splitlines() if line.strip()]
+    evaluation = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, 'freq_evaluator.py'), SCENARIO_FILE,
+                                 '--quality-file', QUALITY_FILE],
+                                cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=log, text=True)
+    if evaluation.returncode != 0:
+        raise RuntimeError(f"freq_evaluator.py exited with {evaluation.returncode}")
+    return [line for line in evaluation.stdout.splitlines() if line.strip()]
+
+def run_point(point):
+    """
+    1測定点のシミュレータと評価器を point['dir'] で実行し、freq_evaluator.py の出力行を返す。
+    各プロセスの出力は point['dir']/run.log に書き出す。
+    結果キャッシュにある場合は、ログと結果をキャッシュから復元する。
+    """
+    start = time.perf_counter()
+    cwd = point['dir']
+    env = dict(os.environ, **point['env'])
+    result = {'index': point['index'], 'freq': point['freq'], 'lines': [], 'quality': [], 'adaptive': [], 'error': None, 'cached': False}
+    cache = None
+    if point['cache_dir'] is not None:
+        cache = ResultCache(point['cache_dir'], point['cache_max_bytes'])
+        key = cache.key(os.path.join(cwd, SCENARIO_FILE), point['param_file'], point['drone_config'], extra=point['launch_config'])
+        cached = cache.restore(key, cwd)
+        if cached is not None:
+            result['lines'] = cached['lines']
+            result['quality'] = cached.get('quality', [])
+            result['cached'] = True
+    if not result['cached']:
+        with open(os.path.join(cwd, 'run.log'), 'w') as log:
+            try:
+                result['lines'] = simulate_point(point, cwd, env, log)
+            except RuntimeError as e:
+                result['error'] = str(e)
+        result['quality'] = read_lines(os.path.join(cwd, QUALITY_FILE))
+        if cache is not None and result['error'] is None:
+            cache.store(key, cwd, scenario_artifacts(point['scenario']), {'lines': result['lines'], 'quality': result['quality']})
+    # freq_evaluation.online.adaptive の統計
+    result['adaptive'] = read_lines(os.path.join(cwd, 'adaptive_sweep.csv'))
+    result['wall_sec'] = time.perf_counter() - start
+    return result
+
+def read_lines(path, header=None):
+    """ファイルの空でない行（header の行を除く）。ファイルがない場合は空のリスト"""
+    if not os.path.isfile(path):
+        return []
+    with open(path, 'r') as f:
+        return [line for line in f.read().splitlines() if line.strip() and line != header]
+
+def lines_by_freq(lines):
+    """結果の行を周波数（先頭の列）ごとにまとめる"""
+    grouped = {}
+    for line in lines:
+        grouped.setdefault(float(line.split(',')[0]), []).append(line)
+    return grouped
+
+def quality_failures(quality_line, args):
+    """品質の行（QUALITY_HEADER）が閾値を満たさない項目の一覧（NaN は満たさないものとする）"""
+    values = dict(zip([name.strip() for name in QUALITY_HEADER.split(',')], [float(value) for value in quality_line.split(',')]))
+    failures = []
+    if not values['coherence'] >= args.min_coherence:
+        failures.append(f"coherence {values['coherence']:.4f}")
+    if not values['snr_db'] >= args.min_snr_db:
+        failures.append(f"SNR {values['snr_db']:.1f} dB")
+    if not values['gain_std_db'] <= args.max_gain_std_db:
+        failures.append(f"gain std {values['gain_std_db']:.3f} dB")
+    if not values['phase_std_deg'] <= args.max_phase_std_deg:
+        failures.append(f"phase std {values['phase_std_deg']:.2f} deg")
+    return failures
+
+def extend_duration(point, previous_scenario, scale):
+    """
+    測定点のシナリオの評価区間（start_time 以降）を、前回のシナリオの scale 倍にする。
+    繰り返し再実行すると、そのたびに評価区間が長くなる。
+    """
+    scenario = point['scenario']
+    start_time = scenario['evaluation']['freq_evaluation']['start_time']
+    for timing, previous_timing in zip(scenario['simulation']['signal_input_timings'], previous_scenario['simulation']['signal_input_timings']):
+        timing['duration_sec'] = start_time + (previous_timing['duration_sec'] - start_time) * scale
+    with open(os.path.join(point['dir'], SCENARIO_FILE), 'w') as f:
+        json.dump(scenario, f, indent=2)
+
+def restore_previous_run(point_dir, result, previous_run):
+    """
+    再実行した測定点の後始末。失敗した場合は、再実行のディレクトリを FAILED_SUFFIX 付きに残し、
+    前回のディレクトリと結果（previous_run の lines, quality, adaptive）に戻す。
+    """
+    previous_dir = point_dir + PREVIOUS_SUFFIX
+    if result['error'] is None:
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        shutil.rmtree(point_dir + FAILED_SUFFIX, ignore_errors=True)
+        return
+    print(f"INFO: freq {result['freq']}: the re-run failed, the previous result is kept")
+    result.update(previous_run)
+    if os.path.isdir(previous_dir):
+        shutil.rmtree(point_dir + FAILED_SUFFIX, ignore_errors=True)
+        os.rename(point_dir, point_dir + FAILED_SUFFIX)
+        os.rename(previous_dir, point_dir)
+
+def run_points(points, jobs):
+    """測定点を最大 jobs 組同時に実行し、測定点の順の結果と所要時間を返す"""
+    start = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=max(min(jobs, len(points)), 1)) as pool:
+        futures = [pool.submit(run_point, point) for point in points]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result['index']] = result
+            status = "done" if result['error'] is None else f"FAILED ({result['error']})"
+            if result['cached']:
+                status = "restored from cache"
+            print(f"INFO: freq {result['freq']} {status} in {result['wall_sec']:.1f} s")
+    return [results[point['index']] for point in points], time.perf_counter() - start
+
+def write_atomic(path, header, lines):
+    """一時ファイルに書き出してから置き換える"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(header + "\n")
+        for line in lines:
+            f.write(line + "\n")
+    os.replace(tmp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the frequency sweep of a test pattern directory in parallel.')
+    parser.add_argument('input_dir', help='Directory containing test_pattern.csv and config.json')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help='Number of simulations run concurrently')
+    parser.add_argument('--output-dir', help='Output directory (default: test-results/<input_dir name>)')
+    parser.add_argument('--template', default=os.path.join(SCRIPT_DIR, 'template', 'sine-input.json'), help='Sine input template')
+    parser.add_argument('--drone-template-config', default=DEFAULT_DRONE_TEMPLATE_CONFIG, help='Drone config template')
+    parser.add_argument('--pdu-config', default=DEFAULT_PDU_CONFIG, help='PDU config (custom.json)')
+    parser.add_argument('--param-file', default=DEFAULT_PARAM_FILE, help='Original controller parameter file')
+    parser.add_argument('--module-base-path', default=DEFAULT_MODULE_BASE_PATH, help='Directory of the controller modules')
+    parser.add_argument('--port-base', type=int, default=450, help='hako-px4sim port of the first point (incremented per point)')
+    parser.add_argument('--transport', choices=['hako', 'virtual'], default='hako',
+                        help='virtual: run the evaluator on the virtual clock only (dry run of the sweep)')
+    parser.add_argument('--launch-config', help='Launch config JSON of launcher.py')
+    parser.add_argument('--cache-dir', help='Result cache directory (default: no cache)')
+    parser.add_argument('--cache-max-gb', type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 3, help='Result cache size limit in GiB')
+    parser.add_argument('--rerun', action='store_true',
+                        help='Re-run only the points of the previous sweep in the output directory that fail the quality thresholds, with a longer duration')
+    parser.add_argument('--min-coherence', type=float, default=0.99, help='Quality threshold of --rerun')
+    parser.add_argument('--min-snr-db', type=float, default=30.0, help='Quality threshold of --rerun (SNR at the fundamental)')
+    parser.add_argument('--max-gain-std-db', type=float, default=0.1, help='Quality threshold of --rerun (gain std across sub-windows)')
+    parser.add_argument('--max-phase-std-deg', type=float, default=1.0, help='Quality threshold of --rerun (phase std across sub-windows)')
+    parser.add_argument('--duration-scale', type=float, default=2.0,
+                        help='Factor of --rerun on the evaluated duration (after start_time) of the previous run')
+    args = parser.parse_args()
+
+    workspace_dir = os.getcwd()
+    args.input_dir = os.path.abspath(args.input_dir)
+    args.template = os.path.abspath(args.template)
+    args.drone_template_config = os.path.abspath(args.drone_template_config)
+    args.pdu_config = os.path.abspath(args.pdu_config)
+    args.param_file = os.path.abspath(args.param_file)
+    args.module_base_path = os.path.join(os.path.abspath(args.module_base_path), '')
+    if args.cache_dir is not None:
+        args.cache_dir = os.path.abspath(args.cache_dir)
+    output_dir = os.path.abspath(args.output_dir or os.path.join('test-results', os.path.basename(os.path.normpath(args.input_dir))))
+
+    # 周波数は test_pattern.csv の表記のままディレクトリ名に使う（evaluate-phase-gains.bash と同じ）
+    freq_labels = pd.read_csv(os.path.join(args.input_dir, 'test_pattern.csv'), dtype={'freq': str})['freq'].tolist()
+    if len(freq_labels) == 0:
+        print("ERROR: test_pattern.csv contains no test pattern")
+        return 1
+
+    overrides = None
+    if args.transport == 'virtual':
+        evaluator_command = load_launch_config()['evaluator']['command'] + ['--transport', 'virtual']
+        overrides = {'simulator': None, 'start': None, 'evaluator': {'command': evaluator_command}}
+    launch_config = load_launch_config(args.launch_config, overrides)
+
+    kept = []
+    points = []
+    previous_runs = {}
+    if args.rerun:
+        # 前回のスイープの結果のうち、品質が閾値を満たさない測定点だけを評価区間を延ばして再実行する
+        result_file = os.path.join(output_dir, 'result.csv')
+        if not os.path.isfile(result_file):
+            print(f"ERROR: no previous sweep result in {output_dir}")
+            return 1
+        previous_lines = lines_by_freq(read_lines(result_file, RESULT_HEADER))
+        previous_quality = lines_by_freq(read_lines(os.path.join(output_dir, QUALITY_FILE), QUALITY_HEADER))
+        for index, freq_label in enumerate(freq_labels):
+            point_dir = os.path.join(output_dir, f"freq_{freq_label}")
+            lines = previous_lines.get(float(freq_label), [])
+            quality = previous_quality.get(float(freq_label), [])
+            if not lines:
+                failures = ['no result']
+            elif not quality:
+                # スイープが品質の出力より古い場合や、オンライン推定（--transport virtual）の場合
+                failures = ['no quality metrics']
+            else:
+                failures = [failure for line in quality for failure in quality_failures(line, args)]
+            if not failures:
+                kept.append({'index': index, 'freq': freq_label, 'lines': lines, 'quality': quality,
+                             'adaptive': read_lines(os.path.join(point_dir, 'adaptive_sweep.csv')),
+                             'error': None, 'cached': False, 'wall_sec': 0.0})
+                continue
+            print(f"INFO: freq {freq_label} is re-run: {', '.join(failures)}")
+            previous_scenario = None
+            if os.path.isfile(os.path.join(point_dir, SCENARIO_FILE)):
+                with open(os.path.join(point_dir, SCENARIO_FILE), 'r') as f:
+                    previous_scenario = json.load(f)
+            # 再実行に失敗した場合に前回の結果とログに戻せるように残しておく
+            previous_runs[index] = {'lines': lines, 'quality': quality,
+                                    'adaptive': read_lines(os.path.join(point_dir, 'adaptive_sweep.csv'))}
+            shutil.rmtree(point_dir + PREVIOUS_SUFFIX, ignore_errors=True)
+            if os.path.isdir(point_dir):
+                os.rename(point_dir, point_dir + PREVIOUS_SUFFIX)
+            point = prepare_point(args, index, freq_label, point_dir, workspace_dir, launch_config)
+            if previous_scenario is not None:
+                extend_duration(point, previous_scenario, args.duration_scale)
+            points.append(point)
+        if not points:
+            print(f"INFO: all {len(kept)} points meet the quality thresholds")
+            return 0
+    else:
+        # 全測定点のシナリオを実行前に作成する
+        if os.path.isdir(output_dir):
+            shutil.rmtree(output_dir)
+        os.makedirs(output_dir)
+        for index, freq_label in enumerate(freq_labels):
+            point_dir = os.path.join(output_dir, f"freq_{freq_label}")
+            points.append(prepare_point(args, index, freq_label, point_dir, workspace_dir, launch_config))
+
+    run_results, wall_sec = run_points(points, args.jobs)
+    for point, result in zip(points, run_results):
+        if point['index'] in previous_runs:
+            restore_previous_run(point['dir'], result, previous_runs[point['index']])
+    results = sorted(kept + run_results, key=lambda result: result['index'])
+
+    # 結果は test_pattern.csv の順に、全測定点の終了後にまとめて書き出す
+    write_atomic(os.path.join(output_dir, 'result.csv'), RESULT_HEADER,
+                 [line for result in results for line in result['lines']])
+    quality_lines = [line for result in results for line in result['quality']]
+    if quality_lines:
+        write_atomic(os.path.join(output_dir, QUALITY_FILE), QUALITY_HEADER, quality_lines)
+    adaptive_lines = [line for result in results for line in result['adaptive']]
+    if adaptive_lines:
+        write_atomic(os.path.join(output_dir, 'adaptive_sweep.csv'), ADAPTIVE_HEADER, adaptive_lines)
+
+    failed = [result['freq'] for result in run_results if result['error'] is not None]
+    serial_sec = sum(result['wall_sec'] for result in run_results)
+    print(f"INFO: {len(points)} points in {wall_sec:.1f} s (sum of point times: {serial_sec:.1f} s, "
+          f"slowest point: {max(result['wall_sec'] for result in run_results):.1f} s)")
+    if kept:
+        print(f"INFO: {len(kept)} points kept from the previous sweep")
+    if args.cache_dir is not None:
+        print(f"INFO: cache hits: {sum(result['cached'] for result in run_results)} / {len(points)}")
+    if failed:
+        print(f"ERROR: failed points: {', '.join(failed)} (see run.log in each point directory, "
+              f"or in freq_<freq>{FAILED_SUFFIX} for a failed re-run)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
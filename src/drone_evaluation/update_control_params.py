@@ -42,19 +42,20 @@ def modify_simulation_delta_time(file_path, target_item_name, new_value):
         print(f"Error writing to file: {e}")
         sys.exit(1)
 
-# コマンドライン引数からファイルパスと対象行を取得
-if len(sys.argv) != 4:
-    print("Usage: python script.py <param_file> <target_item> <new_value>")
-    sys.exit(1)
+if __name__ == "__main__":
+    # コマンドライン引数からファイルパスと対象行を取得
+    if len(sys.argv) != 4:
+        print("Usage: python script.py <param_file> <target_item> <new_value>")
+        sys.exit(1)
 
-file_path = sys.argv[1]
-target_item_name = sys.argv[2]
+    file_path = sys.argv[1]
+    target_item_name = sys.argv[2]
 
-# Validate and convert new_value to float
-try:
-    new_value = float(sys.argv[3])
-except ValueError:
-    print(f"Error: '{sys.argv[3]}' is not a valid number.")
-    sys.exit(1)
+    # Validate and convert new_value to float
+    try:
+        new_value = float(sys.argv[3])
+    except ValueError:
+        print(f"Error: '{sys.argv[3]}' is not a valid number.")
+        sys.exit(1)
 
-modify_simulation_delta_time(file_path, target_item_name, new_value)
+    modify_simulation_delta_time(file_path, target_item_name, new_value)
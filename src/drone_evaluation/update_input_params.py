@@ -2,64 +2,63 @@ import pandas as pd
 import json
 import sys
 
-# コマンドライン引数からファイルパスと対象行を取得
-if len(sys.argv) != 5:
-    print("Usage: python script.py <csv_file> <config_file> <sine_input_file> <row_index>")
-    sys.exit(1)
+def update_input_params(csv_file, config_file, sine_input_file, row_index, updated_sine_input_file='sine-input-updated.json'):
+    """test_pattern.csv の row_index 行目のサイン入力シナリオを updated_sine_input_file に出力する"""
+    # CSVファイルから対象行を読み込む
+    csv_data = pd.read_csv(csv_file)
+    selected_row = csv_data.iloc[row_index]
+    start_time = float(selected_row['start_time'])
+    duration = float(selected_row['duration'])
+    freq = float(selected_row['freq'])
 
-csv_file = sys.argv[1]
-config_file = sys.argv[2]
-sine_input_file = sys.argv[3]
-row_index = int(sys.argv[4])
-updated_sine_input_file = 'sine-input-updated.json'
+    # config.jsonの読み込み
+    with open(config_file, 'r') as f:
+        config = json.load(f)
 
-# CSVファイルから対象行を読み込む
-csv_data = pd.read_csv(csv_file)
-selected_row = csv_data.iloc[row_index]
-start_time = float(selected_row['start_time'])
-duration = float(selected_row['duration'])
-freq = float(selected_row['freq'])
-simulation_time_step = float(selected_row['simulation_time_step'])
+    # sine-input.jsonの読み込み
+    with open(sine_input_file, 'r') as f:
+        sine_input = json.load(f)
 
-# config.jsonの読み込み
-with open(config_file, 'r') as f:
-    config = json.load(f)
+    # sine-input.jsonの内容を更新
+    input_array_len = config['input_array_len']
 
-# sine-input.jsonの読み込み
-with open(sine_input_file, 'r') as f:
-    sine_input = json.load(f)
+    sine_input['simulation']['signals']['sine']['parameters']['amp'] = [
+        config['amp'] for _ in range(input_array_len)
+    ]
+    sine_input['simulation']['signals']['sine']['parameters']['freq'] = [
+        freq for _ in range(input_array_len)
+    ]
+    sine_input['simulation']['signals']['sine']['parameters']['offsets'] = [
+        config['offset'] for _ in range(input_array_len)
+    ]
 
-# sine-input.jsonの内容を更新
-input_array_len = config['input_array_len']
+    # config.jsonの内容を反映（simulation_time_step列がない場合はテンプレートの値を使う）
+    if 'simulation_time_step' in csv_data.columns:
+        sine_input['simulation']['simulation_time_step'] = float(selected_row['simulation_time_step'])
+    sine_input['simulation']['type'] = config['type']
+    sine_input['evaluation']['input_data']['axis'] = config['in_axis']
+    sine_input['evaluation']['output_data']['axis'] = config['out_axis']
 
-sine_input['simulation']['signals']['sine']['parameters']['amp'] = [
-    config['amp'] for _ in range(input_array_len)
-]
-sine_input['simulation']['signals']['sine']['parameters']['freq'] = [
-    freq for _ in range(input_array_len)
-]
-sine_input['simulation']['signals']['sine']['parameters']['offsets'] = [
-    config['offset'] for _ in range(input_array_len)
-]
+    # controller_typeの設定（存在しない場合は無視）
+    if 'controller_type' in config:
+        sine_input['simulation']['controller_type'] = config['controller_type']
 
-# config.jsonの内容を反映
-sine_input['simulation']['simulation_time_step'] = simulation_time_step
-sine_input['simulation']['type'] = config['type']
-sine_input['evaluation']['input_data']['axis'] = config['in_axis']
-sine_input['evaluation']['output_data']['axis'] = config['out_axis']
+    sine_input['simulation']['signal_input_timings'][0]['duration_sec'] = start_time + duration + 100
+    sine_input['evaluation']['freq_evaluation']['freq'] = freq
+    sine_input['evaluation']['freq_evaluation']['output_inverse'] = config['output_inverse']
+    sine_input['evaluation']['freq_evaluation']['start_time'] = start_time
 
-# controller_typeの設定（存在しない場合は無視）
-if 'controller_type' in config:
-    sine_input['simulation']['controller_type'] = config['controller_type']
+    # 更新したsine-input.jsonを保存
+    with open(updated_sine_input_file, 'w') as f:
+        json.dump(sine_input, f, indent=2)
+    return sine_input
 
-sine_input['simulation']['signal_input_timings'][0]['duration_sec'] = start_time + duration + 100
-sine_input['evaluation']['freq_evaluation']['freq'] = freq
-sine_input['evaluation']['freq_evaluation']['output_inverse'] = config['output_inverse']
-sine_input['evaluation']['freq_evaluation']['start_time'] = start_time
+if __name__ == "__main__":
+    # コマンドライン引数からファイルパスと対象行を取得
+    if len(sys.argv) != 5:
+        print("Usage: python script.py <csv_file> <config_file> <sine_input_file> <row_index>")
+        sys.exit(1)
 
-
-# 更新したsine-input.jsonを保存
-with open(updated_sine_input_file, 'w') as f:
-    json.dump(sine_input, f, indent=2)
-
-print(f"Updated sine-input.json has been saved to {updated_sine_input_file}")
\ No newline at end of file
+    updated_sine_input_file = 'sine-input-updated.json'
+    update_input_params(sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4]), updated_sine_input_file)
+    print(f"Updated sine-input.json has been saved to {updated_sine_input_file}")
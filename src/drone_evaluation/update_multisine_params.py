@@ -0,0 +1,61 @@
+import pandas as pd
+import json
+import sys
+
+# コマンドライン引数からファイルパスと平均化する周期数を取得
+if len(sys.argv) != 4 and len(sys.argv) != 5:
+    print("Usage: python script.py <csv_file> <config_file> <multisine_input_file> [<periods>]")
+    sys.exit(1)
+
+csv_file = sys.argv[1]
+config_file = sys.argv[2]
+multisine_input_file = sys.argv[3]
+# H1推定で平均化する周期数（この前に過渡応答用の1周期を加える）
+periods = int(sys.argv[4]) if len(sys.argv) == 5 else 3
+transient_periods = 1
+updated_multisine_input_file = 'multisine-input-updated.json'
+
+# CSVファイルの全周波数を1回のシミュレーションで入力する
+csv_data = pd.read_csv(csv_file)
+freqs = sorted(set(float(freq) for freq in csv_data['freq']))
+base_freq = freqs[0]
+period = 1 / base_freq
+
+# config.jsonの読み込み
+with open(config_file, 'r') as f:
+    config = json.load(f)
+
+# multisine-input.jsonの読み込み
+with open(multisine_input_file, 'r') as f:
+    multisine_input = json.load(f)
+
+# multisine-input.jsonの内容を更新（ampは合成波形のピーク振幅）
+input_array_len = config['input_array_len']
+parameters = multisine_input['simulation']['signals']['multisine']['parameters']
+parameters['amp'] = [config['amp'] for _ in range(input_array_len)]
+parameters['freqs'] = freqs
+parameters['base_freq'] = base_freq
+parameters['offsets'] = [config['offset'] for _ in range(input_array_len)]
+
+# config.jsonの内容を反映
+if 'simulation_time_step' in csv_data.columns:
+    multisine_input['simulation']['simulation_time_step'] = float(csv_data['simulation_time_step'].iloc[0])
+multisine_input['simulation']['type'] = config['type']
+multisine_input['evaluation']['input_data']['axis'] = config['in_axis']
+multisine_input['evaluation']['output_data']['axis'] = config['out_axis']
+
+# controller_typeの設定（存在しない場合は無視）
+if 'controller_type' in config:
+    multisine_input['simulation']['controller_type'] = config['controller_type']
+
+start_time = transient_periods * period
+multisine_input['simulation']['signal_input_timings'][0]['duration_sec'] = start_time + periods * period + 100
+multisine_input['evaluation']['freq_evaluation']['input_inverse'] = config.get('input_inverse', False)
+multisine_input['evaluation']['freq_evaluation']['output_inverse'] = config['output_inverse']
+multisine_input['evaluation']['freq_evaluation']['start_time'] = start_time
+
+# 更新したmultisine-input.jsonを保存
+with open(updated_multisine_input_file, 'w') as f:
+    json.dump(multisine_input, f, indent=2)
+
+print(f"Updated multisine-input.json has been saved to {updated_multisine_input_file}")
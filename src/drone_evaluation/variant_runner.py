@@ -0,0 +1,132 @@
+import sys
+import os
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import pandas as pd
+from components.drone_config_updater import DroneConfigUpdater, validate_evaluation_config, add_drone_robots
+from update_control_params import modify_simulation_delta_time
+from launcher import launch, load_launch_config, drone_output_dir
+from sweep_runner import absolutize_paths, DEFAULT_DRONE_TEMPLATE_CONFIG, DEFAULT_PDU_CONFIG, DEFAULT_PARAM_FILE, DEFAULT_MODULE_BASE_PATH
+
+def create_param_files(param_file, variants, simulation_time_step, params_dir):
+    """
+    制御パラメータのバリエーションごとに、param_file を上書きしたファイルを作成する。
+    variants の列（name 以外）はパラメータ名、各行がバリエーション。
+    """
+    os.makedirs(params_dir, exist_ok=True)
+    param_files = []
+    for index, variant in variants.iterrows():
+        path = os.path.join(params_dir, f"param-api-mixer-{index}.txt")
+        shutil.copyfile(param_file, path)
+        modify_simulation_delta_time(path, 'SIMULATION_DELTA_TIME', simulation_time_step)
+        for name, value in variant.items():
+            if name != 'name':
+                modify_simulation_delta_time(path, name, value)
+        param_files.append(path)
+    return param_files
+
+def create_drone_configs(args, scenario, count, drone_config_dir, workspace_dir, log_output_dir):
+    """複数機体の drone_config_<番号>.json を作成し、その一覧を返す（drone_log<番号> は log_output_dir に出力される）"""
+    os.makedirs(drone_config_dir, exist_ok=True)
+    drone_configs = []
+    for index in range(count):
+        updater = DroneConfigUpdater(args.drone_template_config, args.module_base_path)
+        absolutize_paths(updater.params, workspace_dir)
+        updater.set_log_output_directory(log_output_dir)
+        if scenario['simulation']['type'] == 'plant':
+            updater.set_plant_module()
+        else:
+            updater.set_controller_module(scenario['simulation']['controller_type'])
+        updater.set_simulation_time_step(scenario['simulation']['simulation_time_step'])
+        updater.set_drone_instance(index)
+        path = os.path.join(drone_config_dir, f"drone_config_{index}.json")
+        updater.save(path)
+        drone_configs.append(path)
+    return drone_configs
+
+def main():
+    parser = argparse.ArgumentParser(description='Run one scenario with several controller parameter variants, one drone per variant, in one simulation.')
+    parser.add_argument('scenario', help='Scenario JSON')
+    parser.add_argument('variants', help='CSV of the variants: one row per variant, one column per controller parameter (optional column: name)')
+    parser.add_argument('--output-dir', help='Output directory (default: test-results/variants-<scenario name>)')
+    parser.add_argument('--drone-template-config', default=DEFAULT_DRONE_TEMPLATE_CONFIG, help='Drone config template')
+    parser.add_argument('--pdu-config', default=DEFAULT_PDU_CONFIG, help='PDU config (custom.json)')
+    parser.add_argument('--param-file', default=DEFAULT_PARAM_FILE, help='Original controller parameter file')
+    parser.add_argument('--module-base-path', default=DEFAULT_MODULE_BASE_PATH, help='Directory of the controller modules')
+    parser.add_argument('--port', type=int, default=450, help='hako-px4sim port')
+    parser.add_argument('--transport', choices=['hako', 'virtual'], default='hako',
+                        help='virtual: run the evaluator on the virtual clock only (dry run)')
+    parser.add_argument('--launch-config', help='Launch config JSON of launcher.py')
+    args = parser.parse_args()
+
+    workspace_dir = os.getcwd()
+    args.drone_template_config = os.path.abspath(args.drone_template_config)
+    args.param_file = os.path.abspath(args.param_file)
+    args.module_base_path = os.path.join(os.path.abspath(args.module_base_path), '')
+    scenario_name = os.path.splitext(os.path.basename(args.scenario))[0]
+    output_dir = os.path.abspath(args.output_dir or os.path.join('test-results', f"variants-{scenario_name}"))
+
+    variants = pd.read_csv(args.variants, skipinitialspace=True)
+    if len(variants) == 0:
+        print("ERROR: the variants CSV contains no variant")
+        return 1
+    with open(args.scenario, 'r') as f:
+        scenario = json.load(f)
+    validate_evaluation_config(scenario)
+
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    scenario_file = os.path.basename(args.scenario)
+    shutil.copyfile(args.scenario, os.path.join(output_dir, scenario_file))
+
+    # 1機体 = 1バリエーション（機体の作成順に HAKO_CONTROLLER_PARAM_FILE の一覧が割り当てられる）
+    param_files = create_param_files(args.param_file, variants, scenario['simulation']['simulation_time_step'],
+                                     os.path.join(output_dir, 'params'))
+    drone_config_dir = os.path.join(output_dir, 'mixer-api')
+    drone_configs = create_drone_configs(args, scenario, len(variants), drone_config_dir, workspace_dir, output_dir)
+    with open(drone_configs[0], 'r') as f:
+        drone_name = json.load(f)['name']
+    with open(args.pdu_config, 'r') as f:
+        pdu_params = add_drone_robots(json.load(f), drone_name, len(variants))
+    pdu_config = os.path.join(output_dir, 'custom.json')
+    with open(pdu_config, 'w') as f:
+        json.dump(pdu_params, f, indent=4)
+
+    overrides = None
+    if args.transport == 'virtual':
+        evaluator_command = load_launch_config()['evaluator']['command'] + ['--transport', 'virtual']
+        overrides = {'simulator': None, 'start': None, 'evaluator': {'command': evaluator_command}}
+    launch_config = load_launch_config(args.launch_config, overrides)
+    env = dict(os.environ, HAKO_CONTROLLER_PARAM_FILE=os.pathsep.join(param_files), DRONE_CONFIG_PATH=drone_config_dir)
+    values = {
+        'drone_config': drone_configs[0],
+        'pdu_config': pdu_config,
+        'scenario': scenario_file,
+        'asset_name': 'SimulationExecutor',
+        'port': args.port,
+        'drones': len(variants),
+    }
+    start = time.perf_counter()
+    try:
+        returncode = asyncio.run(launch(launch_config, values, output_dir, env))
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
+    wall_sec = time.perf_counter() - start
+    if returncode != 0:
+        print(f"ERROR: evaluator.py exited with {returncode}")
+        return returncode
+
+    # バリエーションと出力ディレクトリの対応
+    variants.insert(0, 'dir', [drone_output_dir(index) for index in range(len(variants))])
+    variants.insert(1, 'param_file', [os.path.relpath(path, output_dir) for path in param_files])
+    variants.to_csv(os.path.join(output_dir, 'variants.csv'), index=False)
+    print(f"INFO: {len(variants)} variants in {wall_sec:.1f} s, results in {output_dir}/drone<index>/")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())